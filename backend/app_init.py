@@ -83,6 +83,7 @@ github = oauth.register(
 
 # Import routes at the end to avoid circular imports
 from routes import *
+import commands  # Registers the flask CLI commands
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=ENV == 'development')
\ No newline at end of file
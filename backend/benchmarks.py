@@ -0,0 +1,238 @@
+# benchmarks.py
+
+import io
+import json
+import os
+import pickle
+import random
+import resource
+import statistics
+import tempfile
+import time
+from bs4 import BeautifulSoup
+from flask import current_app, make_response
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from sqlalchemy import text
+from db import db
+from html_parsing import FAST_PARSER, PAGE_TARGETS, page_strainer
+from models import Question
+from progress_counters import shuffle_question_order, reset_selections
+from query_plans import seed_dataset
+from quiz_pdf import render_quiz_pdf, strip_tags
+from quiz_cache import bump_version, current_version
+from routes import get_questions_by_quiz_set
+
+def _legacy_shuffle(quiz_set_id):
+    # The per-row ORM shuffle the shuffleQuestions route used before it became one UPDATE
+    questions = Question.query.filter_by(quiz_set_id=quiz_set_id).all()
+    question_ids = [q.id for q in questions]
+    random.shuffle(question_ids)
+    for new_order, question_id in enumerate(question_ids):
+        question = next(q for q in questions if q.id == question_id)
+        question.order = new_order
+        question.user_selected_option = None
+    db.session.flush()
+    return Question.query.filter_by(quiz_set_id=quiz_set_id).order_by(Question.order).all()
+
+def _legacy_reset(quiz_set_id):
+    questions = Question.query.filter_by(quiz_set_id=quiz_set_id).order_by(Question.order).all()
+    for question in questions:
+        question.user_selected_option = None
+    db.session.flush()
+    return questions
+
+def _time(operation, quiz_set_id, repeats):
+    timings = []
+    for _ in range(repeats):
+        # Start every run from a fully answered set so both operations have selections to clear
+        db.session.execute(text("UPDATE questions SET user_selected_option = 'A' WHERE quiz_set_id = :quiz_set_id"),
+                           {'quiz_set_id': quiz_set_id})
+        db.session.expunge_all()
+        started = time.perf_counter()
+        operation(quiz_set_id)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def benchmark_shuffle_reset(questions=10000, repeats=3, legacy=True):
+    """Time shuffleQuestions/resetQuestions on one seeded quiz set of `questions` questions and
+    return {operation: best seconds}. With `legacy`, the old ORM versions are timed too. The
+    seeded rows are rolled back afterwards."""
+    operations = {'shuffle': shuffle_question_order, 'reset': reset_selections}
+    if legacy:
+        operations.update({'shuffle (legacy)': _legacy_shuffle, 'reset (legacy)': _legacy_reset})
+    try:
+        quiz_set_id = seed_dataset(users=1, quiz_sets=1, questions_per_set=questions)['quiz_set_id']
+        return {name: _time(operation, quiz_set_id, repeats) for name, operation in operations.items()}
+    finally:
+        db.session.rollback()
+
+def _legacy_pdf(quiz_set_id, title):
+    # The downloadQuizPdf route before exports were rendered in batches to a file: every question
+    # loaded up front, the document built in memory and drawn as single unwrapped lines
+    questions = Question.query.filter_by(quiz_set_id=quiz_set_id).order_by(Question.order).all()
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    y_position = height - 30
+    p.drawString(30, y_position, f"Quiz: {title}")
+    y_position -= 20
+    for i, question in enumerate(questions, start=1):
+        y_position -= 15
+        p.drawString(30, y_position, f"Question No. {i}: {strip_tags(question.text)}")
+        y_position -= 15
+        for j, option in enumerate(question.options, start=1):
+            p.drawString(30, y_position, f"{chr(64+j)}. {strip_tags(option)}")
+            y_position -= 15
+        p.drawString(30, y_position, f"Answer: {question.answer.replace('Option ', '')}")
+        y_position -= 20
+        if y_position < 50:
+            p.showPage()
+            y_position = height - 30
+    p.save()
+    return buffer.getvalue()
+
+def _peak_rss_mb():
+    # ru_maxrss is the process's high-water mark, in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _seed_question_contents(questions):
+    quiz_set_id = seed_dataset(users=1, quiz_sets=1, questions_per_set=questions)['quiz_set_id']
+    # Give every question its own realistic content: a few lines of HTML text and four options
+    content_ids = db.session.execute(text(
+        "INSERT INTO question_contents (content_hash, text, options) "
+        "SELECT md5(random()::text || n) || md5(n::text), "
+        "'<p>' || repeat('Which of the following best describes the behaviour of the circuit shown? ', 4) || n || '</p>', "
+        "jsonb_build_array('<b>Option</b> ' || repeat('alpha ', 12), 'beta ' || n, "
+        "repeat('gamma ', 30), 'None of the above') "
+        "FROM generate_series(1, :questions) AS n RETURNING id"
+    ), {'questions': questions}).scalars().all()
+    db.session.execute(text(
+        "UPDATE questions SET content_id = contents.id "
+        "FROM unnest(CAST(:content_ids AS INTEGER[])) WITH ORDINALITY AS contents(id, n) "
+        "WHERE questions.quiz_set_id = :quiz_set_id AND questions.\"order\" = contents.n"
+    ), {'content_ids': content_ids, 'quiz_set_id': quiz_set_id})
+    db.session.expunge_all()
+    return quiz_set_id
+
+def benchmark_pdf_export(questions=5000, legacy=True):
+    """Export one seeded quiz set of `questions` questions to PDF and return
+    {export: (seconds, peak RSS in MB, PDF size in bytes)}. The batched export runs first, so the
+    legacy in-memory one only raises the peak if it needs more. The seeded rows are rolled back."""
+    results = {'baseline': (0.0, _peak_rss_mb(), 0)}
+    try:
+        quiz_set_id = _seed_question_contents(questions)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.pdf')
+            started = time.perf_counter()
+            render_quiz_pdf(quiz_set_id, 'bench-pdf', path)
+            results['export'] = (time.perf_counter() - started, _peak_rss_mb(), os.path.getsize(path))
+        if legacy:
+            db.session.expunge_all()
+            started = time.perf_counter()
+            body = _legacy_pdf(quiz_set_id, 'bench-pdf')
+            results['export (legacy)'] = (time.perf_counter() - started, _peak_rss_mb(), len(body))
+        return results
+    finally:
+        db.session.rollback()
+
+# Page chrome around the scraped elements: navigation, scripts and sidebars are most of a real page
+# Saved pages for each PAGE_TARGETS site, with the page chrome around the elements the scrapers read
+FIXTURE_PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures', 'pages')
+
+def fixture_page(site):
+    with open(os.path.join(FIXTURE_PAGES_DIR, f'{site}.html'), 'rb') as f:
+        return f.read()
+
+def benchmark_parse(pages=None, repeats=20):
+    """Time parsing one page per PAGE_TARGETS site with html.parser on the whole page (how pages were
+    parsed before) and with FAST_PARSER limited to the site's strainer (what parse_page does), and
+    return {site: {parser: best seconds}}. `pages` maps sites to page bytes; sites left out use
+    their saved fixture page."""
+    results = {}
+    for site in PAGE_TARGETS:
+        content = (pages or {}).get(site) or fixture_page(site)
+        strainer = page_strainer(site)
+        parsers = {
+            'html.parser': lambda: BeautifulSoup(content, 'html.parser'),
+            FAST_PARSER + ('+strainer' if strainer else ''): lambda: BeautifulSoup(content, FAST_PARSER, parse_only=strainer),
+        }
+        results[site] = {}
+        for name, parse in parsers.items():
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                parse()
+                timings.append(time.perf_counter() - started)
+            results[site][name] = min(timings)
+    return results
+
+# The quiz set's questions as getQuestionsByQuizSet serializes them; {options} and {join} pick the options column
+QUESTION_ROWS_SQL = """
+    SELECT questions.id, questions."order", question_contents.text, {options} AS options, questions.answer,
+           question_contents.url, question_contents.explanation, question_contents.discussion_link,
+           questions.favorite, questions.user_selected_option
+    FROM questions
+    JOIN question_contents ON question_contents.id = questions.content_id
+    {join}
+    WHERE questions.quiz_set_id = :quiz_set_id
+    ORDER BY questions."order"
+"""
+
+def _time_options_serialization(quiz_set_id, repeats):
+    """Median (seconds, bytes) to read and serialize the quiz's questions with options stored as
+    JSONB, and with the same options pickled into BYTEA as they were before migration 0003."""
+    db.session.execute(text("CREATE TEMPORARY TABLE pickled_options (content_id INTEGER PRIMARY KEY, options BYTEA NOT NULL)"))
+    rows = db.session.execute(text(
+        "SELECT question_contents.id, question_contents.options FROM question_contents "
+        "JOIN questions ON questions.content_id = question_contents.id WHERE questions.quiz_set_id = :quiz_set_id"
+    ), {'quiz_set_id': quiz_set_id}).all()
+    db.session.execute(text("INSERT INTO pickled_options (content_id, options) VALUES (:content_id, :options)"),
+                       [{'content_id': row.id, 'options': pickle.dumps(row.options)} for row in rows])
+
+    def serialize(sql, decode):
+        started = time.perf_counter()
+        questions = [dict(row, options=decode(row['options']))
+                     for row in db.session.execute(text(sql), {'quiz_set_id': quiz_set_id}).mappings()]
+        body = json.dumps(questions)
+        return time.perf_counter() - started, len(body)
+
+    pickled_sql = QUESTION_ROWS_SQL.format(options='pickled_options.options',
+                                           join='JOIN pickled_options ON pickled_options.content_id = question_contents.id')
+    jsonb_sql = QUESTION_ROWS_SQL.format(options='question_contents.options', join='')
+    pickled = [serialize(pickled_sql, lambda options: pickle.loads(bytes(options))) for _ in range(repeats)]
+    jsonb = [serialize(jsonb_sql, lambda options: options) for _ in range(repeats)]
+    return pickled, jsonb
+
+def benchmark_questions_endpoint(questions=5000, repeats=9):
+    """Time getQuestionsByQuizSet on one seeded quiz set of `questions` questions and return
+    {path: (median seconds, body bytes)} for three paths: 'render' (version bumped first, so the
+    ORM load and JSON serialization run), 'cached' (body from the response cache) and
+    'not modified' (matching If-None-Match). 'pickle options' and 'jsonb options' compare reading
+    and serializing the same rows with options pickled as before and stored as JSONB. The seeded
+    rows are rolled back."""
+    def request(headers=None):
+        with current_app.test_request_context(f'/api/getQuestionsByQuizSet/{quiz_set_id}', headers=headers):
+            started = time.perf_counter()
+            response = make_response(get_questions_by_quiz_set(quiz_set_id))
+            body = response.get_data()
+            return time.perf_counter() - started, len(body)
+
+    def median(runs):
+        return statistics.median(seconds for seconds, _ in runs), runs[-1][1]
+
+    try:
+        quiz_set_id = _seed_question_contents(questions)
+        rendered = []
+        for _ in range(repeats):
+            bump_version(quiz_set_id)
+            db.session.expunge_all()
+            rendered.append(request())
+        cached = [request() for _ in range(repeats)]
+        etag = f'"{quiz_set_id}.{current_version(quiz_set_id)}"'
+        not_modified = [request({'If-None-Match': etag}) for _ in range(repeats)]
+        pickled, jsonb = _time_options_serialization(quiz_set_id, repeats)
+        return {'render': median(rendered), 'cached': median(cached), 'not modified': median(not_modified),
+                'pickle options': median(pickled), 'jsonb options': median(jsonb)}
+    finally:
+        db.session.rollback()
@@ -0,0 +1,111 @@
+# browser_pool.py
+
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+import config
+
+logger = logging.getLogger(__name__)
+
+def create_chrome_driver():
+    options = Options()
+    options.add_argument("--headless")  # Enable headless mode
+    options.add_argument("start-maximized")  # Start maximized for better performance in headless mode
+    return webdriver.Chrome(options=options)
+
+class BrowserPool:
+    """Bounded pool of reusable headless browsers.
+
+    Browsers are started lazily on first lease, never more than `max_browsers` at once
+    per process. A leased browser is health-checked before it's handed out and recycled
+    after `max_pages` leases so leaks in long-lived Chrome processes don't accumulate.
+    """
+
+    def __init__(self, max_browsers, max_pages, lease_timeout, driver_factory=create_chrome_driver):
+        self.max_browsers = max_browsers
+        self.max_pages = max_pages
+        self.lease_timeout = lease_timeout
+        self.driver_factory = driver_factory
+        self.condition = threading.Condition()
+        self.idle = []  # [driver, pages_served] pairs ready to be leased
+        self.started = 0  # browsers alive, idle or leased
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url  # Round trip to the browser; fails if Chrome died
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting browser: {e}")
+
+    def _acquire(self):
+        while True:
+            with self.condition:
+                if not self.idle and self.started >= self.max_browsers:
+                    if not self.condition.wait_for(lambda: self.idle or self.started < self.max_browsers, timeout=self.lease_timeout):
+                        raise TimeoutError(f"No browser available after {self.lease_timeout}s")
+                if self.idle:
+                    entry = self.idle.pop()
+                else:
+                    self.started += 1
+                    entry = None
+
+            if entry is None:
+                try:
+                    logger.info("Starting a new headless browser")
+                    return [self.driver_factory(), 0]
+                except Exception:
+                    self._discard()
+                    raise
+
+            if self._is_healthy(entry[0]):
+                return entry
+            logger.warning("Discarding unhealthy browser")
+            self._quit(entry[0])
+            self._discard()
+
+    def _discard(self):
+        with self.condition:
+            self.started -= 1
+            self.condition.notify()
+
+    def _release(self, entry):
+        entry[1] += 1
+        if entry[1] >= self.max_pages:
+            logger.info(f"Recycling browser after {entry[1]} pages")
+            self._quit(entry[0])
+            self._discard()
+            return
+        try:
+            entry[0].delete_all_cookies()
+        except Exception:
+            pass
+        with self.condition:
+            self.idle.append(entry)
+            self.condition.notify()
+
+    @contextmanager
+    def lease(self):
+        entry = self._acquire()
+        try:
+            yield entry[0]
+        finally:
+            self._release(entry)
+
+    def shutdown(self):
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.started -= len(idle)
+        for driver, _ in idle:
+            self._quit(driver)
+
+pool = BrowserPool(config.BROWSER_POOL_SIZE, config.BROWSER_MAX_PAGES, config.BROWSER_LEASE_TIMEOUT)
+atexit.register(pool.shutdown)
@@ -0,0 +1,75 @@
+# commands.py
+
+import click
+from app_init import app
+from progress_counters import rebuild_progress_counters
+from query_plans import check_query_plans, uses_index
+from benchmarks import benchmark_shuffle_reset, benchmark_pdf_export, benchmark_parse, benchmark_questions_endpoint
+
+@app.cli.command('rebuild-progress-counters')
+@click.option('--check', is_flag=True, help='Only report quiz sets whose counters are wrong')
+def rebuild_progress_counters_command(check):
+    """Recount quiz set question/answered/correct counters from the questions table."""
+    mismatched = rebuild_progress_counters(fix=not check)
+    if not mismatched:
+        click.echo("All quiz set progress counters are consistent.")
+        return
+    click.echo(f"{'Found' if check else 'Rebuilt'} wrong counters for {len(mismatched)} quiz sets:")
+    for quiz_set_id in mismatched:
+        click.echo(f"  {quiz_set_id}")
+
+@app.cli.command('explain-check')
+@click.option('--users', default=1000, show_default=True, help='Users to seed (rolled back afterwards)')
+@click.option('--quiz-sets', default=5000, show_default=True, help='Quiz sets to seed, spread across the users')
+@click.option('--questions-per-set', default=100, show_default=True, help='Questions to seed per quiz set')
+def explain_check(users, quiz_sets, questions_per_set):
+    """Check that the hot endpoint queries use index scans on a large seeded dataset."""
+    results = check_query_plans(users=users, quiz_sets=quiz_sets, questions_per_set=questions_per_set)
+    failed = [name for name, scans in results.items() if not uses_index(scans)]
+    for name, scans in results.items():
+        click.echo(f"{'FAIL' if name in failed else 'ok  '} {name}: {', '.join(scans)}")
+    if failed:
+        raise SystemExit(1)
+
+@app.cli.command('bench-shuffle')
+@click.option('--questions', default=10000, show_default=True, help='Questions in the seeded quiz set (rolled back afterwards)')
+@click.option('--repeats', default=3, show_default=True, help='Runs per operation; the best is reported')
+@click.option('--no-legacy', is_flag=True, help='Skip timing the old per-row ORM implementations')
+def bench_shuffle(questions, repeats, no_legacy):
+    """Time shuffleQuestions and resetQuestions on one large quiz set."""
+    results = benchmark_shuffle_reset(questions=questions, repeats=repeats, legacy=not no_legacy)
+    for name, seconds in results.items():
+        click.echo(f"{name:<18} {seconds * 1000:9.1f} ms")
+
+@app.cli.command('bench-pdf')
+@click.option('--questions', default=5000, show_default=True, help='Questions in the seeded quiz set (rolled back afterwards)')
+@click.option('--no-legacy', is_flag=True, help='Skip the old in-memory export')
+def bench_pdf(questions, no_legacy):
+    """Time a quiz set PDF export and report the process's peak RSS after it."""
+    results = benchmark_pdf_export(questions=questions, legacy=not no_legacy)
+    for name, (seconds, peak_rss_mb, size) in results.items():
+        click.echo(f"{name:<16} {seconds * 1000:9.1f} ms  peak RSS {peak_rss_mb:7.1f} MB  {size / 1024:8.1f} KB")
+
+@app.cli.command('bench-parse')
+@click.option('--page', 'pages', multiple=True, metavar='SITE=PATH', help='Saved page to parse for a site instead of its fixture page')
+@click.option('--repeats', default=20, show_default=True, help='Parses per site and parser; the best is reported')
+def bench_parse(pages, repeats):
+    """Time parsing scraped pages with html.parser against lxml with the per-site strainer."""
+    saved = {}
+    for page in pages:
+        site, path = page.split('=', 1)
+        with open(path, 'rb') as f:
+            saved[site] = f.read()
+    for site, timings in benchmark_parse(pages=saved, repeats=repeats).items():
+        for name, seconds in timings.items():
+            click.echo(f"{site:<11} {name:<16} {seconds * 1000:8.2f} ms")
+
+@app.cli.command('bench-questions')
+@click.option('--questions', default=5000, show_default=True, help='Questions in the seeded quiz set (rolled back afterwards)')
+@click.option('--repeats', default=9, show_default=True, help='Requests per path; the median is reported')
+def bench_questions(questions, repeats):
+    """Time getQuestionsByQuizSet on one large quiz set: rendered, from the response cache, and 304,
+    plus serializing its options from pickled BYTEA against JSONB."""
+    results = benchmark_questions_endpoint(questions=questions, repeats=repeats)
+    for name, (seconds, size) in results.items():
+        click.echo(f"{name:<14} {seconds * 1000:9.1f} ms  {size / 1024:8.1f} KB")
@@ -1,16 +1,101 @@
 # config.py
 
+import os
 import ssl
+import tempfile
 import warnings
-import requests
 import urllib3
+from pytz import timezone
 
 # Constants and initializations
 ssl._create_default_https_context = ssl._create_unverified_context
 warnings.filterwarnings("ignore", category=urllib3.exceptions.InsecureRequestWarning)
-session = requests.Session()
 question_counter = 1
 
+# Timezone of the timestamps the app records (job progress, deletions, comment fetches)
+PH_TZ = timezone('Asia/Manila')
+
+# Concurrency of the scraper fetch stage (pages are downloaded in parallel, parsed in source order)
+SCRAPE_WORKERS = int(os.getenv('SCRAPE_WORKERS', 8))
+SCRAPE_PER_HOST_LIMIT = int(os.getenv('SCRAPE_PER_HOST_LIMIT', 4))
+
+# Shared scraper HTTP client: connection pools per host and (connect, read) timeouts in seconds
+HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', 16))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 10))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))
+
+# On-disk cache of scraped pages (bodies stored by content hash, revalidated with ETag/Last-Modified after the TTL)
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+PAGE_CACHE_DIR = os.getenv('PAGE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'athena-page-cache'))
+PAGE_CACHE_MAX_BYTES = int(os.getenv('PAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+PAGE_CACHE_TTL_SECONDS = int(os.getenv('PAGE_CACHE_TTL_SECONDS', 24 * 60 * 60))
+
+# Headless Chrome pool for web.archive.org (examprimer) scrapes: hard cap per process, recycle after N pages
+BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', 2))
+BROWSER_MAX_PAGES = int(os.getenv('BROWSER_MAX_PAGES', 50))
+BROWSER_LEASE_TIMEOUT = float(os.getenv('BROWSER_LEASE_TIMEOUT', 300))
+
+# Scraped questions are inserted in multi-row batches of at most this many rows (and at least once per page)
+QUESTION_FLUSH_SIZE = int(os.getenv('QUESTION_FLUSH_SIZE', 500))
+
+# Stored discussion comments older than this are served as-is while a background refresh runs
+DISCUSSION_COMMENTS_TTL_SECONDS = int(os.getenv('DISCUSSION_COMMENTS_TTL_SECONDS', 7 * 24 * 60 * 60))
+DISCUSSION_REFRESH_WORKERS = int(os.getenv('DISCUSSION_REFRESH_WORKERS', 2))
+
+# Background scrape jobs: how many run at once per process, and when an unfinished job counts as interrupted
+SCRAPE_JOB_WORKERS = int(os.getenv('SCRAPE_JOB_WORKERS', 2))
+SCRAPE_JOB_STALE_SECONDS = int(os.getenv('SCRAPE_JOB_STALE_SECONDS', 900))
+
+# Scrape progress streams: keep-alive interval and how many undelivered events each stream buffers
+SCRAPE_EVENTS_HEARTBEAT_SECONDS = int(os.getenv('SCRAPE_EVENTS_HEARTBEAT_SECONDS', 15))
+SCRAPE_EVENTS_QUEUE_SIZE = int(os.getenv('SCRAPE_EVENTS_QUEUE_SIZE', 1000))
+# How often a running scrape job sends its queued progress events, in one batch over its own connection
+SCRAPE_EVENTS_FLUSH_SECONDS = float(os.getenv('SCRAPE_EVENTS_FLUSH_SECONDS', 0.25))
+
+# Largest page getQuestionsByQuizSet returns in its paginated and windowed modes
+QUESTIONS_PAGE_MAX = int(os.getenv('QUESTIONS_PAGE_MAX', 500))
+
+# Most changes accepted by one updateQuestionsBatch request
+QUESTION_BATCH_MAX = int(os.getenv('QUESTION_BATCH_MAX', 1000))
+
+# Quiz set deletions touching more questions than this are finished in the background
+QUIZ_SET_DELETE_INLINE_MAX_QUESTIONS = int(os.getenv('QUIZ_SET_DELETE_INLINE_MAX_QUESTIONS', 5000))
+
+# Questions removed per transaction by a background quiz set deletion
+QUIZ_SET_DELETE_BATCH_SIZE = int(os.getenv('QUIZ_SET_DELETE_BATCH_SIZE', 2000))
+
+# LLM provider scheduling: a second provider is raced in after the hedge delay, and a provider
+# failing LLM_BREAKER_FAILURES times in a row is skipped for the cooldown
+LLM_WORKERS = int(os.getenv('LLM_WORKERS', 16))
+LLM_HEDGE_DELAY_SECONDS = float(os.getenv('LLM_HEDGE_DELAY_SECONDS', 4))
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv('LLM_REQUEST_TIMEOUT_SECONDS', 90))
+LLM_PROVIDER_WINDOW = int(os.getenv('LLM_PROVIDER_WINDOW', 20))
+LLM_ERROR_PENALTY_SECONDS = float(os.getenv('LLM_ERROR_PENALTY_SECONDS', 30))
+LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', 3))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv('LLM_BREAKER_COOLDOWN_SECONDS', 120))
+# Requests allowed in flight to one provider at a time, across interactive and background use
+LLM_PROVIDER_CONCURRENCY = int(os.getenv('LLM_PROVIDER_CONCURRENCY', 4))
+
+# Explanation pre-generation jobs: how many run at once, how many questions each explains in parallel,
+# and when an unfinished job counts as interrupted (it updates after every question)
+EXPLANATION_JOB_WORKERS = int(os.getenv('EXPLANATION_JOB_WORKERS', 1))
+EXPLANATION_JOB_CONCURRENCY = int(os.getenv('EXPLANATION_JOB_CONCURRENCY', 3))
+EXPLANATION_JOB_STALE_SECONDS = int(os.getenv('EXPLANATION_JOB_STALE_SECONDS', 600))
+
+# Users allowed on the /api/admin endpoints (comma-separated user ids)
+ADMIN_USER_IDS = {int(user_id) for user_id in os.getenv('ADMIN_USER_IDS', '').split(',') if user_id.strip()}
+
+# Further explanations kept in memory in front of the further_explanation_cache table
+FURTHER_EXPLANATION_CACHE_SIZE = int(os.getenv('FURTHER_EXPLANATION_CACHE_SIZE', 2048))
+
+# Quiz set PDF exports: rendered files are kept on disk per exported content, questions are read in batches
+PDF_CACHE_DIR = os.getenv('PDF_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'athena-pdf-cache'))
+PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+PDF_EXPORT_BATCH_SIZE = int(os.getenv('PDF_EXPORT_BATCH_SIZE', 500))
+
+# Memory bound for rendered quiz content responses cached per (endpoint, quiz set, version)
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
 # Dictionary for image types
 img_type_directory = {
     "within": "Within",
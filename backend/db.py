@@ -1,6 +1,7 @@
 # db.py
 
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate, upgrade
 from sqlalchemy import text
 import time
 import logging
@@ -9,9 +10,22 @@ import os
 logger = logging.getLogger(__name__)
 
 db = SQLAlchemy()
+migrate = Migrate(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
+
+# Arbitrary key for the advisory lock that keeps concurrently starting workers from migrating at once
+MIGRATION_LOCK_KEY = 7461293
+
+def run_migrations():
+    with db.engine.connect() as connection:
+        connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+        try:
+            upgrade()
+        finally:
+            connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATION_LOCK_KEY})
 
 def init_db(app):
     db.init_app(app)
+    migrate.init_app(app, db)
     
     with app.app_context():
         max_retries = 5
@@ -24,11 +38,11 @@ def init_db(app):
                 logger.info("Database connection successful")
 
                 # Import all models here
-                from models import User, QuizSet, Question, EditorContent, FurtherExplanation, Attempt
+                from models import User, QuizSet, Question, QuestionContent, EditorContent, FurtherExplanation, Attempt, ScrapeJob
 
-                # Create all tables
-                db.create_all()
-                logger.info("Database tables created successfully")
+                # Bring the schema up to date (flask db upgrade)
+                run_migrations()
+                logger.info("Database migrations applied successfully")
 
                 # List all tables
                 inspector = db.inspect(db.engine)
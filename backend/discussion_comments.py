@@ -0,0 +1,60 @@
+# discussion_comments.py
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import logging
+import threading
+from app_init import app
+from db import db
+from models import QuestionContent
+from scraping_helpers import fetch_discussion_comments
+import config
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(max_workers=config.DISCUSSION_REFRESH_WORKERS, thread_name_prefix='discussion-refresh')
+
+# Content ids with a refresh queued or running in this process
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def _store(content_id, comments):
+    QuestionContent.query.filter_by(id=content_id).update({
+        'discussion_comments': comments,
+        'discussion_comments_updated_at': datetime.now(config.PH_TZ),
+    })
+    db.session.commit()
+
+def _refresh(content_id, discussion_link):
+    with app.app_context():
+        try:
+            _store(content_id, fetch_discussion_comments(discussion_link))
+            logger.info(f"Refreshed discussion comments for question content {content_id}")
+        except Exception as e:
+            logger.warning(f"Failed to refresh discussion comments for question content {content_id}: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(content_id)
+
+def load_discussion_comments(content):
+    """Return the discussion comments stored on a QuestionContent row.
+
+    Comments are fetched and stored on first view. Once they are older than
+    DISCUSSION_COMMENTS_TTL_SECONDS the stored copy is still returned while a
+    background refresh replaces it. Only complete fetches are stored: a failed
+    first fetch raises and is retried on the next view, and a failed refresh
+    keeps the stored copy and its timestamp.
+    """
+    if content.discussion_comments_updated_at is None:
+        comments = fetch_discussion_comments(content.discussion_link)
+        _store(content.id, comments)
+        return comments
+
+    age = (datetime.now(config.PH_TZ) - content.discussion_comments_updated_at).total_seconds()
+    if age > config.DISCUSSION_COMMENTS_TTL_SECONDS:
+        with _refreshing_lock:
+            schedule = content.id not in _refreshing
+            _refreshing.add(content.id)
+        if schedule:
+            executor.submit(_refresh, content.id, content.discussion_link)
+    return content.discussion_comments
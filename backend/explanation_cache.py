@@ -0,0 +1,78 @@
+# explanation_cache.py
+
+from collections import OrderedDict
+import hashlib
+import threading
+import unicodedata
+from sqlalchemy.dialects.postgresql import insert
+from db import db
+from models import FurtherExplanationCache, FurtherExplanation
+import config
+
+# Explanations depend only on the prompt and the model, so identical questions in any quiz set,
+# for any user, share one LLM answer
+
+def normalize_prompt(prompt):
+    return ' '.join(unicodedata.normalize('NFC', prompt).split())
+
+def prompt_hash(prompt, model):
+    return hashlib.sha256(f"{model}\n{normalize_prompt(prompt)}".encode('utf-8')).hexdigest()
+
+class ExplanationLRU:
+    """In-process LRU of explanations by prompt hash, bounded by entry count."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            explanation = self.entries.get(key)
+            if explanation is not None:
+                self.entries.move_to_end(key)
+            return explanation
+
+    def put(self, key, explanation):
+        with self.lock:
+            self.entries[key] = explanation
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+memory_cache = ExplanationLRU(config.FURTHER_EXPLANATION_CACHE_SIZE)
+
+def get_cached_explanation(key):
+    explanation = memory_cache.get(key)
+    if explanation is None:
+        explanation = db.session.query(FurtherExplanationCache.explanation).filter_by(prompt_hash=key).scalar()
+        if explanation is not None:
+            memory_cache.put(key, explanation)
+    return explanation
+
+def store_explanation(key, model, explanation, replace=False):
+    # Concurrent misses for the same prompt both call the LLM; the first answer stored wins.
+    # `replace` is for explicit regenerations, whose answer should supersede the cached one.
+    statement = insert(FurtherExplanationCache).values(prompt_hash=key, model=model, explanation=explanation)
+    if replace:
+        statement = statement.on_conflict_do_update(index_elements=['prompt_hash'],
+                                                    set_={'explanation': explanation, 'model': model})
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=['prompt_hash'])
+    stored = db.session.execute(statement.returning(FurtherExplanationCache.prompt_hash)).scalar()
+    db.session.commit()
+    if stored:
+        memory_cache.put(key, explanation)
+
+def save_further_explanation(question_id, explanation, replace=False):
+    # A question keeps one further explanation: when a job and the quiz page save one at the same
+    # time the first wins, unless `replace` says the user asked for this one. Returns whether it
+    # was written.
+    statement = insert(FurtherExplanation).values(question_id=question_id, explanation=explanation)
+    if replace:
+        statement = statement.on_conflict_do_update(index_elements=['question_id'], set_={'explanation': explanation})
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=['question_id'])
+    saved = db.session.execute(statement.returning(FurtherExplanation.id)).scalar()
+    db.session.commit()
+    return saved is not None
@@ -0,0 +1,99 @@
+# explanation_jobs.py
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import logging
+import traceback
+from sqlalchemy import exists
+from app_init import app
+from db import db
+from models import ExplanationJob, FurtherExplanation, Question, QuestionContent
+from further_explanations import explain
+from explanation_cache import save_further_explanation
+import config
+
+logger = logging.getLogger(__name__)
+
+# Jobs run in the background so /api/pregenerateExplanations can return immediately
+executor = ThreadPoolExecutor(max_workers=config.EXPLANATION_JOB_WORKERS, thread_name_prefix='explanation-job')
+
+def _update(job_id, **values):
+    values['updated_at'] = datetime.now(config.PH_TZ)
+    ExplanationJob.query.filter_by(id=job_id).update(values)
+    db.session.commit()
+
+def select_questions(quiz_set_id, only_incorrect):
+    query = db.session.query(Question.id).filter(Question.quiz_set_id == quiz_set_id)
+    if only_incorrect:
+        # Same as the quiz page's "incorrect" filter: anything not answered correctly
+        query = query.filter(Question.user_selected_option.is_distinct_from(Question.answer))
+    return query
+
+def _explain_question(question_id):
+    with app.app_context():
+        # Check again here: the user may have opened this explanation since the job was queued
+        if db.session.query(exists().where(FurtherExplanation.question_id == question_id)).scalar():
+            return False
+        text, options, answer = (db.session.query(QuestionContent.text, QuestionContent.options, Question.answer)
+                                 .join(Question, Question.content_id == QuestionContent.id)
+                                 .filter(Question.id == question_id)
+                                 .one())
+        # Same prompt the quiz page sends, so both share explanation_cache entries
+        further_explanation, _ = explain(text, options, answer)
+        # False if the quiz page saved one while this was generating
+        return save_further_explanation(question_id, further_explanation)
+
+def run_explanation_job(job_id):
+    with app.app_context():
+        try:
+            job = ExplanationJob.query.get(job_id)
+            questions = select_questions(job.quiz_set_id, job.only_incorrect)
+            question_ids = [question_id for (question_id,) in questions.filter(
+                ~exists().where(FurtherExplanation.question_id == Question.id)).order_by(Question.order)]
+            skipped = questions.count() - len(question_ids)
+            now = datetime.now(config.PH_TZ)
+            _update(job_id, status='running', started_at=now, questions_total=len(question_ids) + skipped, questions_skipped=skipped)
+
+            with ThreadPoolExecutor(max_workers=config.EXPLANATION_JOB_CONCURRENCY, thread_name_prefix='explanation') as pool:
+                futures = {pool.submit(_explain_question, question_id): question_id for question_id in question_ids}
+                for future in as_completed(futures):
+                    try:
+                        generated = future.result()
+                    except Exception as e:
+                        logger.warning(f"Explanation job {job_id} failed on question {futures[future]}: {e}")
+                        _update(job_id, questions_failed=ExplanationJob.questions_failed + 1)
+                        continue
+                    if generated:
+                        _update(job_id, questions_done=ExplanationJob.questions_done + 1)
+                    else:
+                        _update(job_id, questions_skipped=ExplanationJob.questions_skipped + 1)
+            _update(job_id, status='completed', finished_at=datetime.now(config.PH_TZ))
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Explanation job {job_id} failed: {e}\n{traceback.format_exc()}")
+            _update(job_id, status='failed', error=str(e), finished_at=datetime.now(config.PH_TZ))
+
+def enqueue_explanation_job(quiz_set_id, user_id, only_incorrect):
+    job = ExplanationJob(quiz_set_id=quiz_set_id, user_id=user_id, only_incorrect=only_incorrect)
+    db.session.add(job)
+    db.session.commit()
+    executor.submit(run_explanation_job, job.id)
+    return job
+
+def explanation_job_status(job):
+    status = job.reported_status(config.EXPLANATION_JOB_STALE_SECONDS)
+
+    return {
+        'id': job.id,
+        'quiz_set_id': job.quiz_set_id,
+        'only_incorrect': job.only_incorrect,
+        'status': status,
+        'questions_total': job.questions_total,
+        'questions_done': job.questions_done,
+        'questions_skipped': job.questions_skipped,
+        'questions_failed': job.questions_failed,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -0,0 +1,94 @@
+# further_explanations.py
+
+import logging
+from g4f import Provider, ChatCompletion, models
+from langchain.llms.base import LLM
+from langchain_g4f import G4FLLM
+from explanation_cache import prompt_hash, get_cached_explanation, store_explanation
+from llm_providers import ProviderScheduler
+from app_init import app
+
+logger = logging.getLogger(__name__)
+
+providers_to_try = [
+    Provider.Bing,
+    Provider.ChatBase,
+    Provider.ChatgptAi,
+    Provider.FreeGpt,
+    Provider.GPTalk,
+    Provider.GptForLove,
+    Provider.GptGo,
+    Provider.You,
+]
+
+# One G4FLLM per (provider, model), reused across requests
+_llm_clients = {}
+
+def call_llm_provider(provider, prompt, model):
+    client: LLM = _llm_clients.get((provider, model))
+    if client is None:
+        client = _llm_clients[(provider, model)] = G4FLLM(model=model, provider=provider)
+    return client(prompt)
+
+def stream_llm_provider(provider, prompt, model):
+    if not getattr(provider, 'supports_stream', False):
+        return None
+    return ChatCompletion.create(model=model, provider=provider, stream=True,
+                                 messages=[{'role': 'user', 'content': prompt}])
+
+llm_scheduler = ProviderScheduler(providers_to_try, call_llm_provider, stream_llm_provider)
+
+def get_llm_response(prompt, model=None):
+    return llm_scheduler.run(prompt, model or models.gpt_35_turbo)
+
+def build_prompt(question_text, options, answer, explanation=''):
+    if explanation and explanation != "Explanation not found.":
+        return f"Given this explanation '{explanation}', explain further why {answer} is the answer to this following Question: {question_text} {' '.join(options)}. Explain it in the simplest and most appropriate way to understand, in Layman’s terms, why {answer} is the answer. Also, identify very brief keywords from the question_text that would serve as a memory guide or hint that would immediately kick in as to why we have the respective answer."
+    return f"Given this Question: {question_text} {' '.join(options)}, explain in the simplest and most appropriate way to understand, in Layman’s terms, why {answer} is the answer. Also, identify very brief keywords from the question_text that would serve as a memory guide or hint that would immediately kick in as to why we have the respective answer."
+
+def _prompt_and_key(question_text, options, answer, explanation):
+    model = models.gpt_35_turbo
+    prompt = build_prompt(question_text, options, answer, explanation)
+    return model, prompt, prompt_hash(prompt, model.name)
+
+def explain(question_text, options, answer, explanation='', refresh=False):
+    """Return (further explanation, whether it came from the cache) for a question, asking the
+    LLM providers only on a cache miss or when `refresh` asks for a new answer. Raises
+    AllProvidersFailed if none of them answer."""
+    model, prompt, key = _prompt_and_key(question_text, options, answer, explanation)
+    if not refresh:
+        further_explanation = get_cached_explanation(key)
+        if further_explanation is not None:
+            return further_explanation, True
+
+    further_explanation = get_llm_response(prompt, model)
+    store_explanation(key, model.name, further_explanation, replace=refresh)
+    return further_explanation, False
+
+def stream_explanation(question_text, options, answer, explanation='', refresh=False):
+    """Like explain, but yields (event, data) pairs as the answer is produced: 'chunk' events
+    with text, then 'done' (with the cache flag) or 'error'. The full text is cached once the
+    stream completes. Meant to be iterated after the request has ended, so the cache lookup
+    happens up front and the store opens its own app context."""
+    model, prompt, key = _prompt_and_key(question_text, options, answer, explanation)
+    cached = None if refresh else get_cached_explanation(key)
+
+    def events():
+        if cached is not None:
+            yield 'chunk', {'text': cached}
+            yield 'done', {'cached': True}
+            return
+        chunks = []
+        try:
+            for chunk in llm_scheduler.stream(prompt, model):
+                chunks.append(chunk)
+                yield 'chunk', {'text': chunk}
+        except Exception as e:
+            logger.warning(f"Error streaming further explanation: {e}")
+            yield 'error', {'error': 'Failed to get further explanation'}
+            return
+        with app.app_context():
+            store_explanation(key, model.name, ''.join(chunks), replace=refresh)
+        yield 'done', {'cached': False}
+
+    return events()
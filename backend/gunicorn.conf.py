@@ -0,0 +1,9 @@
+# gunicorn.conf.py
+
+import os
+
+# Threaded workers: scrape progress streams (/api/scrapeJobs/<id>/events) stay open for the
+# whole scrape, and each one only parks a thread on a queue, so one worker can hold hundreds
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', 1))
+threads = int(os.getenv('GUNICORN_THREADS', 256))
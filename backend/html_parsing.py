@@ -0,0 +1,73 @@
+# html_parsing.py
+
+import logging
+import threading
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+    FAST_PARSER = 'lxml'
+except ImportError:
+    FAST_PARSER = 'html.parser'
+
+# The elements each scraper reads, per site: (tag name, class). Pages are parsed only down to these
+# subtrees when `strain` is set; PinoyBix walks sibling paragraphs across the page, so it is parsed whole.
+PAGE_TARGETS = {
+    'indiabix': {'name': 'div', 'class_': 'bix-div-container', 'strain': True},
+    'discussion': {'name': 'div', 'class_': ['left-box', 'bix-sun-discussion'], 'strain': True},
+    'examveda': {'name': 'article', 'class_': 'question', 'strain': True},
+    'pinoybix': {'name': 'p', 'class_': None, 'strain': False},
+}
+
+# Sites whose first page has been checked against html.parser, and sites that fell back to it
+_verified_sites = set()
+_fallback_sites = set()
+_verify_lock = threading.Lock()
+
+def _targets(soup, target):
+    return soup.find_all(target['name'], class_=target['class_'])
+
+def _has_class(classes):
+    wanted = {classes} if isinstance(classes, str) else set(classes)
+    # While parsing, the strainer is handed the raw attribute ("question single-question"), not the
+    # list of classes find_all matches against, so a plain class_ would skip multi-class elements
+    return lambda value: value is not None and not wanted.isdisjoint(value.split())
+
+def page_strainer(site):
+    """The SoupStrainer that limits parsing to `site`'s target elements, or None to parse whole pages."""
+    target = PAGE_TARGETS[site]
+    if not target['strain']:
+        return None
+    return SoupStrainer(target['name'], class_=_has_class(target['class_']))
+
+def parse_page(content, site):
+    """Parse a scraped page for `site` with the fastest available parser.
+
+    The first page of each site is also parsed with html.parser; if the target elements
+    serialize differently, that site sticks to html.parser for the rest of the process.
+    A page where the fast parser finds no target elements is re-parsed with html.parser.
+    """
+    target = PAGE_TARGETS[site]
+    strainer = page_strainer(site)
+
+    if FAST_PARSER == 'html.parser' or site in _fallback_sites:
+        return BeautifulSoup(content, 'html.parser', parse_only=strainer)
+
+    soup = BeautifulSoup(content, FAST_PARSER, parse_only=strainer)
+    fast_targets = _targets(soup, target)
+
+    if site not in _verified_sites or not fast_targets:
+        reference = BeautifulSoup(content, 'html.parser', parse_only=strainer)
+        reference_targets = _targets(reference, target)
+        if [str(el) for el in fast_targets] != [str(el) for el in reference_targets]:
+            with _verify_lock:
+                if site not in _fallback_sites:
+                    logger.warning(f"{FAST_PARSER} output differs from html.parser for {site} pages; falling back to html.parser")
+                    _fallback_sites.add(site)
+            return reference
+        with _verify_lock:
+            _verified_sites.add(site)
+
+    return soup
@@ -0,0 +1,36 @@
+# http_client.py
+
+from random import choice
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+import config
+
+class ScraperClient:
+    """HTTP client shared by the scrapers.
+
+    One requests.Session keeps a pool of keep-alive connections per host, asks for
+    compressed responses, applies connect/read timeouts and rotates the User-Agent.
+    """
+
+    def __init__(self, pool_hosts=None, pool_size=None, timeout=None, user_agents=None):
+        self.timeout = timeout or (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+        self.user_agents = user_agents or config.headers_list
+
+        adapter = HTTPAdapter(pool_connections=pool_hosts or config.HTTP_POOL_HOSTS,
+                              pool_maxsize=pool_size or config.SCRAPE_PER_HOST_LIMIT)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.verify = False
+        # gzip/deflate, plus br when brotli is installed
+        self.session.headers.update(make_headers(keep_alive=True, accept_encoding=True))
+
+    def get(self, url, headers=None, **kwargs):
+        request_headers = {'User-Agent': choice(self.user_agents)}
+        request_headers.update(headers or {})
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, headers=request_headers, **kwargs)
+
+# Default client used when a scraper isn't given one
+client = ScraperClient()
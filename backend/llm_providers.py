@@ -0,0 +1,290 @@
+# llm_providers.py
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import logging
+import queue
+import statistics
+import threading
+import time
+import config
+
+logger = logging.getLogger(__name__)
+
+class AllProvidersFailed(Exception):
+    pass
+
+def provider_name(provider):
+    return getattr(provider, '__name__', None) or str(provider)
+
+class ProviderHealth:
+    """Rolling latency/error window and circuit breaker state for one provider."""
+
+    def __init__(self, provider, window):
+        self.provider = provider
+        self.name = provider_name(provider)
+        self.samples = deque(maxlen=window)  # (seconds, succeeded)
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.opened_at = None  # Set while the breaker is open
+        self.trial = None  # (attempt id, start time) of the half-open trial while it runs
+        self.in_flight = {}  # attempt id -> start time
+        self.slots = threading.BoundedSemaphore(config.LLM_PROVIDER_CONCURRENCY)
+
+    def error_rate(self):
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, succeeded in self.samples if not succeeded) / len(self.samples)
+
+    def mean_latency(self, now=None):
+        # Attempts still running count with the time they've taken so far, so a provider that
+        # hangs on its first request doesn't keep ranking as untried
+        latencies = [seconds for seconds, _ in self.samples]
+        if now is not None:
+            latencies.extend(now - started for started in self.in_flight.values())
+        return statistics.fmean(latencies) if latencies else 0.0
+
+    def score(self, now=None):
+        # Lower is better: expected seconds to an answer, with each recent failure costing a penalty.
+        # Untried providers score 0 so they get a first chance in their configured order.
+        return self.mean_latency(now) + self.error_rate() * config.LLM_ERROR_PENALTY_SECONDS
+
+    def state(self, now):
+        if self.opened_at is None:
+            return 'closed'
+        # A trial that hasn't reported back within a cooldown is given up on, and another one allowed
+        if self.trial is not None and now - self.trial[1] < config.LLM_BREAKER_COOLDOWN_SECONDS:
+            return 'open'
+        if now - self.opened_at >= config.LLM_BREAKER_COOLDOWN_SECONDS:
+            return 'half_open'
+        return 'open'
+
+class ProviderScheduler:
+    """Runs a prompt against a list of providers, healthiest first.
+
+    `call(provider, prompt, *args)` does one request and returns the text; anything raised, or an
+    empty answer, counts as a failure. If the first attempt hasn't answered within
+    LLM_HEDGE_DELAY_SECONDS a second provider is raced against it and the first success wins.
+    A provider failing LLM_BREAKER_FAILURES times in a row is skipped for
+    LLM_BREAKER_COOLDOWN_SECONDS, after which the next attempt launched on it is a trial that
+    decides whether it comes back.
+    At most LLM_PROVIDER_CONCURRENCY requests run against one provider at a time; further ones
+    wait for a slot.
+    `stream_call(provider, prompt, *args)`, if given, returns an iterator of text chunks, or None
+    for providers that can't stream. `clock` is injectable so tests can drive the breaker with
+    fake providers.
+    """
+
+    def __init__(self, providers, call, stream_call=None, clock=time.monotonic, executor=None):
+        self.call = call
+        self.stream_call = stream_call
+        self.clock = clock
+        self.health = [ProviderHealth(provider, config.LLM_PROVIDER_WINDOW) for provider in providers]
+        self.executor = executor or ThreadPoolExecutor(max_workers=config.LLM_WORKERS, thread_name_prefix='llm')
+        self.lock = threading.Lock()
+
+    def ordered(self):
+        """Providers to try for one request, best first. Open breakers are left out unless
+        every provider is open, in which case the request tries them anyway. Being listed
+        doesn't make a half-open provider's trial; claim() does that when an attempt launches."""
+        now = self.clock()
+        with self.lock:
+            ranked = sorted(enumerate(self.health), key=lambda item: (item[1].score(now), item[0]))
+            available = [health for _, health in ranked if health.state(now) != 'open']
+            return available or [health for _, health in ranked]
+
+    def claim(self, health):
+        """Called just before launching an attempt on `health`; the first attempt on a half-open
+        provider becomes its trial. Returns the attempt id, or None to skip the provider because
+        its breaker is open (perhaps another request just took the trial) while another's isn't."""
+        attempt = object()
+        now = self.clock()
+        with self.lock:
+            state = health.state(now)
+            if state == 'half_open':
+                health.trial = (attempt, now)
+            elif state == 'open' and any(other.state(now) != 'open' for other in self.health):
+                return None
+        return attempt
+
+    def release(self, health, attempt):
+        # For a claimed attempt that didn't run, so it doesn't hold the provider's trial
+        with self.lock:
+            health.in_flight.pop(attempt, None)
+            if health.trial is not None and health.trial[0] is attempt:
+                health.trial = None
+
+    def _record(self, health, attempt, seconds, succeeded):
+        with self.lock:
+            health.in_flight.pop(attempt, None)
+            if health.trial is not None and health.trial[0] is attempt:
+                health.trial = None
+            health.samples.append((seconds, succeeded))
+            health.requests += 1
+            if succeeded:
+                health.consecutive_failures = 0
+                health.opened_at = None
+                return
+            health.failures += 1
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= config.LLM_BREAKER_FAILURES:
+                if health.opened_at is None:
+                    logger.warning(f"Circuit breaker opened for LLM provider {health.name} "
+                                   f"after {health.consecutive_failures} failures")
+                health.opened_at = self.clock()
+
+    def _attempt(self, health, attempt, prompt, args):
+        with health.slots:
+            started = self.clock()
+            with self.lock:
+                health.in_flight[attempt] = started
+            try:
+                result = self.call(health.provider, prompt, *args)
+                if not result:
+                    raise ValueError("empty response")
+            except Exception:
+                self._record(health, attempt, self.clock() - started, False)
+                raise
+            self._record(health, attempt, self.clock() - started, True)
+            return result
+
+    def run(self, prompt, *args):
+        candidates = iter(self.ordered())
+        deadline = self.clock() + config.LLM_REQUEST_TIMEOUT_SECONDS
+        pending = {}
+        errors = []
+        in_flight = 1  # Raised to 2 once the hedge delay passes
+        exhausted = False  # Set once no candidate is left to launch
+
+        def launch():
+            nonlocal exhausted
+            for health in candidates:
+                attempt = self.claim(health)
+                if attempt is not None:
+                    pending[self.executor.submit(self._attempt, health, attempt, prompt, args)] = health
+                    return
+            exhausted = True
+
+        launch()
+        while pending:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                break
+            can_hedge = in_flight == 1 and not exhausted
+            done, _ = wait(pending, timeout=min(config.LLM_HEDGE_DELAY_SECONDS, remaining) if can_hedge else remaining,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                if can_hedge:
+                    in_flight = 2
+                    launch()
+                continue
+            for future in done:
+                health = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    logger.warning(f"LLM provider {health.name} failed: {e}")
+                    errors.append(f"{health.name}: {e}")
+            while len(pending) < in_flight and not exhausted:
+                launch()
+
+        if pending:
+            errors.extend(f"{health.name}: no answer within {config.LLM_REQUEST_TIMEOUT_SECONDS}s" for health in pending.values())
+        raise AllProvidersFailed("All providers failed: " + ("; ".join(errors) or "none available"))
+
+    def _stream_attempt(self, health, attempt, prompt, args, output, cancelled):
+        """Runs on the executor: reads one provider's stream into `output` as ('chunk', text)
+        items, then ('done', None), ('error', exception) or ('unsupported', None). The slot is
+        held while the provider streams, not while the client reads, and reading stops once
+        `cancelled` is set."""
+        with health.slots:
+            started = self.clock()
+            with self.lock:
+                health.in_flight[attempt] = started
+            chunks = None
+            try:
+                chunks = self.stream_call(health.provider, prompt, *args)
+                if chunks is None:
+                    self.release(health, attempt)
+                    output.put(('unsupported', None))
+                    return
+                chunks = iter(chunks)
+                sent = False
+                for chunk in chunks:
+                    if cancelled.is_set():
+                        break
+                    if chunk:
+                        output.put(('chunk', chunk))
+                        sent = True
+                if not sent:
+                    # Nothing at all, or nothing before the reader gave up on it
+                    raise ValueError("no text streamed")
+            except Exception as e:
+                self._record(health, attempt, self.clock() - started, False)
+                output.put(('error', e))
+                return
+            finally:
+                getattr(chunks, 'close', lambda: None)()
+            self._record(health, attempt, self.clock() - started, True)
+            output.put(('done', None))
+
+    def stream(self, prompt, *args):
+        """Yield the answer in chunks from the healthiest provider that can stream. Providers
+        stream on the executor, and one that fails or sends no text within
+        LLM_REQUEST_TIMEOUT_SECONDS is recorded and the next one tried; once text has been sent
+        there is no failover, but the whole answer must still arrive within that time. Streams
+        aren't hedged. With no streaming provider left, the whole answer from run() is yielded
+        as one chunk."""
+        for health in (self.ordered() if self.stream_call else []):
+            attempt = self.claim(health)
+            if attempt is None:
+                continue
+            deadline = self.clock() + config.LLM_REQUEST_TIMEOUT_SECONDS
+            output, cancelled = queue.Queue(), threading.Event()
+            self.executor.submit(self._stream_attempt, health, attempt, prompt, args, output, cancelled)
+
+            def next_item():
+                return output.get(timeout=max(0.0, deadline - self.clock()))
+
+            try:
+                kind, value = next_item()
+            except queue.Empty:
+                cancelled.set()
+                logger.warning(f"LLM provider {health.name} sent nothing within {config.LLM_REQUEST_TIMEOUT_SECONDS}s")
+                continue
+            if kind == 'error':
+                logger.warning(f"LLM provider {health.name} failed to stream: {value!r}")
+            if kind != 'chunk':
+                continue
+
+            # The client going away (GeneratorExit) also stops the provider's stream
+            try:
+                while kind == 'chunk':
+                    yield value
+                    kind, value = next_item()
+            except queue.Empty:
+                raise AllProvidersFailed(f"{health.name}: answer not finished within {config.LLM_REQUEST_TIMEOUT_SECONDS}s")
+            finally:
+                cancelled.set()
+            if kind == 'error':
+                raise value
+            return
+
+        yield self.run(prompt, *args)
+
+    def stats(self):
+        now = self.clock()
+        with self.lock:
+            return [{
+                'provider': health.name,
+                'state': health.state(now),
+                'score': round(health.score(now), 3),
+                'in_flight': len(health.in_flight),
+                'requests': health.requests,
+                'failures': health.failures,
+                'consecutive_failures': health.consecutive_failures,
+                'window_size': len(health.samples),
+                'window_error_rate': round(health.error_rate(), 3),
+                'window_mean_latency_ms': round(health.mean_latency() * 1000),
+            } for health in sorted(self.health, key=lambda health: health.score(now))]
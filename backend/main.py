@@ -1,8 +1,10 @@
 # main.py
 
-from app_init import app, db
+from app_init import app
+from quiz_set_deletion import resume_quiz_set_deletions
+
+# Quiz sets whose background deletion was cut short by a restart are finished off here
+resume_quiz_set_deletions()
 
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""Baseline schema
+
+Creates the schema that db.create_all() and init.sql used to set up. Everything is
+conditional: missing tables are created and columns added since a table first shipped
+are filled in. A questions table from before question content was shared still
+carries its own text/options/explanation columns; its content is moved into
+question_contents here, so every database leaves this revision with the tables and
+columns the later migrations expect. Column types and defaults of tables that already
+existed are not rewritten.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+import hashlib
+import json
+import logging
+import pickle
+import re
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+TABLES = """
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    github_id VARCHAR(50) UNIQUE,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(120) UNIQUE,
+    password_hash VARCHAR(255),
+    avatar_url VARCHAR(255)
+);
+
+CREATE TABLE IF NOT EXISTS quiz_sets (
+    id VARCHAR(36) PRIMARY KEY,
+    title VARCHAR(120) NOT NULL,
+    urls TEXT,
+    raw_urls TEXT,
+    eye_icon_state BOOLEAN DEFAULT TRUE,
+    lock_state BOOLEAN DEFAULT TRUE,
+    score INTEGER,
+    attempts INTEGER DEFAULT 0,
+    finished BOOLEAN DEFAULT FALSE,
+    progress INTEGER DEFAULT 0,
+    last_updated TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    sort_order VARCHAR(4) DEFAULT 'desc',
+    current_question_index INTEGER DEFAULT 0,
+    current_filter VARCHAR(20) DEFAULT 'all',
+    user_id INTEGER NOT NULL REFERENCES users(id)
+);
+
+CREATE TABLE IF NOT EXISTS question_contents (
+    id SERIAL PRIMARY KEY,
+    content_hash VARCHAR(64) NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    options BYTEA NOT NULL,
+    url VARCHAR(255),
+    explanation TEXT,
+    discussion_link VARCHAR(255),
+    discussion_comments TEXT
+);
+
+CREATE TABLE IF NOT EXISTS questions (
+    id SERIAL PRIMARY KEY,
+    content_id INTEGER NOT NULL REFERENCES question_contents(id),
+    answer VARCHAR(10) NOT NULL,
+    quiz_set_id VARCHAR(36) NOT NULL REFERENCES quiz_sets(id),
+    favorite BOOLEAN DEFAULT FALSE,
+    user_selected_option VARCHAR(10),
+    "order" INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS editor_contents (
+    id VARCHAR(36) PRIMARY KEY,
+    content TEXT NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users(id)
+);
+
+CREATE TABLE IF NOT EXISTS further_explanations (
+    id SERIAL PRIMARY KEY,
+    question_id INTEGER NOT NULL REFERENCES questions(id),
+    explanation TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS attempts (
+    id SERIAL PRIMARY KEY,
+    quiz_set_id VARCHAR(36) NOT NULL REFERENCES quiz_sets(id),
+    score INTEGER NOT NULL,
+    timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    quiz_set_id VARCHAR(36) NOT NULL REFERENCES quiz_sets(id),
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    pages_total INTEGER NOT NULL DEFAULT 0,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    pages_failed INTEGER NOT NULL DEFAULT 0,
+    failed_urls TEXT,
+    questions_inserted INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+"""
+
+# Columns added after their table first shipped
+ADDED_COLUMNS = [
+    ('question_contents', 'discussion_comments_updated_at', 'TIMESTAMP WITH TIME ZONE'),
+    ('scrape_jobs', 'cache_hits', 'INTEGER NOT NULL DEFAULT 0'),
+    ('scrape_jobs', 'cache_revalidated', 'INTEGER NOT NULL DEFAULT 0'),
+    ('scrape_jobs', 'cache_misses', 'INTEGER NOT NULL DEFAULT 0'),
+]
+
+PROGRESS_COUNTERS = ('total_questions', 'answered_count', 'correct_count')
+
+# Content columns questions carried before they referenced question_contents
+CONTENT_COLUMNS = ('text', 'options', 'url', 'explanation', 'discussion_link', 'discussion_comments')
+
+BATCH_SIZE = 1000
+
+
+def _normalize(value):
+    return re.sub(r'\s+', ' ', value or '').strip()
+
+
+def _content_hash(question_text, options, answer):
+    # Must match question_dedup.content_hash, so later scrapes find the contents stored here
+    key = [_normalize(question_text), [_normalize(option) for option in options or []], _normalize(answer)]
+    return hashlib.sha256(json.dumps(key, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _content_bytes(connection, table):
+    return connection.execute(sa.text(
+        f"SELECT COALESCE(SUM(octet_length(text) + octet_length(options) + COALESCE(octet_length(explanation), 0) "
+        f"+ COALESCE(octet_length(discussion_comments), 0)), 0) FROM {table}"
+    )).scalar()
+
+
+def _split_question_contents(connection):
+    """Point every question at a shared question_contents row holding its content (options stay
+    pickled; 0003 converts them) and drop the content columns from questions."""
+    op.execute("ALTER TABLE questions ADD COLUMN IF NOT EXISTS content_id INTEGER REFERENCES question_contents(id)")
+    bytes_before = _content_bytes(connection, 'questions') + _content_bytes(connection, 'question_contents')
+
+    migrated, after_id = 0, 0
+    while True:
+        rows = connection.execute(sa.text(
+            "SELECT id, text, options, answer, url, explanation, discussion_link, discussion_comments "
+            "FROM questions WHERE id > :after_id ORDER BY id LIMIT :batch_size"
+        ), {'after_id': after_id, 'batch_size': BATCH_SIZE}).mappings().all()
+        if not rows:
+            break
+
+        hashes = [_content_hash(row['text'], pickle.loads(bytes(row['options'])), row['answer']) for row in rows]
+        contents = {}
+        for row, row_hash in zip(rows, hashes):
+            content = contents.setdefault(row_hash, dict(
+                {column: row[column] for column in CONTENT_COLUMNS}, options=bytes(row['options']), content_hash=row_hash
+            ))
+            # Keep comments that were already fetched for any of the duplicates
+            content['discussion_comments'] = content['discussion_comments'] or row['discussion_comments']
+
+        connection.execute(sa.text(
+            "INSERT INTO question_contents (content_hash, text, options, url, explanation, discussion_link, discussion_comments) "
+            "VALUES (:content_hash, :text, :options, :url, :explanation, :discussion_link, :discussion_comments) "
+            "ON CONFLICT (content_hash) DO UPDATE "
+            "SET discussion_comments = COALESCE(question_contents.discussion_comments, EXCLUDED.discussion_comments)"
+        ), list(contents.values()))
+        connection.execute(sa.text(
+            "UPDATE questions SET content_id = question_contents.id "
+            "FROM unnest(CAST(:ids AS INTEGER[]), CAST(:hashes AS VARCHAR[])) AS batch (id, content_hash) "
+            "JOIN question_contents ON question_contents.content_hash = batch.content_hash "
+            "WHERE questions.id = batch.id"
+        ), {'ids': [row['id'] for row in rows], 'hashes': hashes})
+
+        migrated += len(rows)
+        after_id = rows[-1]['id']
+        logger.info(f"Moved the content of {migrated} questions into question_contents")
+
+    bytes_after = _content_bytes(connection, 'question_contents')
+    op.execute("ALTER TABLE questions ALTER COLUMN content_id SET NOT NULL")
+    for column in CONTENT_COLUMNS:
+        op.execute(f"ALTER TABLE questions DROP COLUMN {column}")
+    logger.info(f"Stored the content of {migrated} questions as "
+                f"{connection.execute(sa.text('SELECT COUNT(*) FROM question_contents')).scalar()} shared rows: "
+                f"content bytes {bytes_before} -> {bytes_after} ({bytes_before - bytes_after} reclaimed; "
+                f"VACUUM FULL questions returns the space to disk)")
+
+
+def upgrade():
+    connection = op.get_bind()
+    op.execute(TABLES)
+    for table, column, definition in ADDED_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {definition}")
+
+    question_columns = {column['name'] for column in sa.inspect(connection).get_columns('questions')}
+    if 'text' in question_columns:
+        _split_question_contents(connection)
+
+    # Quiz sets that predate the progress counters get them counted from their questions
+    existing = {column['name'] for column in sa.inspect(connection).get_columns('quiz_sets')}
+    if not set(PROGRESS_COUNTERS) <= existing:
+        for column in PROGRESS_COUNTERS:
+            op.execute(f"ALTER TABLE quiz_sets ADD COLUMN IF NOT EXISTS {column} INTEGER NOT NULL DEFAULT 0")
+        op.execute("""
+            UPDATE quiz_sets
+            SET total_questions = counts.total_questions,
+                answered_count = counts.answered_count,
+                correct_count = counts.correct_count
+            FROM (
+                SELECT quiz_set_id,
+                       COUNT(*) AS total_questions,
+                       COUNT(user_selected_option) AS answered_count,
+                       COUNT(*) FILTER (WHERE user_selected_option = answer) AS correct_count
+                FROM questions
+                GROUP BY quiz_set_id
+            ) AS counts
+            WHERE quiz_sets.id = counts.quiz_set_id
+        """)
+
+
+def downgrade():
+    # The baseline predates migrations; there is nothing to go back to
+    pass
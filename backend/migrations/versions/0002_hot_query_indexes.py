@@ -0,0 +1,43 @@
+"""Indexes for the hot query patterns
+
+Every quiz page filters questions by quiz set (ordered, or on favorite), the dashboard
+filters quiz sets by user and attempts by quiz set, and further explanations are looked
+up by question. The (quiz_set_id, ...) composites also serve plain quiz_set_id lookups,
+so questions get no separate single-column index. Built CONCURRENTLY so existing tables
+keep taking writes while they are created.
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_hot_query_indexes'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_questions_quiz_set_id_order', 'questions', ['quiz_set_id', 'order']),
+    ('ix_questions_quiz_set_id_favorite', 'questions', ['quiz_set_id', 'favorite']),
+    ('ix_further_explanations_question_id', 'further_explanations', ['question_id']),
+    ('ix_attempts_quiz_set_id', 'attempts', ['quiz_set_id']),
+    ('ix_quiz_sets_user_id', 'quiz_sets', ['user_id']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,87 @@
+"""Store question options as JSONB instead of pickled BYTEA
+
+Runs online: options are copied into a new JSONB column in small batches, each in its own
+transaction, while the old column keeps serving reads. Rows written while the copy runs
+are picked up by the final swap, which briefly locks question_contents to drop the old
+column and rename the new one into place.
+
+Revision ID: 0003_options_jsonb
+Revises: 0002_hot_query_indexes
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+import json
+import logging
+import pickle
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_options_jsonb'
+down_revision = '0002_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+BATCH_SIZE = 1000
+
+
+def _convert_batch(connection, after_id):
+    rows = connection.execute(sa.text(
+        "SELECT id, options FROM question_contents "
+        "WHERE id > :after_id AND options_json IS NULL ORDER BY id LIMIT :batch_size"
+    ), {'after_id': after_id, 'batch_size': BATCH_SIZE}).all()
+    if not rows:
+        return None
+    connection.execute(sa.text(
+        "UPDATE question_contents SET options_json = CAST(batch.options AS JSONB) "
+        "FROM unnest(CAST(:ids AS INTEGER[]), CAST(:options AS TEXT[])) AS batch (id, options) "
+        "WHERE question_contents.id = batch.id"
+    ), {'ids': [row.id for row in rows], 'options': [json.dumps(pickle.loads(bytes(row.options))) for row in rows]})
+    return rows[-1].id
+
+
+def upgrade():
+    connection = op.get_bind()
+    column_type = next(column['type'] for column in sa.inspect(connection).get_columns('question_contents')
+                       if column['name'] == 'options')
+    if isinstance(column_type, JSONB):
+        return
+
+    op.execute("ALTER TABLE question_contents ADD COLUMN IF NOT EXISTS options_json JSONB")
+
+    # Each batch is a single UPDATE committed on its own, so readers and writers are never blocked for long
+    with op.get_context().autocommit_block():
+        converted, after_id = 0, 0
+        while True:
+            after_id = _convert_batch(connection, after_id)
+            if after_id is None:
+                break
+            converted += BATCH_SIZE
+            logger.info(f"Converted options for about {converted} question contents")
+
+    # Swap the columns, converting anything written since the batches ran
+    op.execute("LOCK TABLE question_contents IN SHARE ROW EXCLUSIVE MODE")
+    after_id = 0
+    while after_id is not None:
+        after_id = _convert_batch(connection, after_id)
+    op.execute("ALTER TABLE question_contents DROP COLUMN options")
+    op.execute("ALTER TABLE question_contents RENAME COLUMN options_json TO options")
+    op.execute("ALTER TABLE question_contents ALTER COLUMN options SET NOT NULL")
+
+
+def downgrade():
+    connection = op.get_bind()
+    op.execute("ALTER TABLE question_contents ADD COLUMN options_pickle BYTEA")
+    rows = connection.execute(sa.text("SELECT id, options FROM question_contents")).all()
+    if rows:
+        connection.execute(
+            sa.text("UPDATE question_contents SET options_pickle = :options WHERE id = :id"),
+            [{'id': row.id, 'options': pickle.dumps(row.options)} for row in rows]
+        )
+    op.execute("ALTER TABLE question_contents DROP COLUMN options")
+    op.execute("ALTER TABLE question_contents RENAME COLUMN options_pickle TO options")
+    op.execute("ALTER TABLE question_contents ALTER COLUMN options SET NOT NULL")
@@ -0,0 +1,24 @@
+"""Add quiz_sets.version for conditional GETs
+
+Revision ID: 0004_quiz_set_version
+Revises: 0003_options_jsonb
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_quiz_set_version'
+down_revision = '0003_options_jsonb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE quiz_sets ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0")
+
+
+def downgrade():
+    op.drop_column('quiz_sets', 'version')
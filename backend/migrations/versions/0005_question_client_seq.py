@@ -0,0 +1,27 @@
+"""Track the last client write per question for batched updates
+
+Revision ID: 0005_question_client_seq
+Revises: 0004_quiz_set_version
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_question_client_seq'
+down_revision = '0004_quiz_set_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable with no default, so this is a catalog-only change on a large questions table
+    op.execute("ALTER TABLE questions ADD COLUMN IF NOT EXISTS last_client_id VARCHAR(64)")
+    op.execute("ALTER TABLE questions ADD COLUMN IF NOT EXISTS last_client_seq BIGINT")
+
+
+def downgrade():
+    op.drop_column('questions', 'last_client_seq')
+    op.drop_column('questions', 'last_client_id')
@@ -0,0 +1,79 @@
+"""ON DELETE CASCADE for quiz set children and background deletion support
+
+Deleting a quiz set now removes its questions, their further explanations, attempts and
+scrape jobs in the database. The foreign keys are re-added NOT VALID and validated
+separately so existing rows are checked without blocking writes. questions.content_id and
+scrape_jobs.quiz_set_id get indexes so cascades and orphaned-content checks don't scan.
+
+Revision ID: 0006_cascading_deletes
+Revises: 0005_question_client_seq
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_cascading_deletes'
+down_revision = '0005_question_client_seq'
+branch_labels = None
+depends_on = None
+
+
+FOREIGN_KEYS = [
+    ('questions', 'quiz_set_id', 'quiz_sets'),
+    ('further_explanations', 'question_id', 'questions'),
+    ('attempts', 'quiz_set_id', 'quiz_sets'),
+    ('scrape_jobs', 'quiz_set_id', 'quiz_sets'),
+]
+
+INDEXES = [
+    ('ix_questions_content_id', 'questions', ['content_id']),
+    ('ix_scrape_jobs_quiz_set_id', 'scrape_jobs', ['quiz_set_id']),
+]
+
+
+def _foreign_key_names(table, column):
+    return op.get_bind().execute(sa.text("""
+        SELECT constraint_info.conname
+        FROM pg_constraint AS constraint_info
+        JOIN pg_attribute AS attribute
+          ON attribute.attrelid = constraint_info.conrelid AND attribute.attnum = ANY(constraint_info.conkey)
+        WHERE constraint_info.contype = 'f'
+          AND constraint_info.conrelid = CAST(:table AS regclass)
+          AND attribute.attname = :column
+    """), {'table': table, 'column': column}).scalars().all()
+
+
+def _replace_foreign_keys(on_delete):
+    for table, column, referenced in FOREIGN_KEYS:
+        # Databases built by create_all or init.sql may name the constraint differently
+        drops = ''.join(f'DROP CONSTRAINT "{existing}", ' for existing in _foreign_key_names(table, column))
+        op.execute(f'ALTER TABLE {table} {drops}ADD CONSTRAINT {table}_{column}_fkey FOREIGN KEY ({column}) '
+                   f'REFERENCES {referenced}(id){on_delete} NOT VALID')
+
+
+def _validate_foreign_keys():
+    # Run after the NOT VALID constraints are committed, so only a SHARE UPDATE EXCLUSIVE lock is held
+    with op.get_context().autocommit_block():
+        for table, column, referenced in FOREIGN_KEYS:
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_fkey')
+
+
+def upgrade():
+    op.execute("ALTER TABLE quiz_sets ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITH TIME ZONE")
+    _replace_foreign_keys(' ON DELETE CASCADE')
+    _validate_foreign_keys()
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    _replace_foreign_keys('')
+    _validate_foreign_keys()
+    op.drop_column('quiz_sets', 'deleted_at')
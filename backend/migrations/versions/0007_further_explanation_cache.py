@@ -0,0 +1,31 @@
+"""Add further_explanation_cache for prompt-keyed LLM answers
+
+Revision ID: 0007_further_explanation_cache
+Revises: 0006_cascading_deletes
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_further_explanation_cache'
+down_revision = '0006_cascading_deletes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS further_explanation_cache (
+            prompt_hash VARCHAR(64) PRIMARY KEY,
+            model VARCHAR(64) NOT NULL,
+            explanation TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def downgrade():
+    op.drop_table('further_explanation_cache')
@@ -0,0 +1,42 @@
+"""Add explanation_jobs for background further-explanation generation
+
+Revision ID: 0008_explanation_jobs
+Revises: 0007_further_explanation_cache
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_explanation_jobs'
+down_revision = '0007_further_explanation_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS explanation_jobs (
+            id VARCHAR(36) PRIMARY KEY,
+            quiz_set_id VARCHAR(36) NOT NULL REFERENCES quiz_sets(id) ON DELETE CASCADE,
+            user_id INTEGER NOT NULL REFERENCES users(id),
+            only_incorrect BOOLEAN NOT NULL DEFAULT FALSE,
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
+            questions_total INTEGER NOT NULL DEFAULT 0,
+            questions_done INTEGER NOT NULL DEFAULT 0,
+            questions_skipped INTEGER NOT NULL DEFAULT 0,
+            questions_failed INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP WITH TIME ZONE,
+            updated_at TIMESTAMP WITH TIME ZONE,
+            finished_at TIMESTAMP WITH TIME ZONE
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_explanation_jobs_quiz_set_id ON explanation_jobs (quiz_set_id)")
+
+
+def downgrade():
+    op.drop_table('explanation_jobs')
@@ -0,0 +1,29 @@
+"""Order writes to a question by a per-question version instead of a per-client sequence
+
+Revision ID: 0009_question_version
+Revises: 0008_explanation_jobs
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_question_version'
+down_revision = '0008_explanation_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A constant default is stored in the catalog, so this doesn't rewrite the questions table
+    op.execute("ALTER TABLE questions ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0")
+    op.execute("ALTER TABLE questions DROP COLUMN IF EXISTS last_client_seq")
+    op.execute("ALTER TABLE questions DROP COLUMN IF EXISTS last_client_id")
+
+
+def downgrade():
+    op.add_column('questions', sa.Column('last_client_id', sa.String(length=64), nullable=True))
+    op.add_column('questions', sa.Column('last_client_seq', sa.BigInteger(), nullable=True))
+    op.drop_column('questions', 'version')
@@ -0,0 +1,45 @@
+"""One further explanation per question
+
+Background explanation jobs and the quiz page can both save an explanation for the same
+question at once; a unique index on question_id lets the second insert be skipped instead
+of adding a duplicate row. Existing duplicates are removed first, keeping the oldest row,
+which is the one getFurtherExplanation has been returning. The index is built CONCURRENTLY
+under a temporary name and then takes over the old index's name.
+
+Revision ID: 0010_unique_further_explanations
+Revises: 0009_question_version
+Create Date: 2026-10-18 18:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010_unique_further_explanations'
+down_revision = '0009_question_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        DELETE FROM further_explanations
+        WHERE id IN (SELECT id FROM (
+            SELECT id, row_number() OVER (PARTITION BY question_id ORDER BY id) AS position
+            FROM further_explanations) AS ranked
+        WHERE position > 1)
+    """)
+    with op.get_context().autocommit_block():
+        op.execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_further_explanations_question_id_unique "
+                   "ON further_explanations (question_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_further_explanations_question_id")
+        op.execute("ALTER INDEX ix_further_explanations_question_id_unique RENAME TO ix_further_explanations_question_id")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_further_explanations_question_id_plain "
+                   "ON further_explanations (question_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_further_explanations_question_id")
+        op.execute("ALTER INDEX ix_further_explanations_question_id_plain RENAME TO ix_further_explanations_question_id")
@@ -2,7 +2,11 @@
 
 from db import db
 import uuid
+from sqlalchemy import select, func, case
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.ext.associationproxy import association_proxy
 from datetime import datetime
 from pytz import timezone
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -41,10 +45,32 @@ class QuizSet(db.Model):
     sort_order = db.Column(db.String(4), default='desc')
     current_question_index = db.Column(db.Integer, default=0)
     current_filter = db.Column(db.String(20), default='all')
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    # Maintained by progress_counters on every question write; `flask rebuild-progress-counters` recounts them
+    total_questions = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    answered_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    correct_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Bumped by every write to the quiz set's content; the ETag of its read endpoints
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Set while quiz_set_deletion removes a large set in the background; the set is hidden meanwhile
+    deleted_at = db.Column(db.DateTime(timezone=True), nullable=True)
     
-    questions = db.relationship('Question', backref='quiz_set', lazy=True, cascade="all, delete-orphan")
-    attempts_list = db.relationship('Attempt', backref='quiz_set', lazy=True, cascade="all, delete-orphan")
+    # Children are removed by ON DELETE CASCADE in the database rather than loaded and deleted one by one
+    questions = db.relationship('Question', backref='quiz_set', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    attempts_list = db.relationship('Attempt', backref='quiz_set', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    scrape_jobs = db.relationship('ScrapeJob', backref='quiz_set', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    explanation_jobs = db.relationship('ExplanationJob', backref='quiz_set', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+
+    # The SQL expressions below let these be selected or filtered on in queries, e.g.
+    # db.session.query(QuizSet.id, QuizSet.progress), without loading attempts
+
+    @staticmethod
+    def compute_progress(finished, total_questions, answered_questions):
+        if finished:
+            return 100
+        if total_questions == 0:
+            return 0
+        return int((answered_questions / total_questions) * 100)
 
     @hybrid_property
     def average_score(self):
@@ -52,50 +78,87 @@ class QuizSet(db.Model):
             return None
         return sum(attempt.score for attempt in self.attempts_list) / len(self.attempts_list)
 
+    @average_score.expression
+    def average_score(cls):
+        return (select(func.avg(Attempt.score).cast(db.Float))
+                .where(Attempt.quiz_set_id == cls.id)
+                .scalar_subquery())
+
     @hybrid_property
     def latest_score(self):
         if not self.attempts_list:
             return None
         return self.attempts_list[-1].score if self.attempts_list else None
 
+    @latest_score.expression
+    def latest_score(cls):
+        return (select(Attempt.score)
+                .where(Attempt.quiz_set_id == cls.id)
+                .order_by(Attempt.id.desc())
+                .limit(1)
+                .scalar_subquery())
+
     @hybrid_property
     def progress(self):
-        if self.finished:
-            return 100
-        total_questions = len(self.questions)
-        if total_questions == 0:
-            return 0
-        answered_questions = sum(1 for q in self.questions if q.user_selected_option is not None)
-        return int((answered_questions / total_questions) * 100)
+        return QuizSet.compute_progress(self.finished, self.total_questions, self.answered_count)
+
+    @progress.expression
+    def progress(cls):
+        return case(
+            (cls.finished.is_(True), 100),
+            (cls.total_questions == 0, 0),
+            else_=cls.answered_count * 100 // cls.total_questions,
+        )
 
     @hybrid_property
     def unanswered_questions_count(self):
-        total_questions = len(self.questions)
-        if total_questions == 0:
-            return 0
-        unanswered_questions = sum(1 for q in self.questions if q.user_selected_option is None)
-        return unanswered_questions
+        return self.total_questions - self.answered_count
 
     def update_last_updated(self):
         self.last_updated = datetime.now(timezone('Asia/Manila'))
         db.session.commit()
 
-class Question(db.Model):
-    __tablename__ = 'questions'
+class QuestionContent(db.Model):
+    # Scraped question content, stored once per content hash and shared by every quiz set that contains it
+    __tablename__ = 'question_contents'
     id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), unique=True, nullable=False)
     text = db.Column(db.Text, nullable=False)
-    options = db.Column(db.PickleType, nullable=False)
-    answer = db.Column(db.String(10), nullable=False)
-    quiz_set_id = db.Column(db.String(36), db.ForeignKey('quiz_sets.id'), nullable=False)
-    favorite = db.Column(db.Boolean, default=False)
+    options = db.Column(JSONB, nullable=False)
     url = db.Column(db.String(255))
     explanation = db.Column(db.Text)
     discussion_link = db.Column(db.String(255))
+    # Can be hundreds of KB and only getDiscussionComments reads it, so it isn't loaded with the row
+    discussion_comments = deferred(db.Column(db.Text))
+    discussion_comments_updated_at = db.Column(db.DateTime(timezone=True))
+
+class Question(db.Model):
+    __tablename__ = 'questions'
+    __table_args__ = (
+        db.Index('ix_questions_quiz_set_id_order', 'quiz_set_id', 'order'),
+        db.Index('ix_questions_quiz_set_id_favorite', 'quiz_set_id', 'favorite'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    content_id = db.Column(db.Integer, db.ForeignKey('question_contents.id'), nullable=False, index=True)
+    answer = db.Column(db.String(10), nullable=False)
+    quiz_set_id = db.Column(db.String(36), db.ForeignKey('quiz_sets.id', ondelete='CASCADE'), nullable=False)
+    favorite = db.Column(db.Boolean, default=False)
     user_selected_option = db.Column(db.String(10), nullable=True)
     order = db.Column(db.Integer, nullable=False)
-    discussion_comments = db.Column(db.Text)
-    
-    further_explanation = db.relationship('FurtherExplanation', backref='question', lazy=True, cascade="all, delete-orphan")
+    # Bumped by every write to the selection or favorite; batched changes name the version they
+    # were made against, so replays and changes overtaken by another tab's write are skipped
+    version = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+
+    content = db.relationship('QuestionContent', lazy='joined')
+    further_explanation = db.relationship('FurtherExplanation', backref='question', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+
+    # Shared content, read through the joined-loaded QuestionContent row
+    text = association_proxy('content', 'text')
+    options = association_proxy('content', 'options')
+    url = association_proxy('content', 'url')
+    explanation = association_proxy('content', 'explanation')
+    discussion_link = association_proxy('content', 'discussion_link')
+    discussion_comments = association_proxy('content', 'discussion_comments')
 
 class EditorContent(db.Model):
     __tablename__ = 'editor_contents'
@@ -109,14 +172,81 @@ class EditorContent(db.Model):
 class FurtherExplanation(db.Model):
     __tablename__ = 'further_explanations'
     id = db.Column(db.Integer, primary_key=True)
-    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False)
+    # One per question; saves that lose a race are skipped (see explanation_cache.save_further_explanation)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id', ondelete='CASCADE'), nullable=False, index=True, unique=True)
+    explanation = db.Column(db.Text, nullable=False)
+
+class FurtherExplanationCache(db.Model):
+    # LLM answers to getFurtherExplanation prompts, keyed by a hash of the model and normalized prompt
+    __tablename__ = 'further_explanation_cache'
+    prompt_hash = db.Column(db.String(64), primary_key=True)
+    model = db.Column(db.String(64), nullable=False)
     explanation = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone('Asia/Manila')))
 
 class Attempt(db.Model):
     __tablename__ = 'attempts'
     id = db.Column(db.Integer, primary_key=True)
-    quiz_set_id = db.Column(db.String(36), db.ForeignKey('quiz_sets.id'), nullable=False)
+    quiz_set_id = db.Column(db.String(36), db.ForeignKey('quiz_sets.id', ondelete='CASCADE'), nullable=False, index=True)
     score = db.Column(db.Integer, nullable=False)
     timestamp = db.Column(db.DateTime, default=db.func.now())
 
+class BackgroundJob:
+    """Status reporting shared by the background job models."""
+
+    def reported_status(self, stale_seconds):
+        # A job that stopped updating while unfinished was lost with the worker that ran it; one lost
+        # before it started has only its creation time to go by
+        last_seen = self.updated_at or self.created_at
+        if self.status in ('queued', 'running') and last_seen:
+            if (datetime.now(timezone('Asia/Manila')) - last_seen).total_seconds() > stale_seconds:
+                return 'interrupted'
+        return self.status
+
+class ScrapeJob(BackgroundJob, db.Model):
+    __tablename__ = 'scrape_jobs'
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    quiz_set_id = db.Column(db.String(36), db.ForeignKey('quiz_sets.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed
+    pages_total = db.Column(db.Integer, nullable=False, default=0)
+    pages_done = db.Column(db.Integer, nullable=False, default=0)
+    pages_failed = db.Column(db.Integer, nullable=False, default=0)
+    failed_urls = db.Column(db.Text)  # JSON list of URLs that could not be fetched
+    questions_inserted = db.Column(db.Integer, nullable=False, default=0)
+    cache_hits = db.Column(db.Integer, nullable=False, default=0)
+    cache_revalidated = db.Column(db.Integer, nullable=False, default=0)
+    cache_misses = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone('Asia/Manila')))
+    started_at = db.Column(db.DateTime(timezone=True))
+    updated_at = db.Column(db.DateTime(timezone=True))
+    finished_at = db.Column(db.DateTime(timezone=True))
+
+    @property
+    def eta_seconds(self):
+        pages_processed = self.pages_done + self.pages_failed
+        if self.status != 'running' or not self.started_at or pages_processed == 0:
+            return None
+        elapsed = (datetime.now(timezone('Asia/Manila')) - self.started_at).total_seconds()
+        return round(elapsed / pages_processed * max(self.pages_total - pages_processed, 0))
+
+class ExplanationJob(BackgroundJob, db.Model):
+    # Background generation of further explanations for a quiz set's questions
+    __tablename__ = 'explanation_jobs'
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    quiz_set_id = db.Column(db.String(36), db.ForeignKey('quiz_sets.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    only_incorrect = db.Column(db.Boolean, nullable=False, default=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed
+    questions_total = db.Column(db.Integer, nullable=False, default=0)
+    questions_done = db.Column(db.Integer, nullable=False, default=0)
+    questions_skipped = db.Column(db.Integer, nullable=False, default=0)  # Already had a further explanation
+    questions_failed = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone('Asia/Manila')))
+    started_at = db.Column(db.DateTime(timezone=True))
+    updated_at = db.Column(db.DateTime(timezone=True))
+    finished_at = db.Column(db.DateTime(timezone=True))
+
 logger.info("All models loaded")
\ No newline at end of file
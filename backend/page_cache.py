@@ -0,0 +1,132 @@
+# page_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import config
+
+class PageCache:
+    """Persistent cache for pages fetched by the scrapers.
+
+    Bodies are stored once per SHA-256 of their content under `objects/`, and a SQLite
+    index maps each URL to its body plus the ETag / Last-Modified validators. Entries
+    younger than the TTL are served without touching the network; older ones are
+    revalidated with a conditional GET, so unchanged pages cost a 304. Once the stored
+    bodies exceed `max_bytes`, the least recently used ones are evicted.
+    """
+
+    def __init__(self, directory, max_bytes, ttl_seconds):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS pages_content_hash ON pages (content_hash)')
+        self.conn.commit()
+
+    def _object_path(self, content_hash):
+        return os.path.join(self.directory, 'objects', content_hash[:2], content_hash[2:])
+
+    def _read_object(self, content_hash):
+        try:
+            with open(self._object_path(content_hash), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_object(self, content_hash, content):
+        path = self._object_path(content_hash)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def fetch(self, url, client):
+        """Return (content, status) for `url`, where status is 'hit', 'revalidated' or 'miss'.
+
+        Raises requests.RequestException like client.get would.
+        """
+        now = time.time()
+        with self.lock:
+            entry = self.conn.execute(
+                'SELECT content_hash, etag, last_modified, fetched_at FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+
+        cached = None
+        if entry:
+            content_hash, etag, last_modified, fetched_at = entry
+            cached = self._read_object(content_hash)
+            if cached is not None and now - fetched_at < self.ttl_seconds:
+                self._touch(url, now)
+                return cached, 'hit'
+
+        headers = {}
+        if cached is not None:
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        response = client.get(url, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            with self.lock:
+                self.conn.execute('UPDATE pages SET fetched_at = ?, last_access = ? WHERE url = ?', (now, now, url))
+                self.conn.commit()
+            return cached, 'revalidated'
+
+        response.raise_for_status()
+        content = response.content
+        content_hash = hashlib.sha256(content).hexdigest()
+        self._write_object(content_hash, content)
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages (url, content_hash, size, etag, last_modified, fetched_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, content_hash, len(content), response.headers.get('ETag'), response.headers.get('Last-Modified'), now, now)
+            )
+            self.conn.commit()
+            self._evict()
+        return content, 'miss'
+
+    def _touch(self, url, now):
+        with self.lock:
+            self.conn.execute('UPDATE pages SET last_access = ? WHERE url = ?', (now, url))
+            self.conn.commit()
+
+    def _evict(self):
+        # Called with self.lock held. Bodies are shared between URLs, so evict by content hash.
+        objects = self.conn.execute(
+            'SELECT content_hash, MAX(size), MAX(last_access) FROM pages GROUP BY content_hash ORDER BY MAX(last_access)'
+        ).fetchall()
+        total_bytes = sum(size for _, size, _ in objects)
+        for content_hash, size, _ in objects:
+            if total_bytes <= self.max_bytes:
+                break
+            self.conn.execute('DELETE FROM pages WHERE content_hash = ?', (content_hash,))
+            try:
+                os.remove(self._object_path(content_hash))
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+        self.conn.commit()
+
+cache = PageCache(config.PAGE_CACHE_DIR, config.PAGE_CACHE_MAX_BYTES, config.PAGE_CACHE_TTL_SECONDS) if config.PAGE_CACHE_ENABLED else None
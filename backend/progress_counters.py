@@ -0,0 +1,196 @@
+# progress_counters.py
+
+import logging
+from sqlalchemy import text, select, update, func
+from db import db
+from models import QuizSet, Question
+
+logger = logging.getLogger(__name__)
+
+# quiz_sets.total_questions / answered_count / correct_count are kept in step with the questions
+# table by every write below, inside the caller's transaction, so progress reads never scan questions.
+
+def is_correct(selected_option, answer):
+    return selected_option is not None and selected_option == answer
+
+def add_questions(quiz_set_id, count):
+    QuizSet.query.filter_by(id=quiz_set_id).update({QuizSet.total_questions: QuizSet.total_questions + count})
+
+def set_user_selection(question_id, selected_option):
+    """Change a question's selected option and adjust its quiz set's counters. Returns the
+    question, or None if it doesn't exist or its quiz set is being deleted. The caller commits."""
+    # Lock the question row so concurrent changes to the same question can't miscount
+    question = (db.session.query(Question).filter_by(id=question_id)
+                .join(QuizSet, QuizSet.id == Question.quiz_set_id).filter(QuizSet.deleted_at.is_(None))
+                .with_for_update(of=Question).first())
+    if not question:
+        return None
+
+    answered_delta = (selected_option is not None) - (question.user_selected_option is not None)
+    correct_delta = is_correct(selected_option, question.answer) - is_correct(question.user_selected_option, question.answer)
+    question.user_selected_option = selected_option
+    question.version = Question.version + 1
+    if answered_delta or correct_delta:
+        QuizSet.query.filter_by(id=question.quiz_set_id).update({
+            QuizSet.answered_count: QuizSet.answered_count + answered_delta,
+            QuizSet.correct_count: QuizSet.correct_count + correct_delta,
+        })
+    return question
+
+def question_change_rounds(changes):
+    """Split a change log into rounds holding at most one change per question, each question's
+    changes in version order, so a round is one UPDATE and sees the versions the round before
+    it wrote."""
+    rounds = []
+    seen = {}
+    for change in sorted(changes, key=lambda change: change['version']):
+        position = seen.get(change['question_id'], 0)
+        seen[change['question_id']] = position + 1
+        if position == len(rounds):
+            rounds.append([])
+        rounds[position].append(change)
+    return rounds
+
+_APPLY_CHANGES_SQL = """
+    WITH incoming AS (
+        SELECT *
+        FROM unnest(CAST(:ids AS integer[]), CAST(:versions AS bigint[]),
+                    CAST(:set_selection AS boolean[]), CAST(:selections AS varchar[]),
+                    CAST(:set_favorite AS boolean[]), CAST(:favorites AS boolean[]))
+             AS incoming(question_id, version, set_selection, selected_option, set_favorite, favorite)
+    ),
+    applied AS (
+        UPDATE questions
+        SET user_selected_option = CASE WHEN incoming.set_selection THEN incoming.selected_option
+                                        ELSE questions.user_selected_option END,
+            favorite = CASE WHEN incoming.set_favorite THEN incoming.favorite ELSE questions.favorite END,
+            version = questions.version + 1
+        FROM incoming, questions AS old
+        WHERE questions.id = incoming.question_id
+          AND old.id = questions.id
+          AND questions.version = incoming.version
+        RETURNING questions.id, questions.quiz_set_id, questions.version,
+                  (questions.user_selected_option IS NOT NULL)::int
+                      - (old.user_selected_option IS NOT NULL)::int AS answered_delta,
+                  COALESCE(questions.user_selected_option = questions.answer, false)::int
+                      - COALESCE(old.user_selected_option = old.answer, false)::int AS correct_delta
+    ),
+    deltas AS (
+        SELECT quiz_set_id, SUM(answered_delta) AS answered_delta, SUM(correct_delta) AS correct_delta
+        FROM applied
+        GROUP BY quiz_set_id
+    ),
+    counted AS (
+        UPDATE quiz_sets
+        SET answered_count = quiz_sets.answered_count + deltas.answered_delta,
+            correct_count = quiz_sets.correct_count + deltas.correct_delta,
+            version = quiz_sets.version + 1
+        FROM deltas
+        WHERE quiz_sets.id = deltas.quiz_set_id
+    )
+    SELECT id, version FROM applied
+"""
+
+def apply_question_changes(changes):
+    """Apply a batch of selection/favorite changes, adjusting counters and bumping versions of the
+    touched quiz sets. Each change names the question version it was made against and is only
+    applied if the question is still at that version, so a resent change, or one overtaken by a
+    write from another tab, is skipped whatever order the requests arrive in. Returns
+    {question id: new version} for the questions that were written. The caller commits."""
+    if not changes:
+        return {}
+
+    ids = sorted({change['question_id'] for change in changes})
+    # Lock in id order so overlapping batches can't deadlock and the old values read below are
+    # stable. Questions of quiz sets being deleted are left out, so their changes are ignored.
+    live_ids = set(db.session.execute(text(
+        "SELECT questions.id FROM questions JOIN quiz_sets ON quiz_sets.id = questions.quiz_set_id "
+        "WHERE questions.id = ANY(:ids) AND quiz_sets.deleted_at IS NULL "
+        "ORDER BY questions.id FOR UPDATE OF questions"
+    ), {'ids': ids}).scalars())
+    versions = {}
+    for rows in question_change_rounds([change for change in changes if change['question_id'] in live_ids]):
+        result = db.session.execute(text(_APPLY_CHANGES_SQL), {
+            'ids': [row['question_id'] for row in rows],
+            'versions': [row['version'] for row in rows],
+            'set_selection': ['selected_option' in row for row in rows],
+            'selections': [row.get('selected_option') for row in rows],
+            'set_favorite': ['favorite' in row for row in rows],
+            'favorites': [row.get('favorite') for row in rows],
+        })
+        versions.update(result.all())
+    return versions
+
+def clear_user_selections(quiz_set_id):
+    QuizSet.query.filter_by(id=quiz_set_id).update({QuizSet.answered_count: 0, QuizSet.correct_count: 0})
+
+def shuffle_question_order(quiz_set_id):
+    """Give the quiz set's questions a random order and clear their selections in one UPDATE.
+    Returns [(question id, order, version)] in the new order; empty if the set has no questions."""
+    shuffled = select(
+        Question.id,
+        (func.row_number().over(order_by=func.random()) - 1).label('new_order'),
+    ).where(Question.quiz_set_id == quiz_set_id).subquery()
+    rows = db.session.execute(
+        update(Question)
+        .where(Question.id == shuffled.c.id)
+        .values(order=shuffled.c.new_order, user_selected_option=None, version=Question.version + 1)
+        .returning(Question.id, Question.order, Question.version)
+        .execution_options(synchronize_session=False)
+    ).all()
+    clear_user_selections(quiz_set_id)
+    return sorted((tuple(row) for row in rows), key=lambda row: row[1])
+
+def reset_selections(quiz_set_id):
+    """Clear every selection in the quiz set. Returns [(question id, order, version)] in order."""
+    db.session.execute(
+        update(Question)
+        .where(Question.quiz_set_id == quiz_set_id, Question.user_selected_option.isnot(None))
+        .values(user_selected_option=None, version=Question.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    clear_user_selections(quiz_set_id)
+    return db.session.execute(
+        select(Question.id, Question.order, Question.version).where(Question.quiz_set_id == quiz_set_id).order_by(Question.order)
+    ).all()
+
+_COUNTS_SQL = """
+    SELECT quiz_sets.id,
+           COUNT(questions.id) AS total_questions,
+           COUNT(questions.user_selected_option) AS answered_count,
+           COUNT(*) FILTER (WHERE questions.user_selected_option = questions.answer) AS correct_count
+    FROM quiz_sets
+    LEFT JOIN questions ON questions.quiz_set_id = quiz_sets.id
+    GROUP BY quiz_sets.id
+"""
+
+def rebuild_progress_counters(fix=True):
+    """Recount every quiz set's counters from its questions. Returns the ids of the quiz sets
+    whose stored counters were wrong, rewriting them unless `fix` is False. The columns come
+    from the baseline migration."""
+    if fix:
+        statement = f"""
+            UPDATE quiz_sets
+            SET total_questions = counts.total_questions,
+                answered_count = counts.answered_count,
+                correct_count = counts.correct_count
+            FROM ({_COUNTS_SQL}) AS counts
+            WHERE quiz_sets.id = counts.id
+              AND (quiz_sets.total_questions, quiz_sets.answered_count, quiz_sets.correct_count)
+                  IS DISTINCT FROM (counts.total_questions, counts.answered_count, counts.correct_count)
+            RETURNING quiz_sets.id
+        """
+    else:
+        statement = f"""
+            SELECT quiz_sets.id
+            FROM quiz_sets
+            JOIN ({_COUNTS_SQL}) AS counts ON counts.id = quiz_sets.id
+            WHERE (quiz_sets.total_questions, quiz_sets.answered_count, quiz_sets.correct_count)
+                  IS DISTINCT FROM (counts.total_questions, counts.answered_count, counts.correct_count)
+        """
+    mismatched = [row[0] for row in db.session.execute(text(statement))]
+    db.session.commit()
+
+    if mismatched:
+        logger.warning(f"Progress counters were wrong for {len(mismatched)} quiz sets{'' if fix else ' (not fixed)'}")
+    return mismatched
@@ -0,0 +1,87 @@
+# query_plans.py
+
+import json
+import logging
+from sqlalchemy import text
+from db import db
+from quiz_queries import questions_in_order, favorite_questions, user_quiz_sets, further_explanation_for
+
+logger = logging.getLogger(__name__)
+
+# The lookups behind the quiz page, favorites view, dashboard and further explanations, built by
+# the same functions the routes call, and the table each must reach through an index rather than
+# a sequential scan
+HOT_QUERIES = [
+    ('getQuestionsByQuizSet', 'questions', lambda params: questions_in_order(params['quiz_set_id'])),
+    ('getFavorites', 'questions', lambda params: favorite_questions(params['quiz_set_id'])),
+    ('getQuizSets', 'quiz_sets', lambda params: user_quiz_sets(params['user_id'])),
+    ('getQuizSets attempts', 'attempts', lambda params: user_quiz_sets(params['user_id'])),
+    ('getFurtherExplanation', 'further_explanations', lambda params: further_explanation_for(params['question_id'])),
+]
+
+def explain(query):
+    """The JSON plan PostgreSQL chooses for an ORM query, with its parameters bound as the route binds them."""
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'render_postcompile': True})
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+def seed_dataset(users, quiz_sets, questions_per_set):
+    """Insert `users` synthetic users sharing `quiz_sets` sets of `questions_per_set` questions,
+    each set with attempts and further explanations, and return the ids to query for."""
+    user_ids = db.session.execute(text(
+        "INSERT INTO users (name) SELECT 'explain-check ' || n FROM generate_series(1, :users) AS n RETURNING id"
+    ), {'users': users}).scalars().all()
+    content_id = db.session.execute(text(
+        "INSERT INTO question_contents (content_hash, text, options) "
+        "VALUES (md5(random()::text) || md5(random()::text), 'explain-check', '[]'::jsonb) RETURNING id"
+    )).scalar()
+    quiz_set_ids = db.session.execute(text(
+        "INSERT INTO quiz_sets (id, title, user_id) "
+        "SELECT md5(random()::text || n), 'explain-check ' || n, (:user_ids)[1 + n % :users] "
+        "FROM generate_series(1, :quiz_sets) AS n RETURNING id"
+    ), {'user_ids': user_ids, 'users': users, 'quiz_sets': quiz_sets}).scalars().all()
+    db.session.execute(text(
+        'INSERT INTO questions (content_id, answer, quiz_set_id, favorite, "order") '
+        "SELECT :content_id, 'A', quiz_set_id, n % 10 = 0, n "
+        "FROM unnest(CAST(:quiz_set_ids AS VARCHAR[])) AS quiz_set_id, generate_series(1, :per_set) AS n"
+    ), {'content_id': content_id, 'quiz_set_ids': quiz_set_ids, 'per_set': questions_per_set})
+    db.session.execute(text(
+        "INSERT INTO attempts (quiz_set_id, score) "
+        "SELECT quiz_set_id, n FROM unnest(CAST(:quiz_set_ids AS VARCHAR[])) AS quiz_set_id, generate_series(1, 5) AS n"
+    ), {'quiz_set_ids': quiz_set_ids})
+    db.session.execute(text(
+        "INSERT INTO further_explanations (question_id, explanation) "
+        "SELECT id, 'explain-check' FROM questions WHERE quiz_set_id = ANY(:quiz_set_ids) AND \"order\" % 5 = 0"
+    ), {'quiz_set_ids': quiz_set_ids})
+    db.session.execute(text("ANALYZE users, quiz_sets, questions, attempts, further_explanations"))
+
+    user_id, quiz_set_id = user_ids[0], quiz_set_ids[0]
+    question_id = db.session.execute(text(
+        "SELECT questions.id FROM questions JOIN further_explanations ON further_explanations.question_id = questions.id "
+        "WHERE questions.quiz_set_id = :quiz_set_id LIMIT 1"
+    ), {'quiz_set_id': quiz_set_id}).scalar()
+    return {'user_id': user_id, 'quiz_set_id': quiz_set_id, 'question_id': question_id}
+
+def uses_index(scans):
+    return bool(scans) and 'Seq Scan' not in scans
+
+def _scans(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _scans(child)
+
+def check_query_plans(users=1000, quiz_sets=5000, questions_per_set=100):
+    """EXPLAIN the hot queries against a seeded dataset and return {query name: scan node types
+    on its table}. Queries that don't reach their table through an index are logged. The
+    seeded rows are rolled back afterwards."""
+    results = {}
+    try:
+        params = seed_dataset(users, quiz_sets, questions_per_set)
+        for name, table, build_query in HOT_QUERIES:
+            plan = explain(build_query(params))
+            results[name] = [node['Node Type'] for node in _scans(plan[0]['Plan']) if node.get('Relation Name') == table]
+            if not uses_index(results[name]):
+                logger.warning(f"{name} doesn't use an index on {table}: {results[name]}")
+    finally:
+        db.session.rollback()
+    return results
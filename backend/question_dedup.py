@@ -0,0 +1,34 @@
+# question_dedup.py
+
+import hashlib
+import json
+import re
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from db import db
+from models import QuestionContent
+
+CONTENT_FIELDS = ('text', 'options', 'url', 'explanation', 'discussion_link')
+
+def _normalize(value):
+    return re.sub(r'\s+', ' ', value or '').strip()
+
+def content_hash(question_text, options, answer):
+    """Hash of the normalized question text, options and answer; identical scraped questions share it.
+    The baseline migration hashes pre-existing questions with a copy of this, so keep the two in step."""
+    key = [_normalize(question_text), [_normalize(option) for option in options or []], _normalize(answer)]
+    return hashlib.sha256(json.dumps(key, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def store_contents(rows):
+    """Insert the content of each row (dicts with CONTENT_FIELDS and `answer`) unless an identical
+    one is already stored. Returns a content_id for every row, in order."""
+    hashes = [content_hash(row['text'], row['options'], row['answer']) for row in rows]
+    contents = {}
+    for row, row_hash in zip(rows, hashes):
+        contents.setdefault(row_hash, dict({field: row.get(field) for field in CONTENT_FIELDS}, content_hash=row_hash))
+
+    db.session.execute(pg_insert(QuestionContent).on_conflict_do_nothing(index_elements=['content_hash']), list(contents.values()))
+    content_ids = dict(db.session.execute(
+        select(QuestionContent.content_hash, QuestionContent.id).where(QuestionContent.content_hash.in_(list(contents)))
+    ).all())
+    return [content_ids[row_hash] for row_hash in hashes]
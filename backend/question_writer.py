@@ -0,0 +1,62 @@
+# question_writer.py
+
+from sqlalchemy import insert
+from db import db
+from models import Question
+from question_dedup import store_contents
+from progress_counters import add_questions
+from quiz_cache import bump_version
+import config
+
+class QuestionWriter:
+    """Collects scraped questions for a quiz set and writes them with batched multi-row INSERTs.
+
+    `order` is assigned as rows are added, continuing from `next_order`. Buffered rows are
+    written once `flush_size` have accumulated and on every commit_page(), so each scraped
+    page is still committed on its own. Content already stored for another quiz set is
+    referenced rather than inserted again. Each commit is reported to `progress`, if given.
+    """
+
+    def __init__(self, quiz_set_id, next_order, flush_size=None, progress=None):
+        if quiz_set_id is None:
+            raise ValueError("`quiz_set_id` is missing")
+        self.quiz_set_id = quiz_set_id
+        self.start_order = next_order
+        self.next_order = next_order
+        self.flush_size = flush_size or config.QUESTION_FLUSH_SIZE
+        self.progress = progress
+        self.rows = []
+
+    def add(self, **fields):
+        self.rows.append(fields)
+        self.next_order += 1
+        if len(self.rows) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        content_ids = store_contents(self.rows)
+        first_order = self.next_order - len(self.rows)
+        db.session.execute(insert(Question), [{
+            'quiz_set_id': self.quiz_set_id,
+            'content_id': content_id,
+            'answer': row['answer'],
+            'order': first_order + index,
+        } for index, (row, content_id) in enumerate(zip(self.rows, content_ids))])
+        add_questions(self.quiz_set_id, len(self.rows))
+        bump_version(self.quiz_set_id)
+        self.rows = []
+
+    def commit_page(self):
+        self.flush()
+        db.session.commit()
+        if self.progress and self.next_order > self.start_order:
+            self.progress.batch_committed(self.next_order - self.start_order)
+        self.start_order = self.next_order
+
+    def discard(self):
+        # Drop everything since the last commit_page(), including rows already flushed
+        db.session.rollback()
+        self.rows = []
+        self.next_order = self.start_order
@@ -0,0 +1,97 @@
+# quiz_cache.py
+
+from collections import OrderedDict
+import functools
+import threading
+from flask import request, make_response, jsonify
+from db import db
+from models import QuizSet
+import config
+
+# Every route that changes what the quiz content endpoints return bumps quiz_sets.version in
+# its own transaction. Reads compare it against If-None-Match and key cached bodies on it.
+
+def bump_version(quiz_set_id):
+    QuizSet.query.filter_by(id=quiz_set_id).update({QuizSet.version: QuizSet.version + 1})
+
+def current_version(quiz_set_id):
+    # None for quiz sets that don't exist or are hidden while they are deleted in the background
+    return db.session.query(QuizSet.version).filter(QuizSet.id == quiz_set_id, QuizSet.deleted_at.is_(None)).scalar()
+
+class ResponseCache:
+    """In-process LRU of rendered response bodies, bounded by total body size.
+
+    Holds one body per (endpoint, quiz set); a body is only served for the version it was
+    rendered at, and storing a newer version replaces the old one.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, version):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version, body):
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[1])
+            self.entries[key] = (version, body)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def discard_quiz_set(self, quiz_set_id):
+        with self.lock:
+            for key in [key for key in self.entries if key[1] == quiz_set_id]:
+                self.size -= len(self.entries.pop(key)[1])
+
+response_cache = ResponseCache(config.RESPONSE_CACHE_MAX_BYTES)
+
+def versioned_quiz_set_response(view):
+    """Serve a quiz set read endpoint with an ETag from the quiz set's version: 304 for a
+    matching If-None-Match, otherwise the cached body for that version when there is one.
+    Unknown and deleted quiz sets get a 404; requests with query arguments (paged modes) go
+    straight to the view."""
+    @functools.wraps(view)
+    def wrapper(quiz_set_id, *args, **kwargs):
+        version = current_version(quiz_set_id)
+        if version is None:
+            return jsonify({'message': 'Quiz set not found'}), 404
+        if request.args:
+            return view(quiz_set_id, *args, **kwargs)
+
+        etag = f"{quiz_set_id}.{version}"
+        # Weak comparison, as If-None-Match requires: proxies that compress the body weaken the ETag
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
+
+        key = (view.__name__, quiz_set_id)
+        body = response_cache.get(key, version)
+        if body is None:
+            response = make_response(view(quiz_set_id, *args, **kwargs))
+            if response.status_code != 200:
+                return response
+            response_cache.put(key, version, response.get_data())
+        else:
+            response = make_response(body)
+            response.mimetype = 'application/json'
+
+        response.set_etag(etag)
+        # Let browsers keep the body but revalidate it on every use
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
@@ -0,0 +1,228 @@
+# quiz_pdf.py
+
+import functools
+import hashlib
+import io
+import os
+import threading
+from html.parser import HTMLParser
+from reportlab import rl_config
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from sqlalchemy import func, literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from db import db
+from models import Question, QuestionContent
+import config
+
+FONT_NAME = 'Helvetica'
+FONT_SIZE = 12
+LINE_HEIGHT = 15
+MARGIN = 30
+
+# Page streams are only Flate-compressed, not also ASCII85-encoded: the encoding makes files a
+# quarter bigger and was a fifth of an export's time. Exports are the only PDFs this app writes.
+rl_config.useA85 = 0
+
+# The MLStripper class and strip_tags function
+class MLStripper(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.reset()
+        self.strict = False
+        self.convert_charrefs = True
+        self.text = io.StringIO()
+
+    def handle_data(self, d):
+        self.text.write(d)
+
+    def get_data(self):
+        return self.text.getvalue()
+
+def strip_tags(html):
+    s = MLStripper()
+    s.feed(html)
+    return s.get_data()
+
+@functools.lru_cache(maxsize=None)
+def _char_width(char):
+    return stringWidth(char, FONT_NAME, FONT_SIZE)
+
+def wrap_text(text, max_width):
+    """Split `text` into lines no wider than `max_width`, breaking at spaces like reportlab's
+    simpleSplit. Widths are summed from cached per-character widths (the standard fonts have no
+    kerning, so this equals stringWidth); measuring every word with stringWidth made wrapping
+    most of an export's time. A single word wider than a line is left whole."""
+    space = _char_width(' ')
+    lines = []
+    for paragraph in text.split('\n'):
+        words, width = [], -space
+        for word in paragraph.split():
+            word_width = sum(map(_char_width, word))
+            if words and width + space + word_width > max_width:
+                lines.append(' '.join(words))
+                words, width = [], -space
+            words.append(word)
+            width += space + word_width
+        if words:
+            lines.append(' '.join(words))
+    return lines
+
+class _PageWriter:
+    """Draws wrapped lines top to bottom, starting a new page whenever the next line won't fit.
+    Each page's lines go into one text object, and the text cursor is only moved explicitly
+    for gaps and indents; a drawString per line cost several times as much."""
+
+    def __init__(self, pdf):
+        self.pdf = pdf
+        self.width, self.height = letter
+        self.max_width = self.width - 2 * MARGIN
+        self._start_page()
+
+    def _start_page(self):
+        self.y = self.height - MARGIN
+        self.text = self.pdf.beginText(MARGIN, self.y)
+        self.text.setFont(FONT_NAME, FONT_SIZE)
+        self.text.setLeading(LINE_HEIGHT)
+        self.cursor = (0, self.y)  # Where the next textLine would draw, as (indent, y)
+
+    def line(self, text, indent=0):
+        lines = wrap_text(text, self.max_width - indent) or ['']
+        for i, part in enumerate(lines):
+            if self.y < MARGIN + LINE_HEIGHT:
+                self.pdf.drawText(self.text)
+                self.pdf.showPage()
+                self._start_page()
+            # Continuation lines of an option line up with its text, not its label
+            x = indent if i else 0
+            if (x, self.y) != self.cursor:
+                self.text.moveCursor(x - self.cursor[0], self.cursor[1] - self.y)
+            self.text.textLine(part)
+            self.y -= LINE_HEIGHT
+            self.cursor = (x, self.y)
+
+    def gap(self, points):
+        self.y -= points
+
+    def finish(self):
+        self.pdf.drawText(self.text)
+
+def render_quiz_pdf(quiz_set_id, title, output):
+    """Write the quiz set's questions as a PDF to `output` (a path or binary file). Questions
+    are read from the database in batches of PDF_EXPORT_BATCH_SIZE rather than loaded at once."""
+    pdf = canvas.Canvas(output, pagesize=letter, pageCompression=1)
+    pdf.setTitle(title)
+    writer = _PageWriter(pdf)
+    writer.line(f"Quiz: {title}")
+    writer.gap(5)
+
+    rows = (db.session.query(QuestionContent.text, QuestionContent.options, Question.answer)
+            .join(Question, Question.content_id == QuestionContent.id)
+            .filter(Question.quiz_set_id == quiz_set_id)
+            .order_by(Question.order)
+            .yield_per(config.PDF_EXPORT_BATCH_SIZE))
+    for i, (text, options, answer) in enumerate(rows, start=1):
+        writer.gap(15)
+        writer.line(f"Question No. {i}: {strip_tags(text)}")
+        for j, option in enumerate(options, start=1):
+            writer.line(f"{chr(64+j)}. {strip_tags(option)}", indent=15)
+        writer.line(f"Answer: {answer.replace('Option ', '')}")
+        writer.gap(5)
+
+    writer.finish()
+    pdf.save()
+
+def content_digest(quiz_set_id, title):
+    """Hash of everything an export shows: the title and, in order, each question's content
+    and answer. Selections, favorites and the like don't change it."""
+    questions = (db.session.query(func.md5(func.string_agg(
+            func.concat(Question.content_id, ':', Question.answer),
+            aggregate_order_by(literal(','), Question.order))))
+        .filter(Question.quiz_set_id == quiz_set_id)
+        .scalar())
+    return hashlib.sha256(f"{title}\n{questions or ''}".encode()).hexdigest()
+
+class QuizPdfCache:
+    """Rendered quiz set PDFs on disk, one file per (quiz set, content digest).
+
+    A file is only served while the quiz set's exported content still hashes to its digest, so
+    answering or favoriting questions keeps serving the same file. Files for content that has
+    since changed aren't removed when a new one is rendered, since a download may still be
+    sending them; like everything else, they go once the files exceed `max_bytes`, least
+    recently served first. Concurrent requests for the same uncached file wait for one render.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.render_locks = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _prefix(self, quiz_set_id):
+        # Quiz set ids come from the URL, so they are hashed rather than used in file names
+        return hashlib.sha256(quiz_set_id.encode()).hexdigest()
+
+    def _path(self, quiz_set_id, digest):
+        return os.path.join(self.directory, f"{self._prefix(quiz_set_id)}.{digest}.pdf")
+
+    def get(self, quiz_set_id, title):
+        """Return the path of the quiz set's PDF for its current content, rendering it first if needed."""
+        path = self._path(quiz_set_id, content_digest(quiz_set_id, title))
+        with self.lock:
+            render_lock = self.render_locks.setdefault(path, threading.Lock())
+        with render_lock:
+            if not os.path.exists(path):
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    render_quiz_pdf(quiz_set_id, title, tmp_path)
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                self._evict(keep=path)
+            else:
+                os.utime(path)
+            # Requests arriving from here on find the file, so they no longer need the lock
+            with self.lock:
+                self.render_locks.pop(path, None)
+        return path
+
+    def _files(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.pdf'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def discard_quiz_set(self, quiz_set_id):
+        # For deleted quiz sets
+        prefix = self._prefix(quiz_set_id) + '.'
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(prefix) and name.endswith('.pdf'):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _evict(self, keep):
+        files = sorted(self._files(), key=lambda item: item[2])
+        total_bytes = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if total_bytes <= self.max_bytes:
+                break
+            if path == keep:
+                # The file about to be sent is kept even if it alone is over the limit
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+pdf_cache = QuizPdfCache(config.PDF_CACHE_DIR, config.PDF_CACHE_MAX_BYTES)
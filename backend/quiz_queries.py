@@ -0,0 +1,57 @@
+# quiz_queries.py
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import array_agg, aggregate_order_by
+from db import db
+from models import QuizSet, Question, QuestionContent, FurtherExplanation, Attempt
+
+# The queries behind the hottest endpoints. The routes run them and query_plans EXPLAINs the
+# same statements, so the index check covers what the endpoints actually send.
+
+def questions_in_order(quiz_set_id):
+    # getQuestionsByQuizSet
+    return Question.query.filter_by(quiz_set_id=quiz_set_id).order_by(Question.order)
+
+def favorite_questions(quiz_set_id):
+    # getFavorites
+    return (db.session.query(
+            Question.id, Question.answer, Question.favorite,
+            QuestionContent.text, QuestionContent.options, QuestionContent.url,
+            QuestionContent.explanation, QuestionContent.discussion_link)
+        .filter_by(quiz_set_id=quiz_set_id, favorite=True)
+        .join(QuestionContent, QuestionContent.id == Question.content_id))
+
+def user_quiz_sets(user_id):
+    # getQuizSets: question counts live on the quiz set and attempt stats are aggregated in SQL,
+    # so the whole dashboard is one query
+    attempt_stats = (db.session.query(
+            Attempt.quiz_set_id.label('quiz_set_id'),
+            func.count(Attempt.id).label('attempts'),
+            func.avg(Attempt.score).cast(db.Float).label('average_score'),
+            array_agg(aggregate_order_by(Attempt.score, Attempt.id.desc()))[1].label('latest_score'))
+        .join(QuizSet, QuizSet.id == Attempt.quiz_set_id)
+        .filter(QuizSet.user_id == user_id)
+        .group_by(Attempt.quiz_set_id)
+        .subquery())
+
+    return (db.session.query(
+            QuizSet.id, QuizSet.title, QuizSet.score, QuizSet.finished, QuizSet.last_updated,
+            QuizSet.total_questions, QuizSet.answered_count,
+            func.coalesce(attempt_stats.c.attempts, 0).label('attempts'),
+            attempt_stats.c.average_score,
+            attempt_stats.c.latest_score)
+        .outerjoin(attempt_stats, attempt_stats.c.quiz_set_id == QuizSet.id)
+        .filter(QuizSet.user_id == user_id, QuizSet.deleted_at.is_(None)))
+
+def live_question(question_id):
+    # A question whose quiz set isn't hidden for deletion
+    return (Question.query.filter(Question.id == question_id)
+        .join(QuizSet, QuizSet.id == Question.quiz_set_id)
+        .filter(QuizSet.deleted_at.is_(None)))
+
+def further_explanation_for(question_id):
+    # getFurtherExplanation/<question_id>
+    return (FurtherExplanation.query.filter_by(question_id=question_id)
+        .join(Question, Question.id == FurtherExplanation.question_id)
+        .join(QuizSet, QuizSet.id == Question.quiz_set_id)
+        .filter(QuizSet.deleted_at.is_(None)))
@@ -0,0 +1,111 @@
+# quiz_set_deletion.py
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import functools
+import logging
+import traceback
+from flask import jsonify
+from sqlalchemy import text
+from app_init import app
+from db import db
+from models import QuizSet
+from quiz_cache import response_cache
+from quiz_pdf import pdf_cache
+import config
+
+logger = logging.getLogger(__name__)
+
+# Large deletions are finished here so the delete routes can return immediately
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='quiz-set-delete')
+
+# Question contents are shared between quiz sets, so only the ones nothing references any more are removed
+_DELETE_ORPHANED_CONTENTS_SQL = """
+    DELETE FROM question_contents
+    WHERE id = ANY(:content_ids)
+      AND NOT EXISTS (SELECT 1 FROM questions WHERE questions.content_id = question_contents.id)
+"""
+
+def _delete_orphaned_contents(content_ids):
+    if content_ids:
+        db.session.execute(text(_DELETE_ORPHANED_CONTENTS_SQL), {'content_ids': list(content_ids)})
+
+def _delete_now(quiz_set_ids):
+    content_ids = db.session.execute(text(
+        "SELECT DISTINCT content_id FROM questions WHERE quiz_set_id = ANY(:ids)"
+    ), {'ids': quiz_set_ids}).scalars().all()
+    # Questions, further explanations, attempts and scrape jobs go with the quiz sets via ON DELETE CASCADE
+    db.session.execute(text("DELETE FROM quiz_sets WHERE id = ANY(:ids)"), {'ids': quiz_set_ids})
+    _delete_orphaned_contents(content_ids)
+
+def purge_quiz_sets(quiz_set_ids):
+    """Delete quiz sets already hidden by delete_quiz_sets, committing every
+    QUIZ_SET_DELETE_BATCH_SIZE questions so no transaction holds locks for long."""
+    with app.app_context():
+        try:
+            while True:
+                # SKIP LOCKED lets several workers resuming the same deletion share it
+                content_ids = db.session.execute(text("""
+                    DELETE FROM questions
+                    WHERE id IN (SELECT id FROM questions WHERE quiz_set_id = ANY(:ids)
+                                 LIMIT :batch_size FOR UPDATE SKIP LOCKED)
+                    RETURNING content_id
+                """), {'ids': quiz_set_ids, 'batch_size': config.QUIZ_SET_DELETE_BATCH_SIZE}).scalars().all()
+                if not content_ids:
+                    break
+                _delete_orphaned_contents(set(content_ids))
+                db.session.commit()
+
+            _delete_now(quiz_set_ids)
+            db.session.commit()
+            logger.info(f"Deleted {len(quiz_set_ids)} quiz sets in the background")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Background deletion of quiz sets {quiz_set_ids} failed: {e}\n{traceback.format_exc()}")
+
+def live_quiz_set_required(view):
+    """404 for quiz sets that don't exist or are hidden while deleted in the background, so
+    per-quiz-set endpoints can't read or write a set that getQuizSets no longer lists."""
+    @functools.wraps(view)
+    def wrapper(quiz_set_id, *args, **kwargs):
+        if not db.session.query(QuizSet.id).filter(QuizSet.id == quiz_set_id, QuizSet.deleted_at.is_(None)).first():
+            return jsonify({'message': 'Quiz set not found'}), 404
+        return view(quiz_set_id, *args, **kwargs)
+    return wrapper
+
+def delete_quiz_sets(quiz_set_ids):
+    """Delete the given quiz sets and everything under them. Small deletions happen in this
+    transaction; if they hold more than QUIZ_SET_DELETE_INLINE_MAX_QUESTIONS questions in
+    total, the sets are hidden and purged in the background instead. Returns
+    (ids deleted now, ids queued for background deletion). Commits."""
+    sizes = dict(db.session.execute(text(
+        "SELECT id, total_questions FROM quiz_sets WHERE id = ANY(:ids) AND deleted_at IS NULL"
+    ), {'ids': list(quiz_set_ids)}).all())
+    found = list(sizes)
+    if not found:
+        return [], []
+
+    if sum(sizes.values()) <= config.QUIZ_SET_DELETE_INLINE_MAX_QUESTIONS:
+        _delete_now(found)
+        db.session.commit()
+        deleted, queued = found, []
+    else:
+        db.session.execute(text("UPDATE quiz_sets SET deleted_at = :now WHERE id = ANY(:ids)"),
+                           {'now': datetime.now(config.PH_TZ), 'ids': found})
+        db.session.commit()
+        executor.submit(purge_quiz_sets, found)
+        deleted, queued = [], found
+
+    for quiz_set_id in found:
+        response_cache.discard_quiz_set(quiz_set_id)
+        pdf_cache.discard_quiz_set(quiz_set_id)
+    return deleted, queued
+
+def resume_quiz_set_deletions():
+    """Queue background deletions that a restart cut short."""
+    with app.app_context():
+        pending = db.session.execute(text("SELECT id FROM quiz_sets WHERE deleted_at IS NOT NULL")).scalars().all()
+        db.session.rollback()
+    if pending:
+        logger.info(f"Resuming background deletion of {len(pending)} quiz sets")
+        executor.submit(purge_quiz_sets, pending)
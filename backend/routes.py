@@ -2,60 +2,32 @@
 
 from app_init import app, oauth, github
 from db import db
-from flask import redirect, url_for, request, jsonify, session, send_file, current_app, make_response, g
+from flask import redirect, url_for, request, jsonify, session, send_file, current_app, make_response, g, Response
 from werkzeug.exceptions import BadRequest
 from authlib.integrations.flask_client import OAuthError
-from models import QuizSet, Question, EditorContent, FurtherExplanation, User, Attempt
-from scraping_helpers import process_question, process_pinoybix_question, process_examveda_question, process_examprimer_question, fetch_discussion_comments
+from models import QuizSet, Question, QuestionContent, EditorContent, User, Attempt, ScrapeJob, ExplanationJob
+from discussion_comments import load_discussion_comments
+from scrape_jobs import enqueue_scrape_job, job_status
+from progress_counters import set_user_selection, apply_question_changes, shuffle_question_order, reset_selections
+from quiz_cache import versioned_quiz_set_response, bump_version
+from quiz_set_deletion import delete_quiz_sets, live_quiz_set_required
+from further_explanations import explain, stream_explanation, llm_scheduler
+from explanation_jobs import enqueue_explanation_job, explanation_job_status
+from explanation_cache import save_further_explanation
+from quiz_pdf import pdf_cache
+from quiz_queries import questions_in_order, favorite_questions, user_quiz_sets, further_explanation_for, live_question
+import scrape_events
+from sqlalchemy import tuple_
 import config
-import random
-from g4f import Provider, models
-from langchain.llms.base import LLM
-from langchain_g4f import G4FLLM
 import json
 from selenium.webdriver.chrome.options import Options
 from selenium import webdriver
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from html.parser import HTMLParser
 from datetime import datetime
 from pytz import timezone
 import traceback
 import re
-import io
 import secrets
 
-providers_to_try = [
-    Provider.Bing,
-    Provider.ChatBase,
-    Provider.ChatgptAi,
-    Provider.FreeGpt,
-    Provider.GPTalk,
-    Provider.GptForLove,
-    Provider.GptGo,
-    Provider.You,
-]
-
-# The MLStripper class and strip_tags function
-class MLStripper(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.reset()
-        self.strict = False
-        self.convert_charrefs = True
-        self.text = io.StringIO()
-
-    def handle_data(self, d):
-        self.text.write(d)
-
-    def get_data(self):
-        return self.text.getvalue()
-
-def strip_tags(html):
-    s = MLStripper()
-    s.feed(html)
-    return s.get_data()
-
 def get_current_user():
     user_id = session.get('user_id')
     if user_id:
@@ -80,45 +52,36 @@ def start_scraping():
     db.session.add(new_quiz_set)
     db.session.commit()
 
-    global_question_counter = 1
-
-    # Process URLs and add questions
-    for url_set in data['urls']:
-        if isinstance(url_set, dict):
-            base_url = url_set.get('base_url', '')
-            if 'indiabix' in base_url:
-                start_url = int(url_set.get('start_url', 1))
-                end_url = int(url_set.get('end_url', start_url))
-                for url_number in range(start_url, end_url + 1):
-                    global_question_counter = process_question(base_url, url_number, global_question_counter, new_quiz_set.id)
-            elif 'pinoybix' in base_url:
-                global_question_counter = process_pinoybix_question(base_url, global_question_counter, new_quiz_set.id, db, Question)
-            elif 'examveda' in base_url:
-                start_page = int(url_set.get('start_page', 1))
-                end_page = int(url_set.get('end_page', 10))
-                global_question_counter = process_examveda_question(base_url, start_page, end_page, global_question_counter, new_quiz_set.id, db, Question)
-            elif 'web.archive.org' in base_url:
-                global_question_counter = process_examprimer_question(base_url, global_question_counter, new_quiz_set.id, db, Question)
-        elif isinstance(url_set, str):
-            if "pinoybix" in url_set:
-                global_question_counter = process_pinoybix_question(url_set, global_question_counter, new_quiz_set.id, db, Question)
-            elif "indiabix" in url_set:
-                global_question_counter = process_question(url_set, global_question_counter, new_quiz_set.id)
-            elif "examveda" in url_set:
-                global_question_counter = process_examveda_question(url_set, 1, 10, global_question_counter, new_quiz_set.id, db, Question)
-            elif "web.archive.org" in url_set:
-                global_question_counter = process_examprimer_question(url_set, global_question_counter, new_quiz_set.id, db, Question)
-
-    return jsonify({"message": "Scraping completed.", "quiz_set_id": str(new_quiz_set.id)}), 200
-
-@app.route('/api/getQuestionsByQuizSet/<string:quiz_set_id>', methods=['GET'])
-def get_questions_by_quiz_set(quiz_set_id):
-    print(f"Fetching questions for Quiz Set ID: {quiz_set_id}")  # Debug log
-    questions = Question.query.filter_by(quiz_set_id=quiz_set_id).order_by(Question.order).all()
-
-    print(f"Found {len(questions)} questions for Quiz Set ID: {quiz_set_id}")  # Debugging: check number of questions found
-
-    return jsonify([{
+    # Scraping runs in the background; clients poll /api/scrapeJobs/<job_id> for progress
+    job = enqueue_scrape_job(new_quiz_set.id, g.user.id, data['urls'])
+
+    return jsonify({"message": "Scraping started.", "quiz_set_id": str(new_quiz_set.id), "job_id": job.id}), 202
+
+@app.route('/api/scrapeJobs/<string:job_id>', methods=['GET'])
+def get_scrape_job(job_id):
+    job = ScrapeJob.query.join(QuizSet, QuizSet.id == ScrapeJob.quiz_set_id).filter(ScrapeJob.id == job_id, QuizSet.deleted_at.is_(None)).first()
+    if not job:
+        return jsonify({"message": "Scrape job not found"}), 404
+    return jsonify(job_status(job)), 200
+
+@app.route('/api/scrapeJobs/<string:job_id>/events', methods=['GET'])
+def stream_scrape_job(job_id):
+    # Subscribe before reading the snapshot so no event between the two is missed
+    events = scrape_events.listener.subscribe(db.engine, job_id)
+    job = ScrapeJob.query.join(QuizSet, QuizSet.id == ScrapeJob.quiz_set_id).filter(ScrapeJob.id == job_id, QuizSet.deleted_at.is_(None)).first()
+    if not job:
+        scrape_events.listener.unsubscribe(job_id, events)
+        return jsonify({"message": "Scrape job not found"}), 404
+    snapshot = job_status(job)
+
+    # The generator runs after the request context is torn down, so an open stream holds no database connection
+    response = Response(scrape_events.stream_events(job_id, events, snapshot), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def question_page_entry(question):
+    return {
         'id': question.id,
         'order': question.order,  # Include the order field
         'text': question.text,
@@ -129,42 +92,117 @@ def get_questions_by_quiz_set(quiz_set_id):
         'discussion_link': question.discussion_link,
         'favorite': question.favorite,
         'user_selected_option': question.user_selected_option
-    } for question in questions])
+    }
+
+# Pagination cursors are "<order>:<id>" of a question; pages are keyed on (order, id)
+def question_cursor(question):
+    return f"{question.order}:{question.id}"
+
+def parse_question_cursor(cursor):
+    order, question_id = cursor.split(':')
+    return int(order), int(question_id)
+
+@app.route('/api/getQuestionsByQuizSet/<string:quiz_set_id>', methods=['GET'])
+@versioned_quiz_set_response
+def get_questions_by_quiz_set(quiz_set_id):
+    # Optional modes: ?limit=N[&after=<cursor>|&before=<cursor>] pages through the set,
+    # ?window=N returns N questions either side of the saved current_question_index.
+    # Without either, the whole set is returned as a plain array.
+    limit = request.args.get('limit', type=int)
+    window = request.args.get('window', type=int)
+    if limit is not None or window is not None:
+        return get_question_page(quiz_set_id, limit, window)
+
+    print(f"Fetching questions for Quiz Set ID: {quiz_set_id}")  # Debug log
+    questions = questions_in_order(quiz_set_id).all()
+
+    print(f"Found {len(questions)} questions for Quiz Set ID: {quiz_set_id}")  # Debugging: check number of questions found
+
+    return jsonify([question_page_entry(question) for question in questions])
+
+def get_question_page(quiz_set_id, limit, window):
+    if (limit is not None and limit < 1) or (window is not None and window < 0):
+        return jsonify({"error": "limit must be positive and window non-negative"}), 400
+    # versioned_quiz_set_response has already answered 404 for missing quiz sets
+    quiz_set = (db.session.query(QuizSet.total_questions, QuizSet.current_question_index)
+                .filter(QuizSet.id == quiz_set_id).one())
+
+    try:
+        after = parse_question_cursor(request.args['after']) if request.args.get('after') else None
+        before = parse_question_cursor(request.args['before']) if request.args.get('before') else None
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    query = Question.query.filter_by(quiz_set_id=quiz_set_id)
+    result = {'total_questions': quiz_set.total_questions}
+
+    if window is not None:
+        # Positional, so this one page uses OFFSET; clients page outward from it with the cursors.
+        # The window is capped first so the page stays centred on the current question.
+        window = min(window, (config.QUESTIONS_PAGE_MAX - 1) // 2)
+        size = 2 * window + 1
+        offset = max(0, (quiz_set.current_question_index or 0) - window)
+        questions = query.order_by(Question.order, Question.id).offset(offset).limit(size + 1).all()
+        has_previous, has_next = offset > 0, len(questions) > size
+        questions = questions[:size]
+        result.update(offset=offset, current_question_index=quiz_set.current_question_index)
+    elif before is not None:
+        size = min(limit, config.QUESTIONS_PAGE_MAX)
+        questions = (query.filter(tuple_(Question.order, Question.id) < before)
+                     .order_by(Question.order.desc(), Question.id.desc())
+                     .limit(size + 1).all())
+        has_previous, has_next = len(questions) > size, True
+        questions = list(reversed(questions[:size]))
+    else:
+        size = min(limit, config.QUESTIONS_PAGE_MAX)
+        if after is not None:
+            query = query.filter(tuple_(Question.order, Question.id) > after)
+        questions = query.order_by(Question.order, Question.id).limit(size + 1).all()
+        has_previous, has_next = after is not None, len(questions) > size
+        questions = questions[:size]
+
+    result.update(
+        questions=[question_page_entry(question) for question in questions],
+        previous_cursor=question_cursor(questions[0]) if questions and has_previous else None,
+        next_cursor=question_cursor(questions[-1]) if questions and has_next else None,
+    )
+    return jsonify(result), 200
 
 @app.route('/api/getQuizSets', methods=['GET'])
 def get_quiz_sets():
     if not g.user:
         return jsonify({"error": "Unauthorized"}), 401
     
-    quiz_sets = QuizSet.query.filter_by(user_id=g.user.id).all()
+    quiz_sets = user_quiz_sets(g.user.id).all()
+
     ph_tz = timezone('Asia/Manila')
     result = []
     for qs in quiz_sets:
-        total_questions = len(qs.questions)
-        unanswered_questions = sum(1 for q in qs.questions if q.user_selected_option is None)
         last_updated = qs.last_updated.astimezone(ph_tz) if qs.last_updated else None
         result.append({
             'id': qs.id,
             'title': qs.title,
             'score': qs.score,
-            'attempts': len(qs.attempts_list),
+            'attempts': qs.attempts,
             'average_score': qs.average_score,
             'latest_score': qs.latest_score,
-            'total_questions': total_questions,
-            'unanswered_questions': unanswered_questions,
+            'total_questions': qs.total_questions,
+            'unanswered_questions': qs.total_questions - qs.answered_count,
             'finished': qs.finished,
-            'progress': qs.progress,
+            'progress': QuizSet.compute_progress(qs.finished, qs.total_questions, qs.answered_count),
             'last_updated': last_updated.isoformat() if last_updated else None,
         })
     return jsonify(result)
 
 @app.route('/api/renameQuizSet/<string:quiz_set_id>', methods=['PUT'])
+@live_quiz_set_required
 def rename_quiz_set(quiz_set_id):
     data = request.json
     new_title = data.get('new_title')
     quiz_set = db.session.query(QuizSet).get(quiz_set_id)
     if quiz_set:
         quiz_set.title = new_title
+        bump_version(quiz_set_id)
         db.session.commit()
         return jsonify({'message': 'Quiz set title updated successfully'}), 200
     return jsonify({'message': 'Quiz set not found'}), 
@@ -175,8 +213,9 @@ def get_questions():
     return jsonify([{...} for question in questions])  # Unchanged
 
 @app.route('/api/getFavorites/<string:quiz_set_id>', methods=['GET'])
+@versioned_quiz_set_response
 def get_favorites(quiz_set_id):
-    favorites = Question.query.filter_by(quiz_set_id=quiz_set_id, favorite=True).all()
+    favorites = favorite_questions(quiz_set_id).all()
     favorites_list = [{
         'id': question.id,
         'text': question.text,
@@ -193,10 +232,13 @@ def get_favorites(quiz_set_id):
 def toggle_favorite():
     data = request.json
     question_id = data['question_id']
-    question = db.session.query(Question).get(question_id)
+    question = live_question(question_id).first()
     if question:
         question.favorite = not question.favorite
+        question.version = Question.version + 1
+        bump_version(question.quiz_set_id)
         db.session.commit()
+        return jsonify({"message": "Favorite toggled", "version": question.version}), 200
     return jsonify({"message": "Favorite toggled"}), 200
 
 @app.route('/api/updateUserSelection', methods=['POST'])
@@ -204,18 +246,69 @@ def update_user_selection():
     data = request.json
     question_id = data['question_id']
     selected_option = data['selected_option']  # Can be None for deselection
-    question = db.session.query(Question).get(question_id)
+    question = set_user_selection(question_id, selected_option)
     if question:
-        question.user_selected_option = selected_option
+        bump_version(question.quiz_set_id)
         db.session.commit()
-        return jsonify({"message": "User selection updated"}), 200
+        return jsonify({"message": "User selection updated", "version": question.version}), 200
     return jsonify({"message": "Question not found"}), 404
 
+def parse_question_change(change):
+    """Validate one entry of an updateQuestionsBatch change log, returning it without unknown keys."""
+    if not isinstance(change, dict) or type(change.get('question_id')) is not int or type(change.get('version')) is not int:
+        raise ValueError("Each change needs an integer question_id and version")
+    parsed = {'question_id': change['question_id'], 'version': change['version']}
+    if 'selected_option' in change:
+        selected_option = change['selected_option']  # None clears the selection
+        if selected_option is not None and (not isinstance(selected_option, str) or len(selected_option) > 10):
+            raise ValueError("selected_option must be a short string or null")
+        parsed['selected_option'] = selected_option
+    if 'favorite' in change:
+        if not isinstance(change['favorite'], bool):
+            raise ValueError("favorite must be a boolean")
+        parsed['favorite'] = change['favorite']
+    if len(parsed) == 2:
+        raise ValueError("Each change needs selected_option or favorite")
+    return parsed
+
+@app.route('/api/updateQuestionsBatch', methods=['POST'])
+def update_questions_batch():
+    # Body: {"changes": [{"question_id": int, "version": int, "selected_option"?: str|null,
+    # "favorite"?: bool}]}. version is the question's version the change was made against (from
+    # getQuestionVersions or an earlier write); favorite is the new value, not a toggle.
+    data = request.get_json(silent=True) or {}
+    changes = data.get('changes')
+    if not isinstance(changes, list):
+        return jsonify({"error": "A list of changes is required"}), 400
+    if len(changes) > config.QUESTION_BATCH_MAX:
+        return jsonify({"error": f"At most {config.QUESTION_BATCH_MAX} changes per batch"}), 400
+    try:
+        changes = [parse_question_change(change) for change in changes]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    versions = apply_question_changes(changes)
+    db.session.commit()
+    question_ids = {change['question_id'] for change in changes}
+    return jsonify({
+        "applied": sorted(versions),
+        # Unknown questions, or ones written since the change's version; the client should reload them
+        "ignored": sorted(question_ids - versions.keys()),
+        "versions": versions,
+    }), 200
+
 @app.route('/api/getUserSelections/<string:quiz_set_id>', methods=['GET'])
+@versioned_quiz_set_response
 def get_user_selections(quiz_set_id):
-    questions = Question.query.filter_by(quiz_set_id=quiz_set_id).all()
-    selections = {question.id: question.user_selected_option for question in questions}
-    return jsonify(selections)
+    rows = db.session.query(Question.id, Question.user_selected_option).filter_by(quiz_set_id=quiz_set_id).all()
+    return jsonify({question_id: selected_option for question_id, selected_option in rows})
+
+@app.route('/api/getQuestionVersions/<string:quiz_set_id>', methods=['GET'])
+@versioned_quiz_set_response
+def get_question_versions(quiz_set_id):
+    # The versions updateQuestionsBatch changes are made against
+    rows = db.session.query(Question.id, Question.version).filter_by(quiz_set_id=quiz_set_id).all()
+    return jsonify({question_id: version for question_id, version in rows})
 
 @app.route('/api/updateScore', methods=['POST'])
 def update_score():
@@ -250,98 +343,65 @@ def get_score(quiz_set_id):
     return jsonify({"score": session['scores'][quiz_set_id]}), 200
 
 @app.route('/api/shuffleQuestions/<string:quiz_set_id>', methods=['POST'])
+@live_quiz_set_required
 def shuffle_questions(quiz_set_id):
-    questions = Question.query.filter_by(quiz_set_id=quiz_set_id).all()
-    if not questions:
+    # Returns only the new ordering as [{id, order, version}]; question content is unchanged
+    ordering = shuffle_question_order(quiz_set_id)
+    if not ordering:
         return jsonify({'message': 'No questions found for this quiz set'}), 404
-    
-    question_ids = [q.id for q in questions]
-    random.shuffle(question_ids)
-
-    for new_order, question_id in enumerate(question_ids):
-        question = next(q for q in questions if q.id == question_id)
-        question.order = new_order
-        question.user_selected_option = None  # Reset user selection
-    
+    bump_version(quiz_set_id)
     db.session.commit()
-
-    shuffled_questions = Question.query.filter_by(quiz_set_id=quiz_set_id).order_by(Question.order).all()
-    return jsonify([{
-        'id': question.id,
-        'order': question.order,  # Include the order field
-        'text': question.text,
-        'options': question.options,
-        'answer': question.answer,
-        'quiz_set_id': question.quiz_set_id,
-        'favorite': question.favorite,
-        'url': question.url,
-        'explanation': question.explanation,
-        'discussion_link': question.discussion_link,
-        'user_selected_option': question.user_selected_option
-    } for question in shuffled_questions]), 200
+    return jsonify([{'id': question_id, 'order': order, 'version': version} for question_id, order, version in ordering]), 200
 
 @app.route('/api/resetQuestions/<string:quiz_set_id>', methods=['POST'])
+@live_quiz_set_required
 def reset_questions(quiz_set_id):
-    questions = Question.query.filter_by(quiz_set_id=quiz_set_id).order_by(Question.order).all()
-    if not questions:
+    ordering = reset_selections(quiz_set_id)
+    if not ordering:
         return jsonify({'message': 'No questions found for this quiz set'}), 404
-    
-    for question in questions:
-        question.user_selected_option = None  # Reset user selection
-    
+    bump_version(quiz_set_id)
     db.session.commit()
-
-    # Return the questions in their original order with necessary fields
-    return jsonify([{
-        'id': question.id,
-        'order': question.order,
-        'text': question.text,
-        'options': question.options,
-        'answer': question.answer,
-        'quiz_set_id': question.quiz_set_id,
-        'favorite': question.favorite,
-        'url': question.url,
-        'explanation': question.explanation,
-        'discussion_link': question.discussion_link,
-        'user_selected_option': question.user_selected_option
-    } for question in questions]), 200
+    return jsonify([{'id': question_id, 'order': order, 'version': version} for question_id, order, version in ordering]), 200
 
 @app.route('/api/getQuizSetDetails/<string:quiz_set_id>', methods=['GET'])
+@versioned_quiz_set_response
 def get_quiz_set_details(quiz_set_id):
-    quiz_set = QuizSet.query.get(quiz_set_id)
+    quiz_set = (db.session.query(
+            QuizSet.id, QuizSet.title, QuizSet.urls, QuizSet.score, QuizSet.attempts,
+            QuizSet.total_questions, QuizSet.answered_count)
+        .filter_by(id=quiz_set_id)
+        .first())
     if not quiz_set:
         return jsonify({'message': 'Quiz set not found'}), 404
 
-    questions = Question.query.filter_by(quiz_set_id=quiz_set_id).all()
-    answered_questions = [q for q in questions if q.user_selected_option is not None]
-    progress = len(answered_questions) / len(questions) * 100 if questions else 0
+    total_questions = quiz_set.total_questions
+    progress = quiz_set.answered_count / total_questions * 100 if total_questions else 0
 
     return jsonify({
         'id': quiz_set.id,
         'title': quiz_set.title,
         'urls': json.loads(quiz_set.urls) if quiz_set.urls else [],
         'progress': round(progress),
-        'total_questions': len(questions),
-        'answered_questions': len(answered_questions),
+        'total_questions': total_questions,
+        'answered_questions': quiz_set.answered_count,
         'score': quiz_set.score,
         'attempts': quiz_set.attempts
     })
 
 @app.route('/api/getQuizSetScore/<string:quiz_set_id>', methods=['GET'])
+@live_quiz_set_required
 def get_quiz_set_score(quiz_set_id):
-    quiz_set = QuizSet.query.get(quiz_set_id)
+    quiz_set = db.session.query(QuizSet.correct_count, QuizSet.total_questions).filter_by(id=quiz_set_id).first()
     if not quiz_set:
         return jsonify({'message': 'Quiz set not found'}), 404
 
-    questions = Question.query.filter_by(quiz_set_id=quiz_set_id).all()
-    correct_answers_count = sum(1 for q in questions if q.user_selected_option == q.answer)
-
-    score = correct_answers_count  # or calculate the percentage if needed
-    total_questions = len(questions)
+    score = quiz_set.correct_count  # or calculate the percentage if needed
+    total_questions = quiz_set.total_questions
 
     return jsonify({"score": score, "total_questions": total_questions}), 200
 
 @app.route('/api/updateQuizSetScore/<string:quiz_set_id>', methods=['POST'])
+@live_quiz_set_required
 def update_quiz_set_score(quiz_set_id):
     data = request.json
     score = data['score']
@@ -359,6 +419,7 @@ def update_quiz_set_score(quiz_set_id):
 
     # Mark the quiz as finished
     quiz_set.finished = True
+    bump_version(quiz_set_id)
 
     db.session.commit()
 
@@ -406,6 +467,7 @@ def get_editor_content():
         return jsonify({"content": ""}), 200
 
 @app.route('/api/getEyeIconState/<string:quiz_set_id>', methods=['GET'])
+@live_quiz_set_required
 def get_eye_icon_state(quiz_set_id):
     quiz_set = QuizSet.query.get(quiz_set_id)
     if quiz_set:
@@ -414,6 +476,7 @@ def get_eye_icon_state(quiz_set_id):
         return jsonify({"message": "Quiz set not found"}), 404
 
 @app.route('/api/updateEyeIconState/<string:quiz_set_id>', methods=['POST'])
+@live_quiz_set_required
 def update_eye_icon_state(quiz_set_id):
     data = request.json
     state = data['state']  # True for 'open', False for 'none'
@@ -427,6 +490,7 @@ def update_eye_icon_state(quiz_set_id):
         return jsonify({"message": "Quiz set not found"}), 404
 
 @app.route('/api/updateQuizSetStatus/<string:quiz_set_id>', methods=['POST'])
+@live_quiz_set_required
 def update_quiz_set_status(quiz_set_id):
     data = request.json
     status = data.get('status')
@@ -440,20 +504,6 @@ def update_quiz_set_status(quiz_set_id):
 
     return jsonify({'message': 'Quiz set status updated successfully'}), 200
 
-def get_llm_response(prompt, providers):
-    for provider in providers:
-        try:
-            llm: LLM = G4FLLM(
-                model=models.gpt_35_turbo,
-                provider=provider,
-            )
-            res = llm(prompt)
-            return res
-        except Exception as e:
-            print(f"Error with provider {provider}: {e}")
-            continue
-    raise Exception("All providers failed")
-
 # Route to get further explanation based on POST request
 @app.route('/api/getFurtherExplanation', methods=['POST'])
 def post_further_explanation():
@@ -463,44 +513,78 @@ def post_further_explanation():
     options = data['options']
     answer = data['answer']
     explanation = data.get('explanation', '')
-
-    # Construct the prompt for the AI bot
-    if explanation and explanation != "Explanation not found.":
-        prompt = f"Given this explanation '{explanation}', explain further why {answer} is the answer to this following Question: {question_text} {' '.join(options)}. Explain it in the simplest and most appropriate way to understand, in Layman’s terms, why {answer} is the answer. Also, identify very brief keywords from the question_text that would serve as a memory guide or hint that would immediately kick in as to why we have the respective answer."
-    else:
-        prompt = f"Given this Question: {question_text} {' '.join(options)}, explain in the simplest and most appropriate way to understand, in Layman’s terms, why {answer} is the answer. Also, identify very brief keywords from the question_text that would serve as a memory guide or hint that would immediately kick in as to why we have the respective answer."
+    refresh = bool(data.get('refresh', False))  # Ask for a new answer instead of the cached one
 
     try:
-        further_explanation = get_llm_response(prompt, providers_to_try)
-        return jsonify({"further_explanation": further_explanation})
+        further_explanation, cached = explain(question_text, options, answer, explanation, refresh)
     except Exception as e:
         print(f"Error obtaining further explanation: {e}")
         return jsonify({"error": "Failed to get further explanation"}), 500
 
+    return jsonify({"further_explanation": further_explanation, "cached": cached})
+
+@app.route('/api/pregenerateExplanations/<string:quiz_set_id>', methods=['POST'])
+@live_quiz_set_required
+def pregenerate_explanations(quiz_set_id):
+    # Body (optional): {"only_incorrect": bool}. Questions that already have a further explanation are skipped.
+    if not g.user:
+        return jsonify({"error": "Unauthorized"}), 401
+    data = request.get_json(silent=True) or {}
+    job = enqueue_explanation_job(quiz_set_id, g.user.id, bool(data.get('only_incorrect', False)))
+    return jsonify({"message": "Explanation generation started.", "job_id": job.id}), 202
+
+@app.route('/api/explanationJobs/<string:job_id>', methods=['GET'])
+def get_explanation_job(job_id):
+    job = ExplanationJob.query.join(QuizSet, QuizSet.id == ExplanationJob.quiz_set_id).filter(ExplanationJob.id == job_id, QuizSet.deleted_at.is_(None)).first()
+    if not job:
+        return jsonify({"message": "Explanation job not found"}), 404
+    return jsonify(explanation_job_status(job)), 200
+
+# Streaming variant: the same request body, answered as Server-Sent Events ('chunk' events
+# carrying text as the provider produces it, then 'done' with the cache flag, or 'error')
+@app.route('/api/getFurtherExplanation/stream', methods=['POST'])
+def stream_further_explanation():
+    data = request.json
+    events = stream_explanation(data['question_text'], data['options'], data['answer'],
+                                data.get('explanation', ''), bool(data.get('refresh', False)))
+    response = Response((scrape_events.format_event(event, payload) for event, payload in events),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 # Route to save further explanation
 @app.route('/api/saveFurtherExplanation', methods=['POST'])
 def save_further_explanation():
     data = request.json
     question_id = data['question_id']
     explanation = data['explanation']
+    replace = bool(data.get('replace', False))  # Set by Reload, whose answer supersedes the saved one
+    if not live_question(question_id).first():
+        return jsonify({"message": "Question not found"}), 404
 
-    # Create and save further explanation
-    new_explanation = FurtherExplanation(question_id=question_id, explanation=explanation)
-    db.session.add(new_explanation)
-    db.session.commit()
-
+    save_further_explanation(question_id, explanation, replace)
     return jsonify({"message": "Further explanation saved"}), 200
 
 # New GET route to retrieve further explanation
 @app.route('/api/getFurtherExplanation/<int:question_id>', methods=['GET'])
 def get_further_explanation(question_id):
-    explanation = FurtherExplanation.query.filter_by(question_id=question_id).first()
+    explanation = further_explanation_for(question_id).first()
     if explanation:
         return jsonify({"explanation": explanation.explanation}), 200
     else:
         return jsonify({"message": "Further explanation not found"}), 404
 
+@app.route('/api/admin/llmProviders', methods=['GET'])
+def get_llm_provider_stats():
+    if not g.user:
+        return jsonify({"error": "Unauthorized"}), 401
+    if g.user.id not in config.ADMIN_USER_IDS:
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify({"providers": llm_scheduler.stats()}), 200
+
 @app.route('/api/toggleLockState/<string:quiz_set_id>', methods=['POST'])
+@live_quiz_set_required
 def toggle_lock_state(quiz_set_id):
     quiz_set = QuizSet.query.get(quiz_set_id)
     if quiz_set:
@@ -511,6 +595,7 @@ def toggle_lock_state(quiz_set_id):
         return jsonify({"message": "Quiz set not found"}), 404
 
 @app.route('/api/getLockState/<string:quiz_set_id>', methods=['GET'])
+@live_quiz_set_required
 def get_lock_state(quiz_set_id):
     quiz_set = QuizSet.query.get(quiz_set_id)
     if quiz_set:
@@ -534,63 +619,38 @@ def get_global_lock_state():
 
 @app.route('/api/getDiscussionComments/<int:question_id>', methods=['GET'])
 def get_discussion_comments(question_id):
-    question = Question.query.get(question_id)
-    if question and question.discussion_link:
+    content = (QuestionContent.query.join(Question, Question.content_id == QuestionContent.id)
+               .join(QuizSet, QuizSet.id == Question.quiz_set_id)
+               .filter(Question.id == question_id, QuizSet.deleted_at.is_(None)).first())
+    if content and content.discussion_link:
         try:
-            comments = fetch_discussion_comments(question.discussion_link)
+            comments = load_discussion_comments(content)
             return jsonify({"discussion_comments": comments}), 200
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     return jsonify({"error": "Question or discussion link not found"}), 404
 
 @app.route('/api/downloadQuizPdf/<string:quiz_set_id>', methods=['GET'])
+@live_quiz_set_required
 def download_quiz_pdf(quiz_set_id):
-    quiz_set = QuizSet.query.get(quiz_set_id)
+    quiz_set = db.session.query(QuizSet.title).filter(QuizSet.id == quiz_set_id).first()
     if not quiz_set:
         return jsonify({'message': 'Quiz set not found'}), 404
 
-    questions = Question.query.filter_by(quiz_set_id=quiz_set_id).order_by(Question.order).all()
-    
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-
-    y_position = height - 30
-    p.drawString(30, y_position, f"Quiz: {quiz_set.title}")
-    y_position -= 20
-
-    for i, question in enumerate(questions, start=1):
-        y_position -= 15
-        p.drawString(30, y_position, f"Question No. {i}: {strip_tags(question.text)}")
-        y_position -= 15
-
-        for j, option in enumerate(question.options, start=1):
-            p.drawString(30, y_position, f"{chr(64+j)}. {strip_tags(option)}")  # Adjusted x-coordinate to 30
-            y_position -= 15
-
-        correct_answer = question.answer.replace("Option ", "")
-        p.drawString(30, y_position, f"Answer: {correct_answer}")  # Adjusted x-coordinate to 30
-        y_position -= 20
+    # Rendered once per distinct content and sent from disk after that
+    path = pdf_cache.get(quiz_set_id, quiz_set.title)
+    return send_file(path, as_attachment=True, download_name=f"{quiz_set.title}.pdf", mimetype='application/pdf')
 
-        if y_position < 50:
-            p.showPage()
-            y_position = height - 30
-
-    p.save()
-    buffer.seek(0)
-
-    return send_file(buffer, as_attachment=True, download_name=f"{quiz_set.title}.pdf", mimetype='application/pdf')\
+def deletion_response(deleted, queued, message):
+    # 202 when any of the quiz sets are still being removed in the background
+    return jsonify({'message': message, 'deleted': deleted, 'queued': queued}), 202 if queued else 200
 
 @app.route('/api/deleteQuizSet/<string:quiz_set_id>', methods=['DELETE'])
 def delete_quiz_set(quiz_set_id):
-    quiz_set = QuizSet.query.get(quiz_set_id)
-    if not quiz_set:
+    deleted, queued = delete_quiz_sets([quiz_set_id])
+    if not deleted and not queued:
         return jsonify({'message': 'Quiz set not found'}), 404
-
-    db.session.delete(quiz_set)
-    db.session.commit()
-    
-    return jsonify({'message': f'Quiz set {quiz_set_id} deleted successfully'}), 200
+    return deletion_response(deleted, queued, f'Quiz set {quiz_set_id} deleted successfully')
 
 @app.route('/api/deleteMultipleQuizSets', methods=['POST'])
 def delete_multiple_quiz_sets():
@@ -601,28 +661,26 @@ def delete_multiple_quiz_sets():
         return jsonify({'message': 'No quiz sets specified for deletion'}), 400
     
     try:
-        quiz_sets = QuizSet.query.filter(QuizSet.id.in_(quiz_set_ids)).all()
-        for quiz_set in quiz_sets:
-            db.session.delete(quiz_set)
-        db.session.commit()
-        return jsonify({'message': f'{len(quiz_set_ids)} quiz sets deleted successfully'}), 200
+        deleted, queued = delete_quiz_sets(quiz_set_ids)
+        return deletion_response(deleted, queued, f'{len(deleted) + len(queued)} quiz sets deleted successfully')
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Error deleting quiz sets: {str(e)}'}), 500
 
 @app.route('/api/deleteAllQuizSets', methods=['POST'])
 def delete_all_quiz_sets():
+    if not g.user:
+        return jsonify({"error": "Unauthorized"}), 401
     try:
-        quiz_sets = QuizSet.query.all()
-        for quiz_set in quiz_sets:
-            db.session.delete(quiz_set)
-        db.session.commit()
-        return jsonify({'message': 'All quiz sets deleted successfully'}), 200
+        quiz_set_ids = [quiz_set_id for (quiz_set_id,) in db.session.query(QuizSet.id).filter(QuizSet.user_id == g.user.id)]
+        deleted, queued = delete_quiz_sets(quiz_set_ids)
+        return deletion_response(deleted, queued, 'All quiz sets deleted successfully')
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Error deleting all quiz sets: {str(e)}'}), 500
 
 @app.route('/api/getRawUrls/<string:quiz_set_id>', methods=['GET'])
+@live_quiz_set_required
 def get_raw_urls(quiz_set_id):
     quiz_set = QuizSet.query.get(quiz_set_id)
     if quiz_set:
@@ -652,6 +710,7 @@ def get_sort_order():
         return jsonify({"sortOrder": "desc"}), 200  # Default to 'desc' if no quiz sets exist
 
 @app.route('/api/updateCurrentQuestionIndex/<string:quiz_set_id>', methods=['POST'])
+@live_quiz_set_required
 def update_current_question_index(quiz_set_id):
     data = request.json
     index = data.get('index')
@@ -665,6 +724,7 @@ def update_current_question_index(quiz_set_id):
         return jsonify({"message": "Quiz set not found"}), 404
 
 @app.route('/api/getCurrentQuestionIndex/<string:quiz_set_id>', methods=['GET'])
+@live_quiz_set_required
 def get_current_question_index(quiz_set_id):
     quiz_set = QuizSet.query.get(quiz_set_id)
     if quiz_set:
@@ -673,6 +733,7 @@ def get_current_question_index(quiz_set_id):
         return jsonify({"message": "Quiz set not found"}), 404
 
 @app.route('/api/updateQuizSetState/<string:quiz_set_id>', methods=['POST'])
+@live_quiz_set_required
 def update_quiz_set_state(quiz_set_id):
     data = request.json
     index = data.get('index')
@@ -688,6 +749,7 @@ def update_quiz_set_state(quiz_set_id):
         return jsonify({"message": "Quiz set not found"}), 404
 
 @app.route('/api/getQuizSetState/<string:quiz_set_id>', methods=['GET'])
+@live_quiz_set_required
 def get_quiz_set_state(quiz_set_id):
     quiz_set = QuizSet.query.get(quiz_set_id)
     if quiz_set:
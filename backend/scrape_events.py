@@ -0,0 +1,188 @@
+# scrape_events.py
+
+from collections import defaultdict
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from sqlalchemy import text
+import config
+
+logger = logging.getLogger(__name__)
+
+# Scrape jobs publish progress with NOTIFY so a stream held open by any worker process receives it
+CHANNEL = 'scrape_events'
+
+# Events that end a job's stream
+TERMINAL_STATUSES = ('completed', 'failed', 'interrupted')
+
+class EventPublisher:
+    """Publishes one scrape job's events over a single dedicated connection.
+
+    publish() only queues the event, so fetch threads never wait on the database or take a
+    pooled connection. A background thread sends whatever has queued up every
+    SCRAPE_EVENTS_FLUSH_SECONDS in one transaction; the notifications are delivered at its
+    commit, in order. close() sends the rest and releases the connection.
+    """
+
+    def __init__(self, engine, job_id):
+        self.engine = engine
+        self.job_id = job_id
+        self.pending = queue.Queue()
+        self.closed = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f'scrape-events-{job_id}', daemon=True)
+        self.thread.start()
+
+    def publish(self, event, data):
+        self.pending.put((event, json.dumps({'job_id': self.job_id, 'event': event, 'data': data})))
+
+    def close(self):
+        self.closed.set()
+        self.thread.join()
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self.pending.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _connect(self):
+        connection = self.engine.raw_connection()
+        dbapi_connection = connection.driver_connection
+        connection.detach()  # Held for the life of the job, so keep it out of the pool
+        return dbapi_connection
+
+    def _run(self):
+        connection = None
+        while True:
+            closing = self.closed.wait(config.SCRAPE_EVENTS_FLUSH_SECONDS)
+            batch = self._drain()
+            if batch:
+                try:
+                    if connection is None:
+                        connection = self._connect()
+                    with connection.cursor() as cursor:
+                        for _, payload in batch:
+                            cursor.execute('SELECT pg_notify(%s, %s)', (CHANNEL, payload))
+                    connection.commit()
+                except Exception as e:
+                    # Progress events are best effort and must never fail a scrape
+                    logger.warning(f"Failed to publish {len(batch)} events ({batch[-1][0]} last) for scrape job {self.job_id}: {e}")
+                    if connection is not None:
+                        try:
+                            connection.close()
+                        except Exception:
+                            pass
+                    connection = None
+            if closing:
+                break
+        if connection is not None:
+            connection.close()
+
+class ScrapeEventListener:
+    """Fans scrape job notifications out to the streams open in this process.
+
+    One thread per process LISTENs on a dedicated connection and hands each event to
+    per-stream queues, so an open stream costs a queue and a waiting thread but no
+    database connection.
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+        self.engine = None
+        self.thread = None
+
+    def subscribe(self, engine, job_id):
+        events = queue.Queue(maxsize=config.SCRAPE_EVENTS_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers[job_id].add(events)
+            if self.thread is None:
+                self.engine = engine
+                self.thread = threading.Thread(target=self._listen, name='scrape-events', daemon=True)
+                self.thread.start()
+        return events
+
+    def unsubscribe(self, job_id, events):
+        with self.lock:
+            self.subscribers[job_id].discard(events)
+            if not self.subscribers[job_id]:
+                del self.subscribers[job_id]
+
+    def _dispatch(self, payload):
+        message = json.loads(payload)
+        with self.lock:
+            subscribers = list(self.subscribers.get(message['job_id'], ()))
+        for events in subscribers:
+            try:
+                events.put_nowait((message['event'], message['data']))
+            except queue.Full:
+                # A stream that stopped reading loses its oldest events rather than blocking the listener
+                try:
+                    events.get_nowait()
+                    events.put_nowait((message['event'], message['data']))
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def _listen(self):
+        while True:
+            connection = None
+            try:
+                connection = self.engine.raw_connection()
+                dbapi_connection = connection.driver_connection
+                connection.detach()  # Held for the life of the process, so keep it out of the pool
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                logger.info(f"Listening for scrape events on channel {CHANNEL}")
+
+                while True:
+                    if select.select([dbapi_connection], [], [], 60) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        self._dispatch(dbapi_connection.notifies.pop(0).payload)
+            except Exception as e:
+                logger.warning(f"Scrape event listener failed, reconnecting: {e}")
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                time.sleep(5)
+
+listener = ScrapeEventListener()
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_events(job_id, events, snapshot):
+    """Yield a job's events as Server-Sent Events, starting from a status snapshot, until it finishes."""
+    try:
+        yield format_event('status', snapshot)
+        if snapshot['status'] in TERMINAL_STATUSES:
+            return
+
+        idle_seconds = 0
+        while True:
+            try:
+                event, data = events.get(timeout=config.SCRAPE_EVENTS_HEARTBEAT_SECONDS)
+            except queue.Empty:
+                idle_seconds += config.SCRAPE_EVENTS_HEARTBEAT_SECONDS
+                if idle_seconds > config.SCRAPE_JOB_STALE_SECONDS:
+                    # Nothing heard from the job for too long; the worker running it is gone
+                    yield format_event('status', {'status': 'interrupted'})
+                    return
+                yield ": keep-alive\n\n"
+                continue
+
+            idle_seconds = 0
+            yield format_event(event, data)
+            if event == 'status' and data.get('status') in TERMINAL_STATUSES:
+                return
+    finally:
+        listener.unsubscribe(job_id, events)
@@ -0,0 +1,188 @@
+# scrape_jobs.py
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import json
+import logging
+import time
+import traceback
+from app_init import app
+from db import db
+from models import ScrapeJob
+from scraping_helpers import ScrapeProgress, process_question, process_question_range, process_pinoybix_question, process_examveda_question, process_examprimer_question
+import config
+import http_client
+import scrape_events
+
+logger = logging.getLogger(__name__)
+
+# Scrape jobs run in the background so /api/startScraping can return immediately
+executor = ThreadPoolExecutor(max_workers=config.SCRAPE_JOB_WORKERS, thread_name_prefix='scrape-job')
+
+class JobProgress(ScrapeProgress):
+    """Records scraper progress on the ScrapeJob row so any worker can report it, and
+    publishes each step to the job's event stream."""
+
+    def __init__(self, job_id, pages_total):
+        super().__init__()
+        self.job_id = job_id
+        # Created here because fetch threads run outside the app context
+        self.events = scrape_events.EventPublisher(db.engine, job_id)
+        self.failed_urls = []
+        self.pages_total = pages_total
+        self.pages_done = 0
+        self.pages_failed = 0
+        self.questions_inserted = 0
+
+    def counts(self):
+        return {
+            'pages_total': self.pages_total,
+            'pages_done': self.pages_done,
+            'pages_failed': self.pages_failed,
+            'questions_inserted': self.questions_inserted,
+        }
+
+    def publish(self, event, **data):
+        self.events.publish(event, data)
+
+    def close(self):
+        self.events.close()
+
+    def _update(self, **values):
+        with self.cache_lock:
+            values['cache_hits'] = self.cache_counts['hit']
+            values['cache_revalidated'] = self.cache_counts['revalidated']
+            values['cache_misses'] = self.cache_counts['miss']
+        values['updated_at'] = datetime.now(config.PH_TZ)
+        ScrapeJob.query.filter_by(id=self.job_id).update(values)
+        db.session.commit()
+
+    def page_done(self, url, questions_added):
+        self._update(pages_done=ScrapeJob.pages_done + 1,
+                     questions_inserted=ScrapeJob.questions_inserted + questions_added)
+        self.pages_done += 1
+        self.publish('page', url=url, status='done', questions=questions_added, **self.counts())
+
+    def page_failed(self, url):
+        self.failed_urls.append(url)
+        self._update(pages_failed=ScrapeJob.pages_failed + 1, failed_urls=json.dumps(self.failed_urls))
+        self.pages_failed += 1
+        self.publish('page', url=url, status='failed', questions=0, **self.counts())
+
+    def batch_committed(self, questions_added):
+        self.questions_inserted += questions_added
+        self.publish('batch', questions=questions_added, questions_inserted=self.questions_inserted)
+
+    def retry_wait(self, url, attempt, wait_seconds, error):
+        self.publish('retry', url=url, attempt=attempt, wait_seconds=wait_seconds, error=error[:500])
+
+    def cache_result(self, url, status):
+        super().cache_result(url, status)
+        self.publish('fetch', url=url, cache=status)
+
+def count_pages(urls):
+    total = 0
+    for url_set in urls:
+        if isinstance(url_set, dict):
+            base_url = url_set.get('base_url', '')
+            if 'indiabix' in base_url:
+                start_url = int(url_set.get('start_url', 1))
+                total += int(url_set.get('end_url', start_url)) - start_url + 1
+            elif 'examveda' in base_url:
+                total += int(url_set.get('end_page', 10)) - int(url_set.get('start_page', 1)) + 1
+            elif 'pinoybix' in base_url or 'web.archive.org' in base_url:
+                total += 1
+        elif isinstance(url_set, str):
+            if 'examveda' in url_set:
+                total += 10
+            elif any(site in url_set for site in ('pinoybix', 'indiabix', 'web.archive.org')):
+                total += 1
+    return total
+
+def scrape_urls(urls, quiz_set_id, progress, client):
+    global_question_counter = 1
+
+    # Process URLs and add questions
+    for url_set in urls:
+        if isinstance(url_set, dict):
+            base_url = url_set.get('base_url', '')
+            if 'indiabix' in base_url:
+                start_url = int(url_set.get('start_url', 1))
+                end_url = int(url_set.get('end_url', start_url))
+                global_question_counter = process_question_range(base_url, start_url, end_url, global_question_counter, quiz_set_id, progress, client)
+            elif 'pinoybix' in base_url:
+                global_question_counter = process_pinoybix_question(base_url, global_question_counter, quiz_set_id, progress, client)
+            elif 'examveda' in base_url:
+                start_page = int(url_set.get('start_page', 1))
+                end_page = int(url_set.get('end_page', 10))
+                global_question_counter = process_examveda_question(base_url, start_page, end_page, global_question_counter, quiz_set_id, progress, client)
+            elif 'web.archive.org' in base_url:
+                global_question_counter = process_examprimer_question(base_url, global_question_counter, quiz_set_id, progress)
+        elif isinstance(url_set, str):
+            if "pinoybix" in url_set:
+                global_question_counter = process_pinoybix_question(url_set, global_question_counter, quiz_set_id, progress, client)
+            elif "indiabix" in url_set:
+                global_question_counter = process_question(url_set, None, global_question_counter, quiz_set_id, progress, client)
+            elif "examveda" in url_set:
+                global_question_counter = process_examveda_question(url_set, 1, 10, global_question_counter, quiz_set_id, progress, client)
+            elif "web.archive.org" in url_set:
+                global_question_counter = process_examprimer_question(url_set, global_question_counter, quiz_set_id, progress)
+
+    return global_question_counter - 1
+
+def run_scrape_job(job_id, urls):
+    with app.app_context():
+        job = ScrapeJob.query.get(job_id)
+        job.status = 'running'
+        job.started_at = job.updated_at = datetime.now(config.PH_TZ)
+        db.session.commit()
+        quiz_set_id = job.quiz_set_id
+        progress = JobProgress(job_id, job.pages_total)
+        progress.publish('status', status='running', **progress.counts())
+
+        try:
+            scrape_started = time.perf_counter()
+            question_count = scrape_urls(urls, quiz_set_id, progress, http_client.client)
+            ScrapeJob.query.filter_by(id=job_id).update({'status': 'completed', 'finished_at': datetime.now(config.PH_TZ), 'updated_at': datetime.now(config.PH_TZ)})
+            db.session.commit()
+            progress.publish('status', status='completed', **progress.counts())
+            logger.info(f"Scrape job {job_id} scraped {question_count} questions for quiz set {quiz_set_id} in {time.perf_counter() - scrape_started:.2f}s")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Scrape job {job_id} failed: {e}\n{traceback.format_exc()}")
+            ScrapeJob.query.filter_by(id=job_id).update({'status': 'failed', 'error': str(e), 'finished_at': datetime.now(config.PH_TZ), 'updated_at': datetime.now(config.PH_TZ)})
+            db.session.commit()
+            progress.publish('status', status='failed', error=str(e)[:500], **progress.counts())
+        finally:
+            progress.close()
+
+def enqueue_scrape_job(quiz_set_id, user_id, urls):
+    job = ScrapeJob(quiz_set_id=quiz_set_id, user_id=user_id, pages_total=count_pages(urls))
+    db.session.add(job)
+    db.session.commit()
+    executor.submit(run_scrape_job, job.id, urls)
+    return job
+
+def job_status(job):
+    status = job.reported_status(config.SCRAPE_JOB_STALE_SECONDS)
+
+    return {
+        'id': job.id,
+        'quiz_set_id': job.quiz_set_id,
+        'status': status,
+        'pages_total': job.pages_total,
+        'pages_done': job.pages_done,
+        'pages_failed': job.pages_failed,
+        'failed_urls': json.loads(job.failed_urls) if job.failed_urls else [],
+        'questions_inserted': job.questions_inserted,
+        'cache': {
+            'hits': job.cache_hits,
+            'revalidated': job.cache_revalidated,
+            'misses': job.cache_misses,
+        },
+        'eta_seconds': job.eta_seconds if status == 'running' else None,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
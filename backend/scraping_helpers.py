@@ -5,14 +5,18 @@ from bs4 import BeautifulSoup, Tag
 from urllib.parse import urljoin
 import os
 import re
-from random import choice
 import time
-from app_init import db
-from models import Question  # Changed from relative to absolute import
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from question_writer import QuestionWriter
 import config  # Changed from relative to absolute import
+import http_client
+import page_cache
+import browser_pool
+from html_parsing import parse_page
 from config import img_type_directory  # Changed from relative to absolute import
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -25,56 +29,78 @@ def process_image_url(img_url, base_url="https://www.indiabix.com"):
     # Otherwise, return the full URL as is (NO quiz_set_id should be added)
     return img_url
 
-def fetch_discussion_comments(discussion_link):
+# Per-host semaphores so parallel fetches don't hammer a single site
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+def _host_semaphore(url):
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(config.SCRAPE_PER_HOST_LIMIT)
+        return _host_semaphores[host]
+
+def extract_discussion_comments(soup, page_number):
     comments = []
+    comment_divs = soup.find_all('div', class_='bix-sun-discussion')
+    print(f"Found {len(comment_divs)} comment divs on page {page_number}")
+
+    for div in comment_divs:
+        user_details = div.find('div', class_='user-details')
+        user_content = div.find('div', class_='user-content')
+        if user_details and user_content:
+            # Extract inner HTML content directly
+            comment_inner_html = ''.join(str(child) for child in user_content.contents)
+            comment_text = f"{user_details.get_text(strip=True)}: {comment_inner_html}"
+            comments.append(comment_text)
+            print(f"Extracted comment: {comment_text}")
+        else:
+            print("No user details or content found in this div")
+    return comments
+
+class DiscussionFetchError(Exception):
+    pass
+
+# Raises DiscussionFetchError (or requests.RequestException) unless every page was fetched, so a
+# partial or failed fetch is never mistaken for the full set of comments
+def fetch_discussion_comments(discussion_link, client=None):
+    client = client or http_client.client
     # Split the URL at the last dash before "#comments"
     base_url = discussion_link.split("#")[0]
-    page_number = 1
 
-    while True:
-        if page_number == 1:
-            page_url = discussion_link  # Use original link for the first page
-        else:
-            # Correctly construct the URL for subsequent pages
-            page_url = f"{base_url}-{page_number}#comments"
+    print(f"Fetching comments from URL: {discussion_link}")
+    with _host_semaphore(discussion_link):
+        response = client.get(discussion_link)  # Use original link for the first page
+    if response.status_code != 200:
+        raise DiscussionFetchError(f"Failed to fetch page: {discussion_link} (HTTP {response.status_code})")
 
-        print(f"Fetching comments from URL: {page_url}")
+    soup = parse_page(response.content, 'discussion')
+
+    # Determine the total number of pages from the first page
+    discussion_info = soup.find('div', class_='left-box').get_text(strip=True)
+    if "Page" in discussion_info:
+        total_pages = int(discussion_info.split('Page')[1].split('of')[1].split('.')[0].strip())
+    else:
+        total_pages = 1
+    print(f"Total number of discussion pages: {total_pages}")
 
-        response = requests.get(page_url, headers={'User-Agent': choice(config.headers_list)}, verify=False)
-
-        if response.status_code != 200:
-            print(f"Failed to fetch page: {page_url}")
-            break
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Determine the total number of pages from the first page
-        if page_number == 1:
-            discussion_info = soup.find('div', class_='left-box').get_text(strip=True)
-            if "Page" in discussion_info:
-                total_pages = int(discussion_info.split('Page')[1].split('of')[1].split('.')[0].strip())
-            else:
-                total_pages = 1
-            print(f"Total number of discussion pages: {total_pages}")
-
-        comment_divs = soup.find_all('div', class_='bix-sun-discussion')
-        print(f"Found {len(comment_divs)} comment divs on page {page_number}")
-
-        for div in comment_divs:
-            user_details = div.find('div', class_='user-details')
-            user_content = div.find('div', class_='user-content')
-            if user_details and user_content:
-                # Extract inner HTML content directly
-                comment_inner_html = ''.join(str(child) for child in user_content.contents)
-                comment_text = f"{user_details.get_text(strip=True)}: {comment_inner_html}"
-                comments.append(comment_text)
-                print(f"Extracted comment: {comment_text}")
-            else:
-                print("No user details or content found in this div")
-
-        page_number += 1
-        if page_number > total_pages:
-            break
+    comments = extract_discussion_comments(soup, 1)
+
+    def fetch_comment_page(page_number):
+        # Correctly construct the URL for subsequent pages
+        page_url = f"{base_url}-{page_number}#comments"
+        print(f"Fetching comments from URL: {page_url}")
+        with _host_semaphore(page_url):
+            page_response = client.get(page_url)
+        if page_response.status_code != 200:
+            raise DiscussionFetchError(f"Failed to fetch page: {page_url} (HTTP {page_response.status_code})")
+        return extract_discussion_comments(parse_page(page_response.content, 'discussion'), page_number)
+
+    # Fetch the remaining pages concurrently; the first page that fails fails the whole fetch
+    if total_pages > 1:
+        with ThreadPoolExecutor(max_workers=min(config.SCRAPE_PER_HOST_LIMIT, total_pages - 1)) as executor:
+            for page_comments in executor.map(fetch_comment_page, range(2, total_pages + 1)):
+                comments.extend(page_comments)
 
     if not comments:
         print("No comments were extracted")
@@ -87,29 +113,115 @@ def process_question_with_square_root(html_content):
 
     return processed_content
 
+# Progress hooks called by the scrapers; scrape jobs override these to record progress
+class ScrapeProgress:
+    def __init__(self):
+        # Page cache results ('hit', 'revalidated', 'miss'); recorded from fetch threads
+        self.cache_counts = Counter()
+        self.cache_lock = threading.Lock()
+
+    def page_done(self, url, questions_added):
+        pass
+
+    def page_failed(self, url):
+        pass
+
+    def batch_committed(self, questions_added):
+        pass
+
+    def retry_wait(self, url, attempt, wait_seconds, error):
+        pass
+
+    def cache_result(self, url, status):
+        with self.cache_lock:
+            self.cache_counts[status] += 1
+
+# Helper function to get a page body through the page cache (when enabled); raises on HTTP errors
+def get_page(url, client, progress):
+    if page_cache.cache:
+        content, cache_status = page_cache.cache.fetch(url, client)
+    else:
+        response = client.get(url)
+        response.raise_for_status()
+        content, cache_status = response.content, 'miss'
+    progress.cache_result(url, cache_status)
+    return content
+
+# Helper function to fetch a single page, retrying with a linear backoff
+def fetch_page(url, client=None, progress=None, max_retries=10, backoff_time=3):
+    client = client or http_client.client
+    progress = progress or ScrapeProgress()
+    for attempt in range(max_retries):
+        try:
+            time.sleep(backoff_time * attempt)
+            # Only the request itself holds one of the host's slots, not the backoff before it
+            with _host_semaphore(url):
+                return get_page(url, client, progress)
+        except requests.RequestException as request_exception:
+            if attempt == max_retries - 1:
+                print(f"Failed to fetch {url} after {max_retries} attempts. Error: {request_exception}")
+                return None
+            print(f'Error occurred for {url}, waiting for {backoff_time * (attempt + 1)} seconds before retrying...')
+            progress.retry_wait(url, attempt + 1, backoff_time * (attempt + 1), str(request_exception))
+
+# Download pages concurrently, yielding contents in the same order as `urls` (None for failed pages).
+# Pages are yielded as soon as they and every page before them are done, so parsing overlaps fetching.
+def fetch_pages(urls, client=None, progress=None):
+    fetch_durations = [0.0] * len(urls)
+    fetched_pages = 0
+
+    def fetch(index):
+        started = time.perf_counter()
+        content = fetch_page(urls[index], client, progress)
+        fetch_durations[index] = time.perf_counter() - started
+        return content
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(config.SCRAPE_WORKERS, len(urls)))) as executor:
+        for content in executor.map(fetch, range(len(urls))):
+            if content is not None:
+                fetched_pages += 1
+            yield content
+    elapsed = time.perf_counter() - started
+
+    print(f"Fetched {fetched_pages}/{len(urls)} pages in {elapsed:.2f}s with {config.SCRAPE_WORKERS} workers "
+          f"(serial fetch time would have been {sum(fetch_durations):.2f}s)")
+
 # Helper function to process questions
-def process_question(base_url, url_number, question_counter, quiz_set_id):
+def process_question(base_url, url_number, question_counter, quiz_set_id, progress=None, client=None):
+    # With url_number None, base_url is already a full page URL (the plain-string form of a scrape request)
+    progress = progress or ScrapeProgress()
     if not base_url.startswith('https://'):
         base_url = 'https://' + base_url
-    url = base_url + str(url_number).zfill(6)  # Format the URL number to ensure it's padded with zeros if necessary
-    MAX_RETRIES = 10
-    backoff_time = 3  # Time to wait before retrying in case of failure
+    url = base_url if url_number is None else base_url + str(url_number).zfill(6)  # Format the URL number to ensure it's padded with zeros if necessary
+
+    content = fetch_page(url, client, progress)
+    if content is None:
+        progress.page_failed(url)
+        return question_counter
+    next_counter = parse_indiabix_page(content, url, question_counter, quiz_set_id, progress)
+    progress.page_done(url, next_counter - question_counter)
+    return next_counter
+
+# Process a range of IndiaBix pages: fetch them in parallel, then store questions in page order
+def process_question_range(base_url, start_url, end_url, question_counter, quiz_set_id, progress=None, client=None):
+    progress = progress or ScrapeProgress()
+    if not base_url.startswith('https://'):
+        base_url = 'https://' + base_url
+    urls = [base_url + str(url_number).zfill(6) for url_number in range(int(start_url), int(end_url) + 1)]
 
-    # Retry mechanism for robust scraping
-    for attempt in range(MAX_RETRIES):
-        try:
-            time.sleep(backoff_time * attempt)
-            page = requests.get(url, headers={'User-Agent': choice(config.headers_list)}, verify=False)
-            page.raise_for_status()
-            break
-        except requests.RequestException as request_exception:
-            print(f'Error occurred for {url}, waiting for {backoff_time * attempt} seconds before retrying...')
-            if attempt == MAX_RETRIES - 1:
-                print(f"Failed to fetch {url} after {MAX_RETRIES} attempts. Error: {request_exception}")
-                return question_counter
+    for url, content in zip(urls, fetch_pages(urls, client, progress)):
+        if content is None:
+            progress.page_failed(url)
             continue
+        next_counter = parse_indiabix_page(content, url, question_counter, quiz_set_id, progress)
+        progress.page_done(url, next_counter - question_counter)
+        question_counter = next_counter
+    return question_counter
 
-    soup = BeautifulSoup(page.content, 'html.parser')
+def parse_indiabix_page(content, url, question_counter, quiz_set_id, progress=None):
+    writer = QuestionWriter(quiz_set_id, question_counter, progress=progress)
+    soup = parse_page(content, 'indiabix')
     questions = soup.find_all('div', class_='bix-div-container')
 
     for question in questions:
@@ -163,12 +275,8 @@ def process_question(base_url, url_number, question_counter, quiz_set_id):
             if discussion_link_elem:
                 discussion_link = discussion_link_elem['href']
 
-            # Ensure `quiz_set_id` is properly passed when creating the question
-            if quiz_set_id is None:
-                raise ValueError(f"`quiz_set_id` is missing for question {question_counter}")
-
             # Log the processed question details
-            print(f"Processed Question {question_counter}:")
+            print(f"Processed Question {writer.next_order}:")
             print(f"Text: {question_text}")
             print(f"Options: \n{options_processed}")
             print(f"Answer: {answer}")
@@ -176,28 +284,27 @@ def process_question(base_url, url_number, question_counter, quiz_set_id):
             print(f"Discussion Link: {discussion_link}")
             print("----------------------------------------------------")
 
-            # Create the new question and add it to the session
-            new_question = Question(
+            # Queue the new question for the batched insert
+            writer.add(
                 text=question_text,
                 options=options_processed,
                 answer=answer,
                 url=url,
                 explanation=explanation,
-                discussion_link=discussion_link,
-                quiz_set_id=quiz_set_id,  # Ensure this is passed correctly
-                order=question_counter
+                discussion_link=discussion_link
             )
-            db.session.add(new_question)
-            question_counter += 1
 
         except Exception as e:
             print(f"Error occurred while processing question: {e}")
 
-    db.session.commit()
-    return question_counter
+    writer.commit_page()
+    return writer.next_order
 
 # Function to process PinoyBix questions
-def process_pinoybix_question(url, question_counter, quiz_set_id, db, Question):
+def process_pinoybix_question(url, question_counter, quiz_set_id, progress=None, client=None):
+    progress = progress or ScrapeProgress()
+    client = client or http_client.client
+    writer = QuestionWriter(quiz_set_id, question_counter, progress=progress)
     # Ensure the URL starts with https://
     if not url.startswith('https://'):
         url = 'https://' + url
@@ -209,10 +316,9 @@ def process_pinoybix_question(url, question_counter, quiz_set_id, db, Question):
         try:
             time.sleep(backoff_time * attempt)
             # Send the HTTP request to get the content of the Pinoybix page
-            response = requests.get(url, headers={'User-Agent': choice(config.headers_list)}, verify=False)
-            response.raise_for_status()
+            content = get_page(url, client, progress)
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_page(content, 'pinoybix')
 
             # Iterate over all paragraphs and look for the question pattern
             paragraphs = soup.find_all('p')
@@ -228,8 +334,6 @@ def process_pinoybix_question(url, question_counter, quiz_set_id, db, Question):
                     question_html = str(p)
                     question_html = re.sub(r'^<p>\d+\.', '<p>', question_html)  # Remove question number from HTML
 
-                    soup_question = BeautifulSoup(question_html, 'html.parser')
-
                     # Handle image URLs directly (no downloading needed)
                     img_tag = p.find('img')
                     if not img_tag:
@@ -272,219 +376,209 @@ def process_pinoybix_question(url, question_counter, quiz_set_id, db, Question):
                             key_answer = 'Option ' + answer_match.group(1)
 
                     # Log the processed question details for debugging
-                    print(f"Processed Question {question_counter}:")
+                    print(f"Processed Question {writer.next_order}:")
                     print(f"Text: {question_text}")
                     print(f"Options: {choices}")
                     print(f"Answer: {key_answer}")
                     print("----------------------------------------------------")
 
-                    # Create a new question entry and add it to the database
-                    new_question = Question(
+                    # Queue the new question for the batched insert
+                    writer.add(
                         text=question_text,
                         options=choices,
                         answer=key_answer,
-                        quiz_set_id=quiz_set_id,
                         url=url,
                         explanation="No explanation available.",
-                        discussion_link="No discussion link available",
-                        order=question_counter  # Set the order field
+                        discussion_link="No discussion link available"
                     )
-                    db.session.add(new_question)
-                    question_counter += 1  # Increment the global counter here
 
             # Commit the changes to the database
-            db.session.commit()
-            return question_counter  # Return the updated question_counter
+            writer.commit_page()
+            progress.page_done(url, writer.next_order - question_counter)
+            return writer.next_order  # Return the updated question_counter
 
         except requests.RequestException as request_exception:
             print(f'Error occurred for {url}, waiting for {backoff_time * attempt} secs before retrying...')
             if attempt == MAX_RETRIES - 1:
                 print(f"Error fetching {url} after {MAX_RETRIES} attempts, Error: {request_exception}")
+                progress.page_failed(url)
                 return question_counter  # Return the current question_counter even on failure
+            progress.retry_wait(url, attempt + 1, backoff_time * (attempt + 1), str(request_exception))
             continue
         except Exception as err:
             print(f'An error occurred: {err}')
+            writer.discard()
+            progress.page_failed(url)
             return question_counter  # Return the current question_counter in case of any other errors
 
 # Function to process Examveda questions
-def process_examveda_question(base_url, start_page, end_page, question_counter, quiz_set_id, db, Question):
+def process_examveda_question(base_url, start_page, end_page, question_counter, quiz_set_id, progress=None, client=None):
+    progress = progress or ScrapeProgress()
     if not base_url.startswith('https://'):
         base_url = 'https://' + base_url
 
-    MAX_RETRIES = 10
-    backoff_time = 3
-
     # Process each page in the specified range (start_page to end_page)
-    for page_num in range(int(start_page), int(end_page) + 1):
-        url = f"{base_url}?page={page_num}"  # Adjust URL to include the page number
-
-        for attempt in range(MAX_RETRIES):
-            try:
-                time.sleep(backoff_time * attempt)
-                response = requests.get(url, headers={'User-Agent': choice(config.headers_list)}, verify=False)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.content, 'html.parser')
-                questions = soup.find_all('article', class_='question')
-
-                # Ensure that questions are processed in the same order they appear on the page
-                for question in questions:
-                    q_text_elem = question.find('div', class_='question-main')
-                    if not q_text_elem:
-                        continue
-
-                    # Extract the question text
-                    question_html = str(q_text_elem)
-                    question_html = re.sub(r'\$\s+', r'$ ', question_html)  # Handle special characters
-                    question_html = re.sub(r'\$\$(.*?)\$\$', r'<span class="mathjax">\1</span>', question_html)
-
-                    # Process images directly from the source, no local downloads or placeholders
-                    img_elems = q_text_elem.find_all('img')
-
-                    # Replace relative image paths with full URLs
-                    for img_elem in img_elems:
-                        img_url = img_elem['src']
-                        if img_url.startswith('/'):
-                            img_url = urljoin(url, img_url)
-                        # Replace the img tag's source with the correct URL (only if relative)
-                        img_elem['src'] = img_url
-
-                    # Reconvert the modified HTML
-                    question_html = str(q_text_elem)  # This ensures images aren't duplicated
-
-                    # Extract options and explanation
-                    options_html = []
-                    option_blocks = question.find_all('p')
-                    for block in option_blocks:
-                        labels = block.find_all('label')
-                        if len(labels) > 1:
-                            option_html = str(labels[1])
-                            options_html.append(option_html)
-
-                    # Extract the correct answer
-                    answer_elem = question.find('strong')
-                    answer = answer_elem.text.strip() if answer_elem else 'Answer not found.'
-                    explanation_elem = answer_elem.find_next_sibling('div') if answer_elem else None
-                    explanation = explanation_elem.get_text(strip=True) if explanation_elem else 'No explanation available.'
-
-                    # Extract the discussion link
-                    discussion_link_elem = question.find('a', text='Discuss in Board')
-                    discussion_link = discussion_link_elem['href'] if discussion_link_elem else 'Discussion link not found.'
-
-                    # Log processed question details
-                    print(f"Processed Question {question_counter}:")
-                    print(f"Text: {question_html}")
-                    print(f"Options: \n{options_html}")
-                    print(f"Answer: {answer}")
-                    print(f"URL: {url}")
-                    print(f"Explanation: {explanation}")
-                    print(f"Discussion Link: {discussion_link}")
-                    print("----------------------------------------------------")
+    urls = [f"{base_url}?page={page_num}" for page_num in range(int(start_page), int(end_page) + 1)]
 
-                    # Store question in the database
-                    new_question = Question(
-                        text=question_html,
-                        options=options_html,
-                        answer=answer,
-                        explanation=explanation,
-                        url=url,
-                        discussion_link=discussion_link,
-                        quiz_set_id=quiz_set_id,
-                        order=question_counter  # Set the order field
-                    )
-                    db.session.add(new_question)
+    for url, content in zip(urls, fetch_pages(urls, client, progress)):
+        if content is None:
+            progress.page_failed(url)
+            continue
+        next_counter = parse_examveda_page(content, url, question_counter, quiz_set_id, progress)
+        progress.page_done(url, next_counter - question_counter)
+        question_counter = next_counter
 
-                    question_counter += 1  # Ensure the question counter increments sequentially
+    return question_counter  # Return the updated question counter
 
-                db.session.commit()  # Commit after processing each page
-                break  # Break retry loop if successful
+def parse_examveda_page(content, url, question_counter, quiz_set_id, progress=None):
+    writer = QuestionWriter(quiz_set_id, question_counter, progress=progress)
+    try:
+        soup = parse_page(content, 'examveda')
+        questions = soup.find_all('article', class_='question')
 
-            except requests.RequestException as request_exception:
-                print(f'Error occurred for {url}, waiting for {backoff_time * attempt} secs before retrying...')
-                if attempt == MAX_RETRIES - 1:
-                    print(f"Error fetching {url} after {MAX_RETRIES} attempts, Error: {request_exception}")
+        # Ensure that questions are processed in the same order they appear on the page
+        for question in questions:
+            q_text_elem = question.find('div', class_='question-main')
+            if not q_text_elem:
                 continue
-            except Exception as e:
-                print(f"Error occurred while processing page {page_num}: {e}")
-                break
 
-    return question_counter  # Return the updated question counter
+            # Extract the question text
+            question_html = str(q_text_elem)
+            question_html = re.sub(r'\$\s+', r'$ ', question_html)  # Handle special characters
+            question_html = re.sub(r'\$\$(.*?)\$\$', r'<span class="mathjax">\1</span>', question_html)
+
+            # Process images directly from the source, no local downloads or placeholders
+            img_elems = q_text_elem.find_all('img')
+
+            # Replace relative image paths with full URLs
+            for img_elem in img_elems:
+                img_url = img_elem['src']
+                if img_url.startswith('/'):
+                    img_url = urljoin(url, img_url)
+                # Replace the img tag's source with the correct URL (only if relative)
+                img_elem['src'] = img_url
+
+            # Reconvert the modified HTML
+            question_html = str(q_text_elem)  # This ensures images aren't duplicated
+
+            # Extract options and explanation
+            options_html = []
+            option_blocks = question.find_all('p')
+            for block in option_blocks:
+                labels = block.find_all('label')
+                if len(labels) > 1:
+                    option_html = str(labels[1])
+                    options_html.append(option_html)
+
+            # Extract the correct answer
+            answer_elem = question.find('strong')
+            answer = answer_elem.text.strip() if answer_elem else 'Answer not found.'
+            explanation_elem = answer_elem.find_next_sibling('div') if answer_elem else None
+            explanation = explanation_elem.get_text(strip=True) if explanation_elem else 'No explanation available.'
+
+            # Extract the discussion link
+            discussion_link_elem = question.find('a', text='Discuss in Board')
+            discussion_link = discussion_link_elem['href'] if discussion_link_elem else 'Discussion link not found.'
+
+            # Log processed question details
+            print(f"Processed Question {writer.next_order}:")
+            print(f"Text: {question_html}")
+            print(f"Options: \n{options_html}")
+            print(f"Answer: {answer}")
+            print(f"URL: {url}")
+            print(f"Explanation: {explanation}")
+            print(f"Discussion Link: {discussion_link}")
+            print("----------------------------------------------------")
+
+            # Queue the question for the batched insert
+            writer.add(
+                text=question_html,
+                options=options_html,
+                answer=answer,
+                explanation=explanation,
+                url=url,
+                discussion_link=discussion_link
+            )
 
-def process_examprimer_question(url, question_counter, quiz_set_id, db, Question):
+    except Exception as e:
+        print(f"Error occurred while processing page {url}: {e}")
+
+    writer.commit_page()  # Commit after processing each page
+    return writer.next_order
+
+def process_examprimer_question(url, question_counter, quiz_set_id, progress=None):
+    progress = progress or ScrapeProgress()
+    writer = QuestionWriter(quiz_set_id, question_counter, progress=progress)
     if not url.startswith('https://'):
         url = 'https://' + url
 
     MAX_RETRIES = 10
     backoff_time = 3
-    driver = None  # Declare driver outside the try block
 
     for attempt in range(MAX_RETRIES):
         try:
             time.sleep(backoff_time * attempt)
-            options = Options()
-            options.add_argument("--headless")  # Enable headless mode
-            options.add_argument("start-maximized")  # Start maximized for better performance in headless mode
-
-            driver = webdriver.Chrome(options=options)
-            driver.get(url)
-
-            WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.ID, "butCheck")))
-            check_answers_button = driver.find_element(By.ID, "butCheck")
-            check_answers_button.click()
-
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "question")))
-            questions = driver.find_elements(By.CLASS_NAME, "question")
-
-            for question in questions:
-                full_text = question.text.strip()
-                lines = full_text.split('\n')
-                question_text = '\n'.join(lines[1:-4]).strip()
-                options = lines[-4:]
-
-                options_elements = question.find_elements(By.CLASS_NAME, "answer")
-                correct_answer_index = None
-
-                for i, option_element in enumerate(options_elements):
-                    if "lightgreen" in option_element.get_attribute("style"):
-                        correct_answer_index = i
-                        break
-
-                correct_option = 'Option ' + chr(correct_answer_index + 65) if correct_answer_index is not None else "No correct answer found"
-
-                # Print details instead of writing to a file
-                print(f"Processed Question {question_counter}:")
-                print(f"Text: {question_text}")
-                print("Options: \n{}".format('\n'.join(options)))
-                print(f"Answer: {correct_option}")
-                print(f"URL: {url}")
-                print("Explanation: No explanation available.")
-                print("Discussion Link: Discussion link not found.")
-                print("----------------------------------------------------")
-
-                # Create a new Question object and add it to the session
-                new_question = Question(
-                    text=question_text,
-                    options=options,
-                    answer=correct_option,
-                    explanation="No explanation available.",
-                    url=url,
-                    discussion_link="Discussion link not found.",
-                    quiz_set_id=quiz_set_id
-                )
-                db.session.add(new_question)
-                question_counter += 1
+            with browser_pool.pool.lease() as driver:
+                scrape_examprimer_page(driver, url, writer)
+
+            writer.commit_page()
+            progress.page_done(url, writer.next_order - question_counter)
+            return writer.next_order
 
-        except requests.RequestException as request_exception:
-            print(f'Error occurred for {url}, waiting for {backoff_time * attempt} secs before retrying.....')
-            if attempt == MAX_RETRIES - 1:
-                print(f"Error fetching {url} after {MAX_RETRIES} attempts, Error: {request_exception}")
         except Exception as e:
-            print(f'An unexpected error occurred: {e}')
-        finally:
-            if driver:
-                driver.quit()  # Quit the driver if it's initialized
+            print(f'Error occurred for {url}, waiting for {backoff_time * (attempt + 1)} secs before retrying.....: {e}')
+            writer.discard()  # Drop questions from the failed attempt before retrying
+            if attempt < MAX_RETRIES - 1:
+                progress.retry_wait(url, attempt + 1, backoff_time * (attempt + 1), str(e))
 
         if attempt == MAX_RETRIES - 1:
+            progress.page_failed(url)
             return question_counter  # Return from the function if all retries fail
 
-    return question_counter
\ No newline at end of file
+    return question_counter
+
+def scrape_examprimer_page(driver, url, writer):
+    driver.get(url)
+
+    WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.ID, "butCheck")))
+    check_answers_button = driver.find_element(By.ID, "butCheck")
+    check_answers_button.click()
+
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "question")))
+    questions = driver.find_elements(By.CLASS_NAME, "question")
+
+    for question in questions:
+        full_text = question.text.strip()
+        lines = full_text.split('\n')
+        question_text = '\n'.join(lines[1:-4]).strip()
+        options = lines[-4:]
+
+        options_elements = question.find_elements(By.CLASS_NAME, "answer")
+        correct_answer_index = None
+
+        for i, option_element in enumerate(options_elements):
+            if "lightgreen" in option_element.get_attribute("style"):
+                correct_answer_index = i
+                break
+
+        correct_option = 'Option ' + chr(correct_answer_index + 65) if correct_answer_index is not None else "No correct answer found"
+
+        # Print details instead of writing to a file
+        print(f"Processed Question {writer.next_order}:")
+        print(f"Text: {question_text}")
+        print("Options: \n{}".format('\n'.join(options)))
+        print(f"Answer: {correct_option}")
+        print(f"URL: {url}")
+        print("Explanation: No explanation available.")
+        print("Discussion Link: Discussion link not found.")
+        print("----------------------------------------------------")
+
+        # Queue the question for the batched insert
+        writer.add(
+            text=question_text,
+            options=options,
+            answer=correct_option,
+            explanation="No explanation available.",
+            url=url,
+            discussion_link="Discussion link not found."
+        )
@@ -0,0 +1,87 @@
+# conftest.py
+
+import os
+import sys
+import psycopg2
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Database tests run against the PostgreSQL server the app is configured for (DB_HOST, DB_USER,
+# DB_PASS), in a database of their own that is created if missing. Importing app_init applies the
+# migrations to it.
+TEST_DB_NAME = os.getenv('TEST_DB_NAME', 'quizdb_test')
+
+def _create_test_database():
+    connection = psycopg2.connect(host=os.getenv('DB_HOST', 'localhost'), user=os.getenv('DB_USER', 'my_user'),
+                                  password=os.getenv('DB_PASS', 'password'), dbname='postgres', connect_timeout=5)
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (TEST_DB_NAME,))
+            if cursor.fetchone() is None:
+                cursor.execute(f'CREATE DATABASE "{TEST_DB_NAME}"')
+    finally:
+        connection.close()
+
+@pytest.fixture(scope='session')
+def app():
+    try:
+        _create_test_database()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"PostgreSQL is not available: {e}")
+    os.environ['DB_NAME'] = TEST_DB_NAME
+    from app_init import app
+    import routes  # noqa: F401 (registers the endpoints)
+    app.config['TESTING'] = True
+    return app
+
+@pytest.fixture
+def session(app):
+    """The app's session inside an app context; anything left uncommitted is rolled back."""
+    from db import db
+    with app.app_context():
+        yield db.session
+        db.session.rollback()
+
+@pytest.fixture
+def make_quiz_set(session):
+    """Inserts the quiz set a test describes and returns (quiz_set_id, question ids in order).
+
+    Each entry of `questions` is a dict of question columns (answer, user_selected_option,
+    favorite, order) plus optional `text` and `options` for its content; order defaults to the
+    entry's position. Every question gets content of its own, and the quiz set's progress
+    counters match its questions. Other keyword arguments are quiz_sets columns.
+    """
+    import uuid
+    from models import User, QuizSet, QuestionContent, Question
+
+    def make(questions, **quiz_set_columns):
+        user = User(name='test user')
+        session.add(user)
+        session.flush()
+        questions = [dict({'answer': 'A', 'order': position}, **question) for position, question in enumerate(questions)]
+        quiz_set = QuizSet(
+            title='test quiz set', user_id=user.id, total_questions=len(questions),
+            answered_count=sum(question.get('user_selected_option') is not None for question in questions),
+            correct_count=sum(question.get('user_selected_option') == question['answer'] for question in questions),
+            **quiz_set_columns,
+        )
+        session.add(quiz_set)
+        session.flush()
+
+        rows = []
+        for question in questions:
+            content = QuestionContent(content_hash=uuid.uuid4().hex, text=question.pop('text', f"Question {question['order']}"),
+                                      options=question.pop('options', ['first', 'second']))
+            session.add(content)
+            session.flush()
+            rows.append(Question(quiz_set_id=quiz_set.id, content_id=content.id, **question))
+        session.add_all(rows)
+        session.flush()
+        quiz_set_id, question_ids = quiz_set.id, [row.id for row in rows]
+        # Endpoints under test load their own copies of the rows
+        session.expunge_all()
+        return quiz_set_id, question_ids
+
+    return make
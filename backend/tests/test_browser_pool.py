@@ -0,0 +1,85 @@
+# test_browser_pool.py
+
+import threading
+import pytest
+from browser_pool import BrowserPool
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        return 'about:blank'
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+class DriverFactory:
+    def __init__(self):
+        self.drivers = []
+
+    def __call__(self):
+        self.drivers.append(FakeDriver(len(self.drivers)))
+        return self.drivers[-1]
+
+def test_browsers_are_reused_and_started_lazily():
+    factory = DriverFactory()
+    pool = BrowserPool(max_browsers=2, max_pages=10, lease_timeout=1, driver_factory=factory)
+    assert factory.drivers == []
+    for _ in range(3):
+        with pool.lease() as driver:
+            assert driver is factory.drivers[0]
+    assert len(factory.drivers) == 1
+
+def test_leases_wait_for_a_free_browser_and_time_out():
+    factory = DriverFactory()
+    pool = BrowserPool(max_browsers=1, max_pages=10, lease_timeout=0.05, driver_factory=factory)
+    with pool.lease():
+        with pytest.raises(TimeoutError):
+            with pool.lease():
+                pass
+
+    # A lease waiting on a busy pool gets the browser once it is returned
+    leased = threading.Event()
+    waiter_drivers = []
+    pool.lease_timeout = 5
+
+    def waiter():
+        leased.wait()
+        with pool.lease() as driver:
+            waiter_drivers.append(driver)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    with pool.lease():
+        leased.set()
+    thread.join(timeout=5)
+    assert waiter_drivers == [factory.drivers[0]]
+    assert len(factory.drivers) == 1
+
+def test_browsers_are_recycled_after_max_pages():
+    factory = DriverFactory()
+    pool = BrowserPool(max_browsers=1, max_pages=2, lease_timeout=1, driver_factory=factory)
+    for _ in range(3):
+        with pool.lease():
+            pass
+    assert len(factory.drivers) == 2
+    assert factory.drivers[0].quit_called and not factory.drivers[1].quit_called
+
+def test_dead_browsers_are_replaced():
+    factory = DriverFactory()
+    pool = BrowserPool(max_browsers=1, max_pages=10, lease_timeout=1, driver_factory=factory)
+    with pool.lease():
+        pass
+    factory.drivers[0].alive = False
+    with pool.lease() as driver:
+        assert driver is factory.drivers[1]
+    assert factory.drivers[0].quit_called
@@ -0,0 +1,42 @@
+# test_dashboard.py
+
+from datetime import datetime, timezone
+from sqlalchemy import event, text
+from db import db
+
+def _logged_in_client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as cookie_session:
+        cookie_session['user_id'] = user_id
+    return client
+
+def test_dashboard_aggregates_attempts_in_one_query(app, session, make_quiz_set):
+    quiz_set_id, _ = make_quiz_set([{'answer': 'A', 'user_selected_option': 'A'}, {'answer': 'B'}, {'answer': 'C'}])
+    user_id = session.execute(text("SELECT user_id FROM quiz_sets WHERE id = :id"), {'id': quiz_set_id}).scalar()
+    session.execute(text("INSERT INTO attempts (quiz_set_id, score) VALUES (:id, 1), (:id, 3), (:id, 2)"), {'id': quiz_set_id})
+    # Another set of the same user, hidden while it is deleted
+    hidden_id, _ = make_quiz_set([{}], deleted_at=datetime.now(timezone.utc))
+    session.execute(text("UPDATE quiz_sets SET user_id = :user_id WHERE id = :id"), {'user_id': user_id, 'id': hidden_id})
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    client = _logged_in_client(app, user_id)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get('/api/getQuizSets')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 200
+    [quiz_set] = response.json
+    assert quiz_set['id'] == quiz_set_id
+    assert (quiz_set['attempts'], quiz_set['average_score'], quiz_set['latest_score']) == (3, 2.0, 2)
+    assert (quiz_set['total_questions'], quiz_set['unanswered_questions'], quiz_set['progress']) == (3, 2, 33)
+    # One query loads the user, one the whole dashboard
+    assert len([statement for statement in statements if 'quiz_sets' in statement]) == 1
+
+def test_dashboard_needs_a_user(app):
+    assert app.test_client().get('/api/getQuizSets').status_code == 401
@@ -0,0 +1,41 @@
+# test_endpoint_columns.py
+
+import re
+import pytest
+from sqlalchemy import event
+from db import db
+
+# The quiz page's light endpoints must not read the large question_contents columns; only
+# getFavorites shows question content
+ENDPOINTS = ['getUserSelections', 'getQuestionVersions', 'getQuizSetScore', 'getQuizSetDetails', 'getFavorites']
+CONTENT_COLUMNS = ['text', 'options', 'explanation']
+
+def _statements(app, path):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = app.test_client().get(path)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    return statements
+
+def _reads_column(statements, column):
+    return any(re.search(rf'\bquestion_contents\.{column}\b', statement) for statement in statements)
+
+@pytest.fixture
+def quiz_set_id(make_quiz_set):
+    # A new quiz set, so no response for it is cached yet, with an answered and a favorite question
+    quiz_set_id, _ = make_quiz_set([{'user_selected_option': 'A'}, {'favorite': True}, {}])
+    return quiz_set_id
+
+@pytest.mark.parametrize('endpoint', ENDPOINTS)
+def test_endpoint_reads_only_the_columns_it_shows(app, quiz_set_id, endpoint):
+    statements = _statements(app, f'/api/{endpoint}/{quiz_set_id}')
+    assert not _reads_column(statements, 'discussion_comments')
+    for column in CONTENT_COLUMNS:
+        assert _reads_column(statements, column) == (endpoint == 'getFavorites'), column
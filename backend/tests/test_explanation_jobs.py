@@ -0,0 +1,39 @@
+# test_explanation_jobs.py
+
+from datetime import datetime, timedelta
+from sqlalchemy import text
+import config
+from explanation_cache import save_further_explanation
+from models import ExplanationJob
+
+def test_question_keeps_one_further_explanation(session, make_quiz_set, monkeypatch):
+    # save_further_explanation commits; keep its writes inside the test's transaction
+    monkeypatch.setattr(session, 'commit', session.flush)
+    _, (question_id,) = make_quiz_set([{}])
+    session.execute(text("INSERT INTO further_explanations (question_id, explanation) VALUES (:id, 'from the page')"),
+                    {'id': question_id})
+
+    assert not save_further_explanation(question_id, 'from the job')
+    assert save_further_explanation(question_id, 'reloaded', replace=True)
+    explanations = session.execute(text(
+        "SELECT explanation FROM further_explanations WHERE question_id = :id"), {'id': question_id}).scalars().all()
+    assert explanations == ['reloaded']
+    assert not save_further_explanation(question_id, 'from the job')
+
+def test_job_lost_before_it_started_is_interrupted(app):
+    # Imported once the app fixture has pointed it at the test database
+    from explanation_jobs import explanation_job_status
+    created_at = datetime.now(config.PH_TZ) - timedelta(seconds=config.EXPLANATION_JOB_STALE_SECONDS + 1)
+    job = ExplanationJob(id='job', quiz_set_id='set', status='queued', created_at=created_at)
+    assert explanation_job_status(job)['status'] == 'interrupted'
+    job.created_at = datetime.now(config.PH_TZ)
+    assert explanation_job_status(job)['status'] == 'queued'
+
+def test_running_job_is_judged_by_its_last_update(app, monkeypatch):
+    from explanation_jobs import explanation_job_status
+    monkeypatch.setattr(config, 'EXPLANATION_JOB_STALE_SECONDS', 60)
+    job = ExplanationJob(id='job', quiz_set_id='set', status='running',
+                         created_at=datetime.now(config.PH_TZ) - timedelta(hours=1), updated_at=datetime.now(config.PH_TZ) - timedelta(seconds=30))
+    assert explanation_job_status(job)['status'] == 'running'
+    job.updated_at = datetime.now(config.PH_TZ) - timedelta(seconds=61)
+    assert explanation_job_status(job)['status'] == 'interrupted'
@@ -0,0 +1,42 @@
+# test_html_parsing.py
+
+import os
+import pytest
+from bs4 import BeautifulSoup
+import html_parsing
+from html_parsing import FAST_PARSER, PAGE_TARGETS, parse_page
+
+FIXTURE_PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+def _fixture_page(site):
+    with open(os.path.join(FIXTURE_PAGES_DIR, f'{site}.html'), 'rb') as f:
+        return f.read()
+
+def _targets(soup, site):
+    target = PAGE_TARGETS[site]
+    return [str(element) for element in soup.find_all(target['name'], class_=target['class_'])]
+
+@pytest.fixture(autouse=True)
+def unverified_sites(monkeypatch):
+    monkeypatch.setattr(html_parsing, '_verified_sites', set())
+    monkeypatch.setattr(html_parsing, '_fallback_sites', set())
+
+@pytest.mark.parametrize('site', sorted(PAGE_TARGETS))
+def test_strained_parse_keeps_every_target_element(site):
+    content = _fixture_page(site)
+    whole_page = _targets(BeautifulSoup(content, 'html.parser'), site)
+    assert whole_page
+    assert _targets(parse_page(content, site), site) == whole_page
+    assert site not in html_parsing._fallback_sites
+
+@pytest.mark.skipif(FAST_PARSER == 'html.parser', reason='lxml is not installed')
+def test_site_whose_pages_parse_differently_falls_back_to_html_parser():
+    # lxml closes the <p> before the nested <div>; html.parser keeps the div inside it
+    content = b'<div class="bix-div-container"><p>Which is larger?<div>A. 2</div></p></div>'
+    soup = parse_page(content, 'indiabix')
+    assert 'indiabix' in html_parsing._fallback_sites
+    assert str(soup.find('p')) == '<p>Which is larger?<div>A. 2</div></p>'
+
+    # Later pages of the site skip lxml, even ones it would have parsed the same way
+    assert parse_page(_fixture_page('indiabix'), 'indiabix').builder.NAME == 'html.parser'
+    assert parse_page(_fixture_page('examveda'), 'examveda').builder.NAME == FAST_PARSER
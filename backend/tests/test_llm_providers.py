@@ -0,0 +1,144 @@
+# test_llm_providers.py
+
+import threading
+import time
+import pytest
+import config
+from llm_providers import ProviderScheduler, AllProvidersFailed
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+class FakeProvider:
+    """Answers with its name, or raises while `broken`."""
+
+    def __init__(self, name, broken=False):
+        self.__name__ = name
+        self.broken = broken
+        self.calls = 0
+
+    def __call__(self, prompt):
+        self.calls += 1
+        if self.broken:
+            raise RuntimeError(f"{self.__name__} is down")
+        return f"{self.__name__}: {prompt}"
+
+def _scheduler(*providers):
+    clock = FakeClock()
+    return ProviderScheduler(providers, lambda provider, prompt: provider(prompt), clock=clock), clock
+
+def _states(scheduler):
+    return {stat['provider']: stat['state'] for stat in scheduler.stats()}
+
+def _trip(scheduler):
+    for _ in range(config.LLM_BREAKER_FAILURES):
+        with pytest.raises(AllProvidersFailed):
+            scheduler.run('question')
+
+def test_failing_provider_opens_and_is_skipped():
+    bad, good = FakeProvider('bad', broken=True), FakeProvider('good', broken=True)
+    scheduler, _ = _scheduler(bad, good)
+    _trip(scheduler)
+    good.broken = False
+    # Every provider is open, so they are all tried anyway
+    assert scheduler.run('question') == 'good: question'
+    assert _states(scheduler) == {'bad': 'open', 'good': 'closed'}
+    calls = bad.calls
+    assert scheduler.run('question') == 'good: question'
+    assert bad.calls == calls
+
+def test_half_open_trial_decides_whether_the_provider_comes_back():
+    flaky = FakeProvider('flaky', broken=True)
+    scheduler, clock = _scheduler(flaky)
+    _trip(scheduler)
+    assert _states(scheduler)['flaky'] == 'open'
+
+    clock.advance(config.LLM_BREAKER_COOLDOWN_SECONDS)
+    with pytest.raises(AllProvidersFailed):
+        scheduler.run('question')
+    assert _states(scheduler)['flaky'] == 'open'
+
+    flaky.broken = False
+    clock.advance(config.LLM_BREAKER_COOLDOWN_SECONDS)
+    assert scheduler.run('question') == 'flaky: question'
+    assert _states(scheduler)['flaky'] == 'closed'
+
+def test_half_open_provider_allows_one_trial_at_a_time():
+    down, up = FakeProvider('down', broken=True), FakeProvider('up', broken=True)
+    scheduler, clock = _scheduler(down, up)
+    _trip(scheduler)
+    up.broken = False
+    clock.advance(config.LLM_BREAKER_COOLDOWN_SECONDS)
+    health = next(health for health in scheduler.health if health.name == 'down')
+
+    trial = scheduler.claim(health)
+    assert trial is not None
+    assert scheduler.claim(health) is None
+    # A claimed attempt that never ran gives the trial back
+    scheduler.release(health, trial)
+    assert scheduler.claim(health) is not None
+
+def test_half_open_provider_is_not_held_open_by_requests_that_never_try_it():
+    primary, good = FakeProvider('primary', broken=True), FakeProvider('good', broken=True)
+    scheduler, clock = _scheduler(primary, good)
+    _trip(scheduler)
+    assert _states(scheduler) == {'primary': 'open', 'good': 'open'}
+
+    primary.broken = good.broken = False
+    for _ in range(10):
+        clock.advance(config.LLM_BREAKER_COOLDOWN_SECONDS)
+        # primary answers first, so good is listed but never launched
+        assert scheduler.run('question') == 'primary: question'
+    assert _states(scheduler)['good'] != 'open'
+
+class FakeStreamingProvider(FakeProvider):
+    """Streams its answer word by word after waiting `delay` seconds; `finished` is set once
+    the stream has ended."""
+
+    def __init__(self, name, delay=0.0, broken=False):
+        super().__init__(name, broken)
+        self.delay = delay
+        self.finished = threading.Event()
+
+    def stream(self, prompt):
+        time.sleep(self.delay)
+        try:
+            yield from super().__call__(prompt).split(' ')
+        finally:
+            self.finished.set()
+
+def _streaming_scheduler(*providers):
+    return ProviderScheduler(providers, lambda provider, prompt: provider(prompt),
+                             stream_call=lambda provider, prompt: provider.stream(prompt))
+
+def test_stream_fails_over_when_the_first_chunk_is_late(monkeypatch):
+    monkeypatch.setattr(config, 'LLM_REQUEST_TIMEOUT_SECONDS', 0.2)
+    slow, fast = FakeStreamingProvider('slow', delay=1), FakeStreamingProvider('fast')
+    scheduler = _streaming_scheduler(slow, fast)
+    assert list(scheduler.stream('question')) == ['fast:', 'question']
+    assert slow.finished.wait(5)
+    assert _states(scheduler)['slow'] == 'closed'
+    assert next(stat for stat in scheduler.stats() if stat['provider'] == 'slow')['failures'] == 1
+
+def test_stream_releases_the_slot_when_the_provider_finishes(monkeypatch):
+    monkeypatch.setattr(config, 'LLM_PROVIDER_CONCURRENCY', 1)
+    provider = FakeStreamingProvider('only')
+    scheduler = _streaming_scheduler(provider)
+    stream = scheduler.stream('question')
+    assert next(stream) == 'only:'
+    # The client hasn't read the rest, but the provider is done with its only slot
+    assert provider.finished.wait(5)
+    health = scheduler.health[0]
+    deadline = time.monotonic() + 5
+    while health.in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert health.slots.acquire(blocking=False)
+    health.slots.release()
+    assert list(stream) == ['question']
@@ -0,0 +1,76 @@
+# test_page_cache.py
+
+import pytest
+import requests
+import page_cache
+from page_cache import PageCache
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+class FakeSite:
+    """Serves one body per URL with an ETag, answering 304 when the client sends the current one."""
+
+    def __init__(self, pages):
+        self.pages = dict(pages)
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append((url, dict(headers or {})))
+        etag = f'"{hash(self.pages[url])}"'
+        if (headers or {}).get('If-None-Match') == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.pages[url], {'ETag': etag, 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'})
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(page_cache.time, 'time', lambda: now[0])
+    return now
+
+def test_fresh_pages_are_served_without_a_request(tmp_path, clock):
+    cache = PageCache(str(tmp_path), max_bytes=1024, ttl_seconds=60)
+    site = FakeSite({'https://a/1': b'page one'})
+    assert cache.fetch('https://a/1', site) == (b'page one', 'miss')
+    clock[0] += 59
+    assert cache.fetch('https://a/1', site) == (b'page one', 'hit')
+    assert len(site.requests) == 1
+
+def test_stale_pages_are_revalidated_with_their_validators(tmp_path, clock):
+    cache = PageCache(str(tmp_path), max_bytes=1024, ttl_seconds=60)
+    site = FakeSite({'https://a/1': b'page one'})
+    cache.fetch('https://a/1', site)
+
+    clock[0] += 61
+    assert cache.fetch('https://a/1', site) == (b'page one', 'revalidated')
+    _, headers = site.requests[-1]
+    assert headers['If-None-Match'] == f'"{hash(b"page one")}"'
+    assert headers['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+    # The 304 restarts the TTL
+    assert cache.fetch('https://a/1', site) == (b'page one', 'hit')
+
+    site.pages['https://a/1'] = b'page one, edited'
+    clock[0] += 61
+    assert cache.fetch('https://a/1', site) == (b'page one, edited', 'miss')
+
+def test_least_recently_used_bodies_are_evicted(tmp_path, clock):
+    cache = PageCache(str(tmp_path), max_bytes=20, ttl_seconds=60)
+    site = FakeSite({'https://a/1': b'x' * 8, 'https://a/2': b'y' * 8, 'https://a/3': b'x' * 8, 'https://a/4': b'z' * 8})
+    for url in ('https://a/1', 'https://a/2', 'https://a/3'):
+        clock[0] += 1
+        cache.fetch(url, site)
+    # /1 and /3 share one stored body, so the three pages take 16 bytes
+    clock[0] += 1
+    assert cache.fetch('https://a/1', site)[1] == 'hit'
+
+    clock[0] += 1
+    cache.fetch('https://a/4', site)
+    assert cache.fetch('https://a/2', site)[1] == 'miss'
+    assert cache.fetch('https://a/4', site)[1] == 'hit'
@@ -0,0 +1,54 @@
+# test_progress_counters.py
+
+import pytest
+from sqlalchemy import text
+from progress_counters import apply_question_changes
+
+@pytest.fixture
+def unanswered_question(make_quiz_set):
+    """A quiz set of one unanswered question whose answer is A."""
+    quiz_set_id, (question_id,) = make_quiz_set([{'answer': 'A'}])
+    return quiz_set_id, question_id
+
+def _state(session, quiz_set_id, question_id):
+    return session.execute(text(
+        "SELECT questions.user_selected_option, questions.version, quiz_sets.answered_count, quiz_sets.correct_count "
+        "FROM questions JOIN quiz_sets ON quiz_sets.id = questions.quiz_set_id WHERE questions.id = :id"
+    ), {'id': question_id}).one()
+
+def test_resent_change_is_skipped(session, unanswered_question):
+    quiz_set_id, question_id = unanswered_question
+    change = {'question_id': question_id, 'version': 0, 'selected_option': 'A'}
+    assert apply_question_changes([change]) == {question_id: 1}
+    assert apply_question_changes([change]) == {}
+    assert tuple(_state(session, quiz_set_id, question_id)) == ('A', 1, 1, 1)
+
+def test_stale_change_from_another_tab_is_skipped(session, unanswered_question):
+    quiz_set_id, question_id = unanswered_question
+    # Tab A's change never got a response, tab B then wrote, and A resends its change
+    tab_a = {'question_id': question_id, 'version': 0, 'selected_option': 'A'}
+    tab_b = {'question_id': question_id, 'version': 0, 'selected_option': 'B'}
+    assert apply_question_changes([tab_b]) == {question_id: 1}
+    assert apply_question_changes([tab_a]) == {}
+    assert tuple(_state(session, quiz_set_id, question_id)) == ('B', 1, 1, 0)
+
+def test_changes_to_one_question_apply_in_version_order(session, unanswered_question):
+    quiz_set_id, question_id = unanswered_question
+    changes = [
+        {'question_id': question_id, 'version': 1, 'selected_option': None},
+        {'question_id': question_id, 'version': 0, 'selected_option': 'A'},
+    ]
+    assert apply_question_changes(changes) == {question_id: 2}
+    assert tuple(_state(session, quiz_set_id, question_id)) == (None, 2, 0, 0)
+
+def test_selections_and_versions_are_read_separately(app, session, unanswered_question, monkeypatch):
+    # updateQuestionsBatch commits; keep its writes inside the test's transaction
+    monkeypatch.setattr(session, 'commit', session.flush)
+    quiz_set_id, question_id = unanswered_question
+    client = app.test_client()
+    assert client.get(f'/api/getUserSelections/{quiz_set_id}').json == {str(question_id): None}
+    assert client.get(f'/api/getQuestionVersions/{quiz_set_id}').json == {str(question_id): 0}
+
+    client.post('/api/updateQuestionsBatch', json={'changes': [{'question_id': question_id, 'version': 0, 'selected_option': 'B'}]})
+    assert client.get(f'/api/getUserSelections/{quiz_set_id}').json == {str(question_id): 'B'}
+    assert client.get(f'/api/getQuestionVersions/{quiz_set_id}').json == {str(question_id): 1}
@@ -0,0 +1,8 @@
+# test_query_plans.py
+
+from query_plans import check_query_plans, uses_index
+
+def test_hot_queries_use_indexes(session):
+    # Large enough that a sequential scan would lose to the indexes; the seeded rows are rolled back
+    results = check_query_plans(users=200, quiz_sets=1000, questions_per_set=50)
+    assert {name: scans for name, scans in results.items() if not uses_index(scans)} == {}
@@ -0,0 +1,32 @@
+# test_question_dedup.py
+
+import pytest
+from sqlalchemy import text
+
+@pytest.fixture
+def two_empty_quiz_sets(make_quiz_set, session, monkeypatch):
+    # commit_page commits; keep its writes inside the test's transaction
+    monkeypatch.setattr(session, 'commit', session.flush)
+    return make_quiz_set([])[0], make_quiz_set([])[0]
+
+def _question(text_html, answer='Option A'):
+    return {'text': text_html, 'options': ['1', '2'], 'answer': answer, 'url': 'https://www.indiabix.com/page/000001',
+            'explanation': 'Because.', 'discussion_link': '/discussion/1'}
+
+def _content_ids(session, quiz_set_id):
+    return session.execute(text('SELECT content_id FROM questions WHERE quiz_set_id = :id ORDER BY "order"'),
+                           {'id': quiz_set_id}).scalars().all()
+
+def test_identical_content_is_stored_once(app, session, two_empty_quiz_sets):
+    from question_writer import QuestionWriter
+    for quiz_set_id in two_empty_quiz_sets:
+        writer = QuestionWriter(quiz_set_id, 1)
+        # Whitespace differences don't make content distinct; a different answer does
+        writer.add(**_question('<div>Question 1</div>'))
+        writer.add(**_question('<div>Question  1</div> '))
+        writer.add(**_question('<div>Question 1</div>', answer='Option B'))
+        writer.commit_page()
+
+    first, second = (_content_ids(session, quiz_set_id) for quiz_set_id in two_empty_quiz_sets)
+    assert first == second
+    assert first[0] == first[1] != first[2]
@@ -0,0 +1,51 @@
+# test_question_pages.py
+
+import pytest
+import config
+
+@pytest.fixture
+def ten_questions(make_quiz_set):
+    """A quiz set of ten questions, saved at question 6, whose fifth and sixth share an order."""
+    orders = [0, 1, 2, 3, 4, 4, 6, 7, 8, 9]
+    return make_quiz_set([{'order': order} for order in orders], current_question_index=6)
+
+def _page(app, quiz_set_id, query):
+    response = app.test_client().get(f'/api/getQuestionsByQuizSet/{quiz_set_id}?{query}')
+    assert response.status_code == 200
+    return response.json
+
+def test_cursors_visit_every_question_once(app, ten_questions):
+    quiz_set_id, question_ids = ten_questions
+    seen, query = [], 'limit=3'
+    while True:
+        page = _page(app, quiz_set_id, query)
+        seen += [question['id'] for question in page['questions']]
+        if not page['next_cursor']:
+            break
+        query = f"limit=3&after={page['next_cursor']}"
+    assert seen == question_ids
+
+    # Paging back from the last page returns the three questions before it
+    page = _page(app, quiz_set_id, f"limit=3&before={page['previous_cursor']}")
+    assert [question['id'] for question in page['questions']] == question_ids[6:9]
+    assert page['total_questions'] == 10
+
+def test_window_is_centred_on_the_saved_question(app, ten_questions):
+    quiz_set_id, question_ids = ten_questions
+    page = _page(app, quiz_set_id, 'window=2')
+    assert [question['id'] for question in page['questions']] == question_ids[4:9]
+    assert (page['offset'], page['current_question_index']) == (4, 6)
+    assert page['previous_cursor'] and page['next_cursor']
+
+def test_window_larger_than_a_page_stays_centred(app, ten_questions, monkeypatch):
+    quiz_set_id, question_ids = ten_questions
+    monkeypatch.setattr(config, 'QUESTIONS_PAGE_MAX', 3)
+    page = _page(app, quiz_set_id, 'window=5')
+    assert [question['id'] for question in page['questions']] == question_ids[5:8]
+    assert page['offset'] == 5
+
+def test_invalid_page_arguments_are_rejected(app, ten_questions):
+    quiz_set_id, _ = ten_questions
+    client = app.test_client()
+    for query in ('limit=0', 'window=-1', 'limit=3&after=nonsense'):
+        assert client.get(f'/api/getQuestionsByQuizSet/{quiz_set_id}?{query}').status_code == 400
@@ -0,0 +1,39 @@
+# test_question_writer.py
+
+import pytest
+from sqlalchemy import text
+
+@pytest.fixture
+def empty_quiz_set(make_quiz_set, session, monkeypatch):
+    # commit_page commits; keep its writes inside the test's transaction
+    monkeypatch.setattr(session, 'commit', session.flush)
+    quiz_set_id, _ = make_quiz_set([])
+    return quiz_set_id
+
+def _question(n, answer='Option A'):
+    return {'text': f'<div>Question {n}</div>', 'options': [f'{n}', f'{n + 1}'], 'answer': answer,
+            'url': 'https://www.indiabix.com/page/000001', 'explanation': 'Because.', 'discussion_link': f'/discussion/{n}'}
+
+def _rows(session, quiz_set_id):
+    return session.execute(text(
+        'SELECT questions."order", questions.answer, questions.content_id, question_contents.text '
+        'FROM questions JOIN question_contents ON question_contents.id = questions.content_id '
+        'WHERE quiz_set_id = :id ORDER BY questions."order"'
+    ), {'id': quiz_set_id}).all()
+
+def test_questions_are_inserted_in_batches_with_continuing_order(app, session, empty_quiz_set):
+    from question_writer import QuestionWriter
+    batch_sizes = []
+    writer = QuestionWriter(empty_quiz_set, 1, flush_size=2)
+    original_flush = writer.flush
+    writer.flush = lambda: (batch_sizes.append(len(writer.rows)), original_flush())
+    for n in range(5):
+        writer.add(**_question(n))
+    writer.commit_page()
+
+    # Two full batches as rows were added, then the page's remainder
+    assert batch_sizes == [2, 2, 1]
+    assert [(row.order, row.text) for row in _rows(session, empty_quiz_set)] == [(n + 1, f'<div>Question {n}</div>') for n in range(5)]
+    assert writer.next_order == 6
+    counters = session.execute(text("SELECT total_questions, version FROM quiz_sets WHERE id = :id"), {'id': empty_quiz_set}).one()
+    assert tuple(counters) == (5, 3)
@@ -0,0 +1,68 @@
+# test_quiz_cache.py
+
+import pytest
+from sqlalchemy import event
+from db import db
+from quiz_cache import ResponseCache
+
+@pytest.fixture
+def quiz_set_id(make_quiz_set):
+    quiz_set_id, _ = make_quiz_set([{'answer': 'A'}, {'answer': 'B', 'favorite': True}])
+    return quiz_set_id
+
+def _question_reads(app, path, headers=None):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM questions' in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = app.test_client().get(path, headers=headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return response, len(statements)
+
+def test_unchanged_quiz_set_is_not_modified(app, quiz_set_id):
+    path = f'/api/getQuestionsByQuizSet/{quiz_set_id}'
+    response, reads = _question_reads(app, path)
+    assert response.status_code == 200 and reads == 1
+    assert response.headers['Cache-Control'] == 'no-cache'
+    etag = response.headers['ETag']
+
+    # The same version is answered from the response cache, or with a 304 when the client has it
+    cached, reads = _question_reads(app, path)
+    assert (cached.status_code, cached.get_data(), reads) == (200, response.get_data(), 0)
+    for if_none_match in (etag, 'W/' + etag, f'"other", {etag}'):
+        not_modified, reads = _question_reads(app, path, {'If-None-Match': if_none_match})
+        assert (not_modified.status_code, reads) == (304, 0)
+
+def test_writes_change_the_etag(app, session, quiz_set_id, monkeypatch):
+    # The write endpoints commit; keep their writes inside the test's transaction
+    monkeypatch.setattr(session, 'commit', session.flush)
+    client = app.test_client()
+    path = f'/api/getUserSelections/{quiz_set_id}'
+    before = client.get(path)
+    question_id = next(iter(before.json))
+
+    client.post('/api/updateQuestionsBatch', json={'changes': [{'question_id': int(question_id), 'version': 0, 'selected_option': 'A'}]})
+    after = client.get(path, headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert after.json[question_id] == 'A'
+
+def test_response_cache_is_bounded_by_body_size():
+    cache = ResponseCache(max_bytes=10)
+    cache.put(('view', 'a'), 1, b'12345')
+    cache.put(('view', 'b'), 1, b'12345')
+    assert cache.get(('view', 'a'), 1) == b'12345'
+    # Storing c evicts b, the least recently used
+    cache.put(('view', 'c'), 1, b'12345')
+    assert cache.get(('view', 'b'), 1) is None
+    assert cache.get(('view', 'a'), 1) == b'12345'
+
+    # A newer version replaces the old body, which is no longer served
+    cache.put(('view', 'a'), 2, b'123')
+    assert cache.get(('view', 'a'), 1) is None
+    assert cache.size == 8
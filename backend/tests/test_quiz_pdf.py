@@ -0,0 +1,17 @@
+# test_quiz_pdf.py
+
+from sqlalchemy import text
+from quiz_pdf import content_digest
+
+def test_pdf_cache_key_follows_exported_content_only(session, make_quiz_set):
+    quiz_set_id, _ = make_quiz_set([{'answer': 'A'}, {'answer': 'B'}, {'answer': 'A'}])
+    digest = content_digest(quiz_set_id, 'title')
+
+    # Selections, favorites and version bumps don't change what the PDF shows
+    session.execute(text("UPDATE questions SET user_selected_option = 'B', favorite = true WHERE quiz_set_id = :id"), {'id': quiz_set_id})
+    session.execute(text("UPDATE quiz_sets SET version = version + 1 WHERE id = :id"), {'id': quiz_set_id})
+    assert content_digest(quiz_set_id, 'title') == digest
+
+    assert content_digest(quiz_set_id, 'renamed') != digest
+    session.execute(text("UPDATE questions SET answer = 'C' WHERE quiz_set_id = :id AND \"order\" = 1"), {'id': quiz_set_id})
+    assert content_digest(quiz_set_id, 'title') != digest
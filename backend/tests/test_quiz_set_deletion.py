@@ -0,0 +1,32 @@
+# test_quiz_set_deletion.py
+
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import text
+
+@pytest.fixture
+def hidden_quiz_set(make_quiz_set):
+    """A quiz set hidden as delete_quiz_sets leaves it while the background purge runs."""
+    quiz_set_id, question_ids = make_quiz_set([{'answer': 'A'}, {'answer': 'B'}], deleted_at=datetime.now(timezone.utc))
+    return quiz_set_id, question_ids[0]
+
+@pytest.mark.parametrize('path', [
+    'getQuestionsByQuizSet/{}', 'getQuestionsByQuizSet/{}?limit=10', 'getFavorites/{}', 'getUserSelections/{}', 'getQuestionVersions/{}',
+    'getQuizSetDetails/{}', 'getQuizSetScore/{}', 'downloadQuizPdf/{}', 'getQuizSetState/{}', 'getRawUrls/{}',
+])
+def test_reads_of_a_hidden_quiz_set_are_not_found(app, session, hidden_quiz_set, path):
+    # The test client runs in the fixture's app context, so it sees the uncommitted rows
+    quiz_set_id, _ = hidden_quiz_set
+    client = app.test_client()
+    assert client.get('/api/' + path.format(quiz_set_id)).status_code == 404
+    session.execute(text("UPDATE quiz_sets SET deleted_at = NULL WHERE id = :id"), {'id': quiz_set_id})
+    assert client.get('/api/' + path.format(quiz_set_id)).status_code == 200
+
+def test_writes_to_a_hidden_quiz_set_are_not_applied(app, hidden_quiz_set):
+    quiz_set_id, question_id = hidden_quiz_set
+    client = app.test_client()
+    assert client.post(f'/api/shuffleQuestions/{quiz_set_id}').status_code == 404
+    assert client.post(f'/api/updateQuizSetState/{quiz_set_id}', json={'index': 1, 'filter': 'all'}).status_code == 404
+    assert client.post('/api/updateUserSelection', json={'question_id': question_id, 'selected_option': 'A'}).status_code == 404
+    batch = client.post('/api/updateQuestionsBatch', json={'changes': [{'question_id': question_id, 'version': 0, 'selected_option': 'A'}]})
+    assert batch.json['ignored'] == [question_id]
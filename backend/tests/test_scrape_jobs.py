@@ -0,0 +1,49 @@
+# test_scrape_jobs.py
+
+from datetime import datetime, timedelta
+import config
+from models import ScrapeJob, User
+
+def test_start_scraping_queues_a_job_and_returns_at_once(app, session, monkeypatch):
+    # Imported once the app fixture has pointed it at the test database
+    import scrape_jobs
+    # startScraping commits; keep its writes inside the test's transaction
+    monkeypatch.setattr(session, 'commit', session.flush)
+    submitted = []
+    monkeypatch.setattr(scrape_jobs.executor, 'submit', lambda *args: submitted.append(args))
+    user = User(name='scraper')
+    session.add(user)
+    session.flush()
+
+    client = app.test_client()
+    with client.session_transaction() as cookie_session:
+        cookie_session['user_id'] = user.id
+    urls = [{'base_url': 'https://www.indiabix.com/electronics/devices/', 'start_url': 1, 'end_url': 3},
+            'https://www.pinoybix.org/2020/01/mcq-in-devices.html']
+    response = client.post('/api/startScraping', json={'title': 'Devices', 'urls': urls})
+
+    assert response.status_code == 202
+    job_id = response.json['job_id']
+    assert submitted == [(scrape_jobs.run_scrape_job, job_id, urls)]
+    status = client.get(f'/api/scrapeJobs/{job_id}').json
+    assert (status['status'], status['quiz_set_id'], status['pages_total']) == ('queued', response.json['quiz_set_id'], 4)
+
+def test_unknown_job_is_not_found(app):
+    assert app.test_client().get('/api/scrapeJobs/missing').status_code == 404
+
+def test_job_status_reports_failures_and_lost_jobs(app):
+    from scrape_jobs import job_status
+    now = datetime.now(config.PH_TZ)
+    job = ScrapeJob(id='job', quiz_set_id='set', status='running', pages_total=4, pages_done=1, pages_failed=1,
+                    failed_urls='["https://www.indiabix.com/page/000002"]', questions_inserted=5,
+                    cache_hits=1, cache_revalidated=0, cache_misses=1,
+                    created_at=now - timedelta(seconds=60), started_at=now - timedelta(seconds=60), updated_at=now)
+    status = job_status(job)
+    assert status['status'] == 'running'
+    assert status['failed_urls'] == ['https://www.indiabix.com/page/000002']
+    # Two of four pages took a minute, so two more take about another
+    assert 55 <= status['eta_seconds'] <= 65
+
+    job.updated_at = now - timedelta(seconds=config.SCRAPE_JOB_STALE_SECONDS + 1)
+    status = job_status(job)
+    assert (status['status'], status['eta_seconds']) == ('interrupted', None)
@@ -0,0 +1,58 @@
+# test_scraping_helpers.py
+
+import pytest
+import config
+import page_cache
+import scraping_helpers
+
+class FakeResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise scraping_helpers.requests.HTTPError(f"HTTP {self.status_code}")
+
+class RecordingClient:
+    """Answers every GET with the next of `statuses` and records whether the host's only slot was taken."""
+
+    def __init__(self, content, statuses):
+        self.content = content
+        self.statuses = list(statuses)
+        self.slot_held = []
+
+    def get(self, url, **kwargs):
+        self.slot_held.append(not _slot_free(url))
+        return FakeResponse(self.content, self.statuses.pop(0))
+
+def _slot_free(url):
+    semaphore = scraping_helpers._host_semaphore(url)
+    if not semaphore.acquire(blocking=False):
+        return False
+    semaphore.release()
+    return True
+
+@pytest.fixture(autouse=True)
+def one_slot_per_host(monkeypatch):
+    monkeypatch.setattr(config, 'SCRAPE_PER_HOST_LIMIT', 1)
+    monkeypatch.setattr(scraping_helpers, '_host_semaphores', {})
+    monkeypatch.setattr(page_cache, 'cache', None)
+
+def test_retry_backoff_does_not_hold_the_host_slot(monkeypatch):
+    url = 'https://www.indiabix.com/page/000001'
+    slot_free_while_sleeping = []
+    monkeypatch.setattr(scraping_helpers.time, 'sleep', lambda seconds: slot_free_while_sleeping.append(_slot_free(url)))
+    client = RecordingClient(b'<html></html>', [503, 503, 200])
+
+    assert scraping_helpers.fetch_page(url, client) == b'<html></html>'
+    assert client.slot_held == [True, True, True]
+    assert slot_free_while_sleeping == [True, True, True]
+
+def test_first_discussion_page_takes_a_host_slot():
+    page = (b'<div class="left-box">Discussion:</div>'
+            b'<div class="bix-sun-discussion"><div class="user-details">Ana</div><div class="user-content">Yes</div></div>')
+    client = RecordingClient(page, [200])
+
+    assert scraping_helpers.fetch_discussion_comments('https://www.indiabix.com/discuss/1#comments', client) == 'Ana: Yes'
+    assert client.slot_held == [True]
@@ -147,6 +147,61 @@ const AdditionalInfo = ({
     return formattedResponse;
   };
 
+  // Read the streaming endpoint, showing text as it arrives; falls back to the buffered endpoint
+  // if the stream can't be opened or fails part way
+  const requestFurtherExplanation = async (refresh: boolean): Promise<string> => {
+    const body = JSON.stringify({ ...questionDetails, refresh });
+    try {
+      const response = await fetchWithAuth(`${backendUrl}/getFurtherExplanation/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body,
+      });
+      if (!response.ok || !response.body) throw new Error(`Error: ${response.statusText}`);
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = '';
+      let text = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const events = buffered.split('\n\n');
+        buffered = events.pop() || '';
+        for (const rawEvent of events) {
+          const eventName = rawEvent.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(rawEvent.match(/^data: (.*)$/m)?.[1] || '{}');
+          if (eventName === 'chunk') {
+            text += data.text;
+            setFurtherExplanation(formatBotResponse(text));
+          } else if (eventName === 'error') {
+            throw new Error(data.error);
+          }
+        }
+      }
+      return text;
+    } catch (error) {
+      console.error('Streaming further explanation failed, retrying without streaming:', error);
+      const response = await fetchWithAuth(`${backendUrl}/getFurtherExplanation`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body,
+      });
+      const data = await response.json();
+      return data.further_explanation;
+    }
+  };
+
+  // replace: a reloaded answer supersedes the saved one; otherwise an existing one is kept
+  const saveFurtherExplanation = async (newExplanation: string, replace: boolean) => {
+    await fetchWithAuth(`${backendUrl}/saveFurtherExplanation`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ question_id: question_id, explanation: newExplanation, replace }),
+    });
+  };
+
   const handleRocketClick = async () => {
     setLoadingRocket(true);
     if (!fetchedExplanation) {
@@ -157,19 +212,10 @@ const AdditionalInfo = ({
           setFurtherExplanation(formatBotResponse(data.explanation));
           setFetchedExplanation(true);
         } else {
-          const newResponse = await fetchWithAuth(`${backendUrl}/getFurtherExplanation`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(questionDetails),
-          });
-          const newData = await newResponse.json();
-          await fetchWithAuth(`${backendUrl}/saveFurtherExplanation`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ question_id: question_id, explanation: newData.further_explanation }),
-          });
+          const newExplanation = await requestFurtherExplanation(false);
+          if (newExplanation) await saveFurtherExplanation(newExplanation, false);
           setFurtherExplanation(
-            formatBotResponse(newData.further_explanation || 'Error fetching further explanation')
+            formatBotResponse(newExplanation || 'Error fetching further explanation')
           );
           setFetchedExplanation(true);
         }
@@ -184,19 +230,11 @@ const AdditionalInfo = ({
   const handleReloadClick = async () => {
     setLoadingReload(true);
     try {
-      const newResponse = await fetchWithAuth(`${backendUrl}/getFurtherExplanation`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(questionDetails),
-      });
-      const newData = await newResponse.json();
-      await fetchWithAuth(`${backendUrl}/saveFurtherExplanation`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ question_id: question_id, explanation: newData.further_explanation }),
-      });
+      // Reload asks for a fresh answer rather than the cached one
+      const newExplanation = await requestFurtherExplanation(true);
+      if (newExplanation) await saveFurtherExplanation(newExplanation, true);
       setFurtherExplanation(
-        formatBotResponse(newData.further_explanation || 'Error fetching further explanation')
+        formatBotResponse(newExplanation || 'Error fetching further explanation')
       );
     } catch (error) {
       console.error('Error fetching further explanation:', error);
@@ -10,12 +10,100 @@ interface ScrapingSectionProps {
   quizSetTitle: string;
 }
 
+interface ScrapeJobStatus {
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'interrupted';
+  pages_total: number;
+  pages_done: number;
+  pages_failed: number;
+  questions_inserted: number;
+  eta_seconds: number | null;
+  error: string | null;
+}
+
+interface ScrapeProgressEvent {
+  pages_total: number;
+  pages_done: number;
+  pages_failed: number;
+  questions_inserted: number;
+}
+
+const SCRAPE_JOB_POLL_INTERVAL_MS = 2000;
+const TERMINAL_SCRAPE_STATUSES = ['completed', 'failed', 'interrupted'];
+
 const ScrapingSection: React.FC<ScrapingSectionProps> = ({ onScrapeComplete, quizSetTitle }) => {
   const [scrapeInput, setScrapeInput] = useState('');
   const [isScraping, setIsScraping] = useState(false);
   const toast = useToast();
   const backendUrl = getBackendUrl();
 
+  // Poll the background scrape job until it finishes, updating the processing toast as pages come in
+  const pollScrapeJob = async (jobId: string, processingToastId: ReturnType<typeof toast>): Promise<ScrapeJobStatus> => {
+    while (true) {
+      await new Promise(resolve => setTimeout(resolve, SCRAPE_JOB_POLL_INTERVAL_MS));
+      const response = await fetchWithAuth(`${backendUrl}/scrapeJobs/${jobId}`);
+      if (!response.ok) {
+        throw new Error(`Error: ${response.statusText}`);
+      }
+
+      const job: ScrapeJobStatus = await response.json();
+      if (job.status !== 'queued' && job.status !== 'running') {
+        return job;
+      }
+
+      const eta = job.eta_seconds !== null ? ` About ${job.eta_seconds}s left.` : '';
+      toast.update(processingToastId, {
+        description: `Scraped ${job.pages_done + job.pages_failed} of ${job.pages_total} pages (${job.questions_inserted} questions).${eta}`,
+      });
+    }
+  };
+
+  // Follow the scrape job's event stream, falling back to polling if the stream can't be opened or drops
+  const waitForScrapeJob = (jobId: string, processingToastId: ReturnType<typeof toast>): Promise<ScrapeJobStatus> => {
+    if (typeof EventSource === 'undefined') {
+      return pollScrapeJob(jobId, processingToastId);
+    }
+
+    return new Promise((resolve, reject) => {
+      const source = new EventSource(`${backendUrl}/scrapeJobs/${jobId}/events`, { withCredentials: true });
+
+      const showProgress = (progress: ScrapeProgressEvent, detail = '') => {
+        toast.update(processingToastId, {
+          description: `Scraped ${progress.pages_done + progress.pages_failed} of ${progress.pages_total} pages (${progress.questions_inserted} questions).${detail}`,
+        });
+      };
+
+      source.addEventListener('page', (event) => {
+        showProgress(JSON.parse((event as MessageEvent).data));
+      });
+
+      source.addEventListener('retry', (event) => {
+        const retry = JSON.parse((event as MessageEvent).data);
+        toast.update(processingToastId, {
+          description: `Retrying ${retry.url} in ${retry.wait_seconds}s (attempt ${retry.attempt}).`,
+        });
+      });
+
+      source.addEventListener('status', (event) => {
+        const status = JSON.parse((event as MessageEvent).data);
+        if (TERMINAL_SCRAPE_STATUSES.includes(status.status)) {
+          source.close();
+          // The final event only carries counts; fetch the full job record for the result
+          fetchWithAuth(`${backendUrl}/scrapeJobs/${jobId}`)
+            .then(response => response.json())
+            .then(resolve)
+            .catch(reject);
+        } else if (status.pages_total !== undefined) {
+          showProgress(status);
+        }
+      });
+
+      source.onerror = () => {
+        source.close();
+        pollScrapeJob(jobId, processingToastId).then(resolve).catch(reject);
+      };
+    });
+  };
+
   const handleScrape = async () => {
     if (!quizSetTitle.trim()) {
       console.error('Scrape Error: Quiz set title is empty.');
@@ -91,7 +179,13 @@ const ScrapingSection: React.FC<ScrapingSectionProps> = ({ onScrapeComplete, qui
       }
   
       const data = await response.json();
-      console.log('Scraping completed successfully:', data);
+      console.log('Scraping job started:', data);
+
+      const job = await waitForScrapeJob(data.job_id, processingToastId);
+      if (job.status !== 'completed') {
+        throw new Error(job.error || `Scrape job ${job.status}`);
+      }
+      console.log('Scraping completed successfully:', job);
   
       onScrapeComplete(true, quizSetTitle);
       toast({
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { useRouter } from 'next/router';
 import { useToast, useColorMode, useColorModeValue, useDisclosure, useBreakpointValue } from '@chakra-ui/react';
 import { getBackendUrl } from '@/utils/getBackendUrl';
@@ -18,6 +18,19 @@ interface QuestionData {
   hasMathContent: boolean;
 }
 
+interface PendingQuestionChange {
+  // The question version the change was made against; the server skips it if the question has moved on
+  version: number;
+  question_id: number;
+  selected_option?: string | null;
+  favorite?: boolean;
+}
+
+// Answer selections are queued and sent to updateQuestionsBatch after this much quiet time
+const QUESTION_CHANGES_FLUSH_DELAY_MS = 500;
+// Keeps each keepalive request body well under the browser's 64KB limit
+const QUESTION_CHANGES_PER_REQUEST = 200;
+
 const useQuizState = () => {
   const backendUrl = getBackendUrl();
   const router = useRouter();
@@ -43,6 +56,8 @@ const useQuizState = () => {
     questionsShuffled: false,
     optionsShuffled: false
   });
+  // Latest known version of each question, counting this tab's queued changes as applied
+  const questionVersionsRef = useRef<Map<number, number>>(new Map());
   const iconButtonSize = useBreakpointValue({ base: 'sm', md: 'md' });
   const flexWrapValue = useBreakpointValue({ base: 'wrap', md: 'nowrap' });
 
@@ -126,25 +141,24 @@ const useQuizState = () => {
   const confirmShuffleQuestions = async () => {
     console.log("Confirming shuffle questions...");
     try {
+      await flushQuestionChanges();
       console.log("Before fetching shuffled questions");
       const shuffledResponse = await fetchWithAuth(`${backendUrl}/shuffleQuestions/${id}`, { method: 'POST' });
       if (!shuffledResponse.ok) throw new Error('Error shuffling questions');
 
-      let shuffledQuestionsData = await shuffledResponse.json();
-      console.log("Shuffled questions received:", shuffledQuestionsData);
+      // The server only returns the new ordering; reorder the questions already loaded
+      const shuffledOrdering: { id: number; order: number; version: number }[] = await shuffledResponse.json();
+      console.log("Shuffled ordering received:", shuffledOrdering);
+      shuffledOrdering.forEach(({ id: questionId, version }) => questionVersionsRef.current.set(questionId, version));
 
-      let shuffledQuestions: Question[] = shuffledQuestionsData.map((question: QuestionData) => ({
-        id: question.id,
-        order: question.order,
-        question: question.text,
-        options: question.options,
-        answer: question.answer,
-        url: question.url,
-        explanation: question.explanation,
-        discussion_link: question.discussion_link,
-        hasMathContent: question.hasMathContent,
-        userSelectedOption: null,
-      }));
+      const questionsById = new Map(questions.map(question => [question.id, question]));
+      let shuffledQuestions: Question[] = shuffledOrdering
+        .filter(({ id: questionId }) => questionsById.has(questionId))
+        .map(({ id: questionId, order }) => ({
+          ...questionsById.get(questionId)!,
+          order,
+          userSelectedOption: null,
+        }));
 
       if (optionsShuffled) {
         console.log("Reapplying options shuffle after questions shuffle");
@@ -183,9 +197,15 @@ const useQuizState = () => {
 
   const fetchUserSelections = async () => {
     try {
-      const response = await fetchWithAuth(`${backendUrl}/getUserSelections/${id}`);
-      if (!response.ok) throw new Error('Network response was not ok');
-      const selections = await response.json();
+      const [selectionsResponse, versionsResponse] = await Promise.all([
+        fetchWithAuth(`${backendUrl}/getUserSelections/${id}`),
+        fetchWithAuth(`${backendUrl}/getQuestionVersions/${id}`),
+      ]);
+      if (!selectionsResponse.ok || !versionsResponse.ok) throw new Error('Network response was not ok');
+      const [selections, versions] = await Promise.all([selectionsResponse.json(), versionsResponse.json()]);
+      questionVersionsRef.current = new Map(
+        Object.entries(versions as Record<string, number>).map(([questionId, version]) => [Number(questionId), version])
+      );
       setQuestions((previousQuestions) => previousQuestions.map((question) => ({
         ...question,
         userSelectedOption: selections[question.id] || null
@@ -258,7 +278,8 @@ const useQuizState = () => {
       body: JSON.stringify({ question_id: questionId })
     })
       .then(response => response.json())
-      .then(() => {
+      .then((data) => {
+        if (typeof data.version === 'number') questionVersionsRef.current.set(questionId, data.version);
         setFavorites(previousFavorites => {
           const newFavorites = new Set(previousFavorites);
           let message = "";
@@ -359,6 +380,96 @@ const useQuizState = () => {
     updateQuizSetState(0, value);
   };
 
+  const pendingChangesRef = useRef<PendingQuestionChange[]>([]);
+  // Changes that may already have reached the server, so newer ones aren't merged into them
+  const resentChangesRef = useRef<WeakSet<PendingQuestionChange>>(new WeakSet());
+  const flushTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const flushInFlightRef = useRef<Promise<void> | null>(null);
+
+  const sendQuestionChanges = async (changes: PendingQuestionChange[]) => {
+    try {
+      const response = await fetchWithAuth(`${backendUrl}/updateQuestionsBatch`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ changes }),
+        keepalive: true,
+      });
+      if (!response.ok) throw new Error(`Error: ${response.statusText}`);
+      const { ignored }: { ignored: number[] } = await response.json();
+      if (ignored.length > 0) {
+        // Another tab wrote these questions first (or a resent change was already applied); drop
+        // what is queued for them and show what the server has
+        const ignoredIds = new Set(ignored);
+        pendingChangesRef.current = pendingChangesRef.current.filter(change => !ignoredIds.has(change.question_id));
+        await fetchUserSelections();
+      }
+    } catch (error) {
+      console.error('Error saving answer selections:', error);
+      // Requeue ahead of newer changes; the server skips any it already applied
+      changes.forEach(change => resentChangesRef.current.add(change));
+      pendingChangesRef.current = [...changes, ...pendingChangesRef.current];
+      scheduleQuestionChangesFlush();
+    }
+  };
+
+  // Send everything queued so far, one request at a time; resolves once it has been sent
+  const flushQuestionChanges = async () => {
+    if (flushTimerRef.current) {
+      clearTimeout(flushTimerRef.current);
+      flushTimerRef.current = null;
+    }
+    while (flushInFlightRef.current) {
+      await flushInFlightRef.current;
+    }
+    if (pendingChangesRef.current.length === 0) return;
+
+    const changes = pendingChangesRef.current.splice(0, QUESTION_CHANGES_PER_REQUEST);
+    const flush = sendQuestionChanges(changes);
+    flushInFlightRef.current = flush;
+    await flush;
+    flushInFlightRef.current = null;
+    if (pendingChangesRef.current.length > 0 && !flushTimerRef.current) {
+      await flushQuestionChanges();
+    }
+  };
+
+  const scheduleQuestionChangesFlush = () => {
+    if (flushTimerRef.current) clearTimeout(flushTimerRef.current);
+    flushTimerRef.current = setTimeout(() => {
+      flushTimerRef.current = null;
+      flushQuestionChanges();
+    }, QUESTION_CHANGES_FLUSH_DELAY_MS);
+  };
+
+  const queueQuestionChange = (change: Omit<PendingQuestionChange, 'version'>) => {
+    // A question's unsent change is updated in place, so it is still made against the same version
+    const queued = pendingChangesRef.current.find(
+      pending => pending.question_id === change.question_id && !resentChangesRef.current.has(pending)
+    );
+    if (queued) {
+      Object.assign(queued, change);
+    } else {
+      const version = questionVersionsRef.current.get(change.question_id) ?? 0;
+      pendingChangesRef.current.push({ ...change, version });
+      questionVersionsRef.current.set(change.question_id, version + 1);
+    }
+    scheduleQuestionChangesFlush();
+  };
+
+  // Don't lose queued selections when the tab is hidden, closed or navigated away from
+  useEffect(() => {
+    const handleVisibilityChange = () => {
+      if (document.visibilityState === 'hidden') flushQuestionChanges();
+    };
+    window.addEventListener('pagehide', flushQuestionChanges);
+    document.addEventListener('visibilitychange', handleVisibilityChange);
+    return () => {
+      window.removeEventListener('pagehide', flushQuestionChanges);
+      document.removeEventListener('visibilitychange', handleVisibilityChange);
+      flushQuestionChanges();
+    };
+  }, []);
+
   const handleOptionSelect = async (optionIndex: number | null) => {
     const questionId = filteredQuestions[currentQuestionIndex].id;
     const currentQuestion = questions.find(question => question.id === questionId);
@@ -385,11 +496,7 @@ const useQuizState = () => {
       await updateScore(questionId, decrement);
     }
 
-    await fetchWithAuth(`${backendUrl}/updateUserSelection`, {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ question_id: questionId, selected_option: selectedOption })
-    });
+    queueQuestionChange({ question_id: questionId, selected_option: selectedOption });
 
     setQuestions(previousQuestions => previousQuestions.map(question => {
       if (question.id === questionId) {
@@ -440,9 +547,24 @@ const useQuizState = () => {
     const passingScore = 70;
     const newStatus = calculatedScore / questions.length >= passingScore / 100 ? 'Passed' : 'Failed';
     updateQuizSetStatus(newStatus);
+    pregenerateIncorrectExplanations();
     setIsSummaryModalOpen(true);
   };
 
+  // Have further explanations for the missed questions ready by the time they're reviewed
+  const pregenerateIncorrectExplanations = async () => {
+    try {
+      await flushQuestionChanges();
+      await fetchWithAuth(`${backendUrl}/pregenerateExplanations/${id}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ only_incorrect: true })
+      });
+    } catch (error) {
+      console.error('Error queueing explanation generation:', error);
+    }
+  };
+
   const updateQuizSetStatus = async (status: string) => {
     try {
       await fetchWithAuth(`${backendUrl}/updateQuizSetStatus/${id}`, {
@@ -502,6 +624,7 @@ const useQuizState = () => {
   const handleReset = async () => {
     console.log("Initiating reset");
     try {
+      await flushQuestionChanges();
       const response = await fetchWithAuth(`${backendUrl}/resetQuestions/${id}`, {
         method: 'POST'
       });
@@ -15,7 +15,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         body: JSON.stringify(req.body),
       });
       const data = await response.json();
-      res.status(200).json(data);
+      // 202 with the job_id to poll while the scrape runs in the background
+      res.status(response.status).json(data);
     } catch (error) {
       res.status(500).json({ message: 'Scraping failed', error });
     }
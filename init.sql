@@ -23,22 +23,35 @@ CREATE TABLE IF NOT EXISTS quiz_sets (
     sort_order VARCHAR(4) DEFAULT 'desc',
     current_question_index INTEGER DEFAULT 0,
     current_filter VARCHAR(20) DEFAULT 'all',
-    user_id INTEGER NOT NULL REFERENCES users(id)
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    total_questions INTEGER NOT NULL DEFAULT 0,
+    answered_count INTEGER NOT NULL DEFAULT 0,
+    correct_count INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0,
+    deleted_at TIMESTAMP WITH TIME ZONE
 );
 
-CREATE TABLE IF NOT EXISTS questions (
+CREATE TABLE IF NOT EXISTS question_contents (
     id SERIAL PRIMARY KEY,
+    content_hash VARCHAR(64) NOT NULL UNIQUE,
     text TEXT NOT NULL,
-    options BYTEA NOT NULL,
-    answer VARCHAR(10) NOT NULL,
-    quiz_set_id VARCHAR(36) NOT NULL REFERENCES quiz_sets(id),
-    favorite BOOLEAN DEFAULT FALSE,
+    options JSONB NOT NULL,
     url VARCHAR(255),
     explanation TEXT,
     discussion_link VARCHAR(255),
+    discussion_comments TEXT,
+    discussion_comments_updated_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS questions (
+    id SERIAL PRIMARY KEY,
+    content_id INTEGER NOT NULL REFERENCES question_contents(id),
+    answer VARCHAR(10) NOT NULL,
+    quiz_set_id VARCHAR(36) NOT NULL REFERENCES quiz_sets(id) ON DELETE CASCADE,
+    favorite BOOLEAN DEFAULT FALSE,
     user_selected_option VARCHAR(10),
     "order" INTEGER NOT NULL,
-    discussion_comments TEXT
+    version BIGINT NOT NULL DEFAULT 0
 );
 
 CREATE TABLE IF NOT EXISTS editor_contents (
@@ -49,13 +62,66 @@ CREATE TABLE IF NOT EXISTS editor_contents (
 
 CREATE TABLE IF NOT EXISTS further_explanations (
     id SERIAL PRIMARY KEY,
-    question_id INTEGER NOT NULL REFERENCES questions(id),
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
     explanation TEXT NOT NULL
 );
 
+CREATE TABLE IF NOT EXISTS further_explanation_cache (
+    prompt_hash VARCHAR(64) PRIMARY KEY,
+    model VARCHAR(64) NOT NULL,
+    explanation TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 CREATE TABLE IF NOT EXISTS attempts (
     id SERIAL PRIMARY KEY,
-    quiz_set_id VARCHAR(36) NOT NULL REFERENCES quiz_sets(id),
+    quiz_set_id VARCHAR(36) NOT NULL REFERENCES quiz_sets(id) ON DELETE CASCADE,
     score INTEGER NOT NULL,
     timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
+
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    quiz_set_id VARCHAR(36) NOT NULL REFERENCES quiz_sets(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    pages_total INTEGER NOT NULL DEFAULT 0,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    pages_failed INTEGER NOT NULL DEFAULT 0,
+    failed_urls TEXT,
+    questions_inserted INTEGER NOT NULL DEFAULT 0,
+    cache_hits INTEGER NOT NULL DEFAULT 0,
+    cache_revalidated INTEGER NOT NULL DEFAULT 0,
+    cache_misses INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS explanation_jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    quiz_set_id VARCHAR(36) NOT NULL REFERENCES quiz_sets(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    only_incorrect BOOLEAN NOT NULL DEFAULT FALSE,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    questions_total INTEGER NOT NULL DEFAULT 0,
+    questions_done INTEGER NOT NULL DEFAULT 0,
+    questions_skipped INTEGER NOT NULL DEFAULT 0,
+    questions_failed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS ix_questions_quiz_set_id_order ON questions (quiz_set_id, "order");
+CREATE INDEX IF NOT EXISTS ix_questions_quiz_set_id_favorite ON questions (quiz_set_id, favorite);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_further_explanations_question_id ON further_explanations (question_id);
+CREATE INDEX IF NOT EXISTS ix_attempts_quiz_set_id ON attempts (quiz_set_id);
+CREATE INDEX IF NOT EXISTS ix_quiz_sets_user_id ON quiz_sets (user_id);
+CREATE INDEX IF NOT EXISTS ix_questions_content_id ON questions (content_id);
+CREATE INDEX IF NOT EXISTS ix_scrape_jobs_quiz_set_id ON scrape_jobs (quiz_set_id);
+CREATE INDEX IF NOT EXISTS ix_explanation_jobs_quiz_set_id ON explanation_jobs (quiz_set_id);
\ No newline at end of file